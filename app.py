@@ -1,11 +1,66 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from data_parser import parse_csv_file, process_datasets, get_category_mapping
+from data_parser import (parse_csv_file, process_datasets, get_category_mapping, get_section_category,
+                         build_affinity_matrix, order_affinity_sections, affinity_percentiles, AFFINITY_STATS,
+                         read_export_groups)
+import plotly.io as pio
 import numpy as np
+import inspect
+import io
+import os
+import threading
+from fnmatch import fnmatchcase
 from typing import Dict
+import perf
+import fast_figures
+import uploads
+import data_watch
+import search_index
+import audiences
+from concurrent.futures import wait
+
+DATA_FILE = "Various_HIlton - Deep DiversvsNationally representative.csv"
+DEFAULT_CATEGORY = 'Lifestyle & Interests'
+DEFAULT_SECTION = 'Springtime activities'
+DEFAULT_METRIC = 'Index'
+DEFAULT_TOP_N = 10
+DEFAULT_MIN_INDEX = 120
+
+# Build charts as plain figure dicts (fast_figures) instead of validated go.Figure
+# objects; set DASHBOARD_FAST_FIGURES=0 to fall back to graph_objects/plotly.express
+FAST_FIGURES = os.environ.get('DASHBOARD_FAST_FIGURES', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+# Scatter plots switch to WebGL above SCATTER_WEBGL_POINTS markers; sections with more
+# than SCATTER_MAX_POINTS labels are downsampled, always keeping the top
+# SCATTER_KEEP_TOP labels by Index
+SCATTER_WEBGL_POINTS = int(os.environ.get('DASHBOARD_SCATTER_WEBGL_POINTS', '500'))
+SCATTER_MAX_POINTS = int(os.environ.get('DASHBOARD_SCATTER_MAX_POINTS', '2000'))
+SCATTER_KEEP_TOP = int(os.environ.get('DASHBOARD_SCATTER_KEEP_TOP', '50'))
+
+# Data Table: only the visible page is sent to the browser; the CSV export is
+# written CSV_CHUNK_ROWS rows at a time and only when requested
+TABLE_COLUMNS = ['Response label', 'Target percent', 'Control percent', 'Index', 'Diff', 'Z-Score']
+TABLE_PAGE_SIZES = [25, 50, 100, 250]
+CSV_CHUNK_ROWS = 5000
+
+# Search results listed under the sidebar search box
+SEARCH_RESULTS = 8
+
+# Leaderboard: every response label across sections, ranked by one of these columns.
+# The reliability-adjusted Index shrinks Index towards 100 by base / (base + prior)
+# so labels answered by only a handful of target respondents don't dominate.
+LEADERBOARD_RANKINGS = ['Index', 'Target percent', 'Diff', 'Adjusted Index']
+RELIABILITY_PRIOR = 30
+
+# Audience comparison: the current export plus every other Profiles+ export in
+# DASHBOARD_AUDIENCE_DIR (default: the working directory), one audience each
+AUDIENCE_DIR = os.environ.get('DASHBOARD_AUDIENCE_DIR', '.')
+AUDIENCE_METRICS = ['Cross-audience index', 'Index', 'Target percent', 'Rank shift']
+AUDIENCE_TOP_ITEMS = 25
+
+# st.download_button accepts a callable (run on click) from Streamlit 1.50
+DEFERRED_DOWNLOADS = tuple(int(part) for part in st.__version__.split('.')[:2] if part.isdigit()) >= (1, 50)
 
 # Page configuration
 st.set_page_config(
@@ -78,13 +133,435 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
-def load_data():
+def load_data(file_path: str = DATA_FILE):
     """Load and process the data"""
-    datasets = parse_csv_file("Various_HIlton - Deep DiversvsNationally representative.csv")
+    datasets = parse_csv_file(file_path)
     processed = process_datasets(datasets)
     return processed
 
+def ingest_data_file(file_path: str):
+    """Load the data and keep only sections with valid data (None if loading failed)"""
+    with perf.phase("parse + process CSV"):
+        datasets = load_data(file_path)
+    if not datasets:
+        return None
+    with perf.phase("filter sections with data"):
+        return filter_sections_with_data(datasets)
+
+# The functions below are shared by every session (st.cache_resource), so the
+# figures and tables they return must be treated as read-only. Streamlit holds a
+# per-key lock while a cached value is computed, so a session that asks for a
+# value the warm-up thread is still building waits for it instead of recomputing.
+#
+# Each data file is owned by a DataWatcher that reloads it when it changes on
+# disk. Whole-file results are keyed by the file's content version; per-section
+# results are keyed by the section's fingerprint, so a reload only recomputes
+# what belongs to sections that actually changed.
+
+# Watchers get_watcher has created, by file path, so they can be found without creating one
+WATCHERS = {}
+
+@st.cache_resource(show_spinner=False)
+def get_watcher(file_path: str = DATA_FILE) -> data_watch.DataWatcher:
+    """The watcher holding the current (and previous) parsed version of a data file"""
+    watcher = data_watch.DataWatcher(file_path, ingest_data_file, on_retire=forget_version)
+    WATCHERS[file_path] = watcher
+    return watcher
+
+def get_snapshot(file_path: str = DATA_FILE) -> data_watch.DataSnapshot:
+    """The data file's current version; read it once per rerun and pass its version down"""
+    return get_watcher(file_path).snapshot()
+
+def get_datasets(file_path: str = DATA_FILE, version: str = None):
+    """Sections with valid data for one version of the file, the current one by default (None if loading failed)"""
+    watcher = get_watcher(file_path)
+    return (watcher.get(version) if version else watcher.snapshot()).datasets
+
+@st.cache_resource(show_spinner=False)
+def get_item_table(file_path: str, version: str) -> pd.DataFrame:
+    """All-sections item table used by the AI Summary and Cultural Insights pages"""
+    datasets = get_datasets(file_path, version) or {}
+    with perf.phase("build item table"):
+        return analyze_all_data_for_ai_summary(datasets)
+
+@st.cache_resource(show_spinner=False)
+def get_ai_summary(file_path: str, version: str):
+    """AI Summary insights and their figures (None where an insight has no chart)"""
+    datasets = get_datasets(file_path, version) or {}
+    df_all = get_item_table(file_path, version)
+    with perf.phase("insight generation"):
+        insights = generate_ai_insights(df_all, datasets)
+    figures = []
+    for insight in insights[:10]:
+        fig = None
+        if insight.get('chart_data') is not None and not insight['chart_data'].empty:
+            with perf.phase(f"figure: {insight['chart_type']}"):
+                fig = create_insight_chart(insight['chart_data'], insight['chart_type'], insight)
+        figures.append(fig)
+    return insights, figures
+
+@st.cache_resource(show_spinner=False)
+def get_cultural_summary(file_path: str, version: str):
+    """Cultural insights and their figures (None where an insight has no chart)"""
+    datasets = get_datasets(file_path, version) or {}
+    df_all = get_item_table(file_path, version)
+    with perf.phase("insight generation"):
+        insights = generate_cultural_insights(df_all, datasets)
+    figures = []
+    for insight in insights:
+        fig = None
+        if insight.get('chart_data') is not None:
+            with perf.phase(f"figure: {insight['chart_type']}"):
+                fig = create_cultural_chart(insight['chart_data'], insight['chart_type'])
+        figures.append(fig)
+    return insights, figures
+
+def clear_cached(cached, *args):
+    """Clear one entry of a cached function; Streamlit releases without per-key clear (1.28) drop them all"""
+    if inspect.signature(cached.clear).parameters:
+        cached.clear(*args)
+    else:
+        cached.clear()
+
+def forget_version(file_path: str, snapshot: data_watch.DataSnapshot):
+    """Clear the whole-file caches of a version that is no longer retained"""
+    for cached in (get_item_table, get_ai_summary, get_cultural_summary, get_leaderboard,
+                   get_affinity_matrix, get_search_index):
+        clear_cached(cached, file_path, snapshot.version)
+
+def parse_upload(file_path: str) -> int:
+    """Parse an uploaded export into the shared caches and estimate the memory they hold"""
+    snapshot = get_snapshot(file_path)
+    if not snapshot.datasets:
+        raise ValueError("no Profiles+ sections with data were found in this file")
+    df_all = get_item_table(file_path, snapshot.version)
+    return int(sum(data['data'].memory_usage(index=True, deep=True).sum() for data in snapshot.datasets.values())
+               + df_all.memory_usage(index=True, deep=True).sum())
+
+def forget_data_file(file_path: str):
+    """Drop a data file's watcher, audience and whole-file caches (per-view caches age out through max_entries)"""
+    if get_audience_workspace().forget(file_path):
+        clear_cached(get_audience_matrix)  # keyed by every compared file: matrices holding this one go too
+    watcher = WATCHERS.pop(file_path, None)
+    if watcher is None:
+        return  # never loaded in this process: nothing cached
+    for version in watcher.versions():
+        forget_version(file_path, watcher.get(version))
+    clear_cached(get_watcher, file_path)
+
+@st.cache_resource(show_spinner=False)
+def get_upload_store() -> uploads.UploadStore:
+    """Uploads shared by every session, parsed in the background and evicted LRU"""
+    return uploads.UploadStore(parse_upload, forget_data_file)
+
+def filter_section_rows(df: pd.DataFrame, min_index: int) -> pd.DataFrame:
+    """Apply index filter - keep items with index >= min_index OR items with no index data"""
+    return df[
+        (df['Index'].isna()) | (df['Index'] >= min_index) |
+        ((df['Target percent'].notna()) & (df['Target percent'] > 0))
+    ].copy()
+
+@st.cache_resource(show_spinner=False, max_entries=256)
+def get_section_table(section_name: str, min_index: int, file_path: str, section_version: str):
+    """Data Table columns of a filtered section (None if the section does not exist)"""
+    section_data = get_watcher(file_path).section(section_name, section_version)
+    if section_data is None:
+        return None
+    df = filter_section_rows(section_data['data'], min_index)
+    return df[[col for col in TABLE_COLUMNS if col in df.columns]]
+
+@st.cache_resource(show_spinner=False, max_entries=256)
+def get_table_order(section_name: str, min_index: int, sort_col: str, ascending: bool,
+                    file_path: str, section_version: str) -> np.ndarray:
+    """Row positions of the section table sorted by one column, missing values last"""
+    table = get_section_table(section_name, min_index, file_path, section_version)
+    if sort_col not in table.columns:
+        return np.arange(len(table))
+    order = table[sort_col].reset_index(drop=True).sort_values(ascending=ascending, na_position='last', kind='stable')
+    return order.index.to_numpy()
+
+def build_leaderboard(datasets: Dict) -> dict:
+    """One table of every labelled item across sections plus a descending sort order per ranking"""
+    frames = []
+    for section_name, section_data in datasets.items():
+        df = section_data['data']
+        if 'Index' not in df.columns or 'Response label' not in df.columns:
+            continue
+        frames.append(pd.DataFrame({
+            'Response label': df['Response label'].astype(str),
+            'Section': section_name,
+            'Target percent': df['Target percent'],
+            'Control percent': df['Control percent'],
+            'Diff': df['Diff'] if 'Diff' in df.columns else df['Target percent'] - df['Control percent'],
+            'Index': df['Index'],
+            'Target base': pd.to_numeric(df['Target base'], errors='coerce') if 'Target base' in df.columns else np.nan,
+        }))
+    if not frames:
+        return {'table': pd.DataFrame(columns=['Response label', 'Section', 'Category', *LEADERBOARD_RANKINGS]),
+                'orders': {ranking: np.arange(0) for ranking in LEADERBOARD_RANKINGS}}
+    table = pd.concat(frames, ignore_index=True)
+    table = table[table['Index'].notna() & table['Response label'].notna()].reset_index(drop=True)
+    
+    # Categorical section/category columns: one category lookup per section, not per row
+    sections = table['Section'].astype('category')
+    table['Section'] = sections
+    categories = {name: get_item_category(name) for name in sections.cat.categories}
+    table['Category'] = sections.map(categories).astype('category')
+    base = table['Target base'].fillna(0).to_numpy(dtype=float)
+    table['Adjusted Index'] = 100 + (table['Index'].to_numpy() - 100) * base / (base + RELIABILITY_PRIOR)
+    
+    orders = {}
+    for ranking in LEADERBOARD_RANKINGS:
+        ranked = table[ranking].sort_values(ascending=False, na_position='last', kind='stable')
+        orders[ranking] = ranked.index.to_numpy()
+    return {'table': table, 'orders': orders}
+
+@st.cache_resource(show_spinner=False)
+def get_affinity_matrix(file_path: str, version: str) -> pd.DataFrame:
+    """Category x section affinity statistics of one data version"""
+    datasets = get_datasets(file_path, version) or {}
+    with perf.phase("build affinity matrix"):
+        return build_affinity_matrix(datasets)
+
+@st.cache_resource(show_spinner=False)
+def get_search_index(file_path: str, version: str) -> search_index.SearchIndex:
+    """Search index over the labels, sections and questions of one data version"""
+    datasets = get_datasets(file_path, version) or {}
+    with perf.phase("build search index"):
+        return search_index.SearchIndex.from_datasets(datasets)
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def scan_audience_exports(directory: str, signatures: tuple) -> list:
+    """Exports among a directory's CSV files; signatures ((name, mtime_ns, size), ...) key the scan"""
+    exports = []
+    for name, *_ in signatures:
+        path = os.path.join(directory, name)
+        try:
+            if read_export_groups(path)['target']:
+                exports.append(path)
+        except (OSError, UnicodeDecodeError):
+            continue
+    return exports
+
+def find_audience_exports(directory: str = AUDIENCE_DIR) -> list:
+    """Profiles+ exports (CSV files naming a target group) in a directory, sorted by file name"""
+    try:
+        names = sorted(name for name in os.listdir(directory) if name.lower().endswith('.csv'))
+    except OSError:
+        return []
+    # Reruns cost one stat per file; headers are read again only when a CSV is added, changed or removed
+    signatures = []
+    for name in names:
+        signature = data_watch.file_signature(os.path.join(directory, name))
+        if signature is not None:
+            signatures.append((name, *signature))
+    return scan_audience_exports(directory, tuple(signatures))
+
+def audience_sources(file_path: str) -> list:
+    """The data file this session shows first, then the other exports found in AUDIENCE_DIR"""
+    seen = {os.path.realpath(file_path)}
+    sources = [file_path]
+    for path in find_audience_exports():
+        if os.path.realpath(path) not in seen:
+            seen.add(os.path.realpath(path))
+            sources.append(path)
+    return sources
+
+@st.cache_resource(show_spinner=False)
+def get_audience_workspace() -> audiences.Workspace:
+    """Loaded audiences shared by every session; each distinct control group is held once"""
+    return audiences.Workspace()
+
+def audience_versions(sources: list, file_path: str, version: str) -> tuple:
+    """Cache key per export: the session file's content version, (mtime, size) for the others"""
+    return tuple(version if path == file_path else data_watch.file_signature(path) for path in sources)
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def get_audience_matrix(file_paths: tuple, versions: tuple) -> audiences.AudienceMatrix:
+    """Aligned (audience x item) matrix over one version of each export"""
+    workspace = get_audience_workspace()
+    loaded, names = [], []
+    with perf.phase("load audiences"):
+        for file_path, version in zip(file_paths, versions):
+            audience = workspace.load(file_path, version if isinstance(version, str) else None)
+            name = audience.name
+            if name in names:
+                name = f"{name} ({os.path.basename(file_path)})"
+            loaded.append(audience)
+            names.append(name)
+    with perf.phase("build audience matrix"):
+        return audiences.AudienceMatrix.from_audiences(loaded, names)
+
+def section_pattern_matches(section_names, pattern: str) -> list:
+    """Sections matching a case-insensitive substring, or a glob when the pattern has * or ?"""
+    pattern = pattern.strip().lower()
+    if any(ch in pattern for ch in '*?['):
+        return [name for name in section_names if fnmatchcase(name.lower(), pattern)]
+    return [name for name in section_names if pattern in name.lower()]
+
+@st.cache_resource(show_spinner=False)
+def get_leaderboard(file_path: str, version: str) -> dict:
+    """Cross-section leaderboard of one data version, pre-sorted by every ranking"""
+    datasets = get_datasets(file_path, version) or {}
+    with perf.phase("build leaderboard"):
+        return build_leaderboard(datasets)
+
+@st.cache_resource(show_spinner=False, max_entries=256)
+def get_leaderboard_positions(file_path: str, version: str, ranking: str, categories: tuple,
+                              section_pattern: str, min_base: int) -> np.ndarray:
+    """Rows of the leaderboard passing the filters, in ranking order"""
+    leaderboard = get_leaderboard(file_path, version)
+    table = leaderboard['table']
+    order = leaderboard['orders'][ranking]
+    mask = np.ones(len(table), dtype=bool)
+    if categories:
+        mask &= table['Category'].isin(categories).to_numpy()
+    if section_pattern.strip():
+        mask &= table['Section'].isin(section_pattern_matches(table['Section'].cat.categories, section_pattern)).to_numpy()
+    if min_base > 0:
+        mask &= (table['Target base'] >= min_base).to_numpy()
+    return order[mask[order]]
+
+def iter_csv_chunks(df: pd.DataFrame, chunk_rows: int = CSV_CHUNK_ROWS):
+    """Yield the frame as UTF-8 CSV bytes, header first, chunk_rows rows at a time"""
+    yield df.head(0).to_csv(index=False).encode('utf-8')
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=False).encode('utf-8')
+
+def build_csv(df: pd.DataFrame) -> bytes:
+    """Assemble the chunked CSV export"""
+    buffer = io.BytesIO()
+    for chunk in iter_csv_chunks(df):
+        buffer.write(chunk)
+    return buffer.getvalue()
+
+@st.cache_resource(show_spinner=False, max_entries=256)
+def get_section_view(section_name: str, metric: str, top_n: int, min_index: int,
+                     file_path: str, section_version: str):
+    """Filtered section data plus the Comparison, Index and Scatter figures for one view"""
+    section_data = get_watcher(file_path).section(section_name, section_version)
+    if section_data is None:
+        return None
+    df = section_data['data']
+    
+    with perf.phase("section filtering"):
+        df_display = filter_section_rows(df, min_index)
+    
+    question = section_data['question']
+    with perf.phase("figure: comparison"):
+        comparison_fig, comparison_data = create_comparison_chart(df_display, section_name, top_n, metric, question)
+    with perf.phase("figure: index"):
+        index_fig, index_data = create_index_chart(df_display, section_name, top_n, question)
+    with perf.phase("figure: scatter"):
+        scatter_fig, scatter_data = create_scatter_chart(df_display, section_name, question)
+    
+    return {
+        'df_display': df_display,
+        'has_data': len(df[(df['Target percent'].notna()) & (df['Target percent'] > 0)]) > 0,
+        'comparison': (comparison_fig, comparison_data),
+        'index': (index_fig, index_data),
+        'scatter': (scatter_fig, scatter_data),
+    }
+
+def warm_up(file_path: str = DATA_FILE):
+    """Build the data, both insight pages, the leaderboard, the affinity heatmap, the search index
+    and the default view ahead of the first request,
+    then keep watching the file for changes"""
+    watcher = get_watcher(file_path)
+    snapshot = watcher.snapshot()
+    get_ai_summary(file_path, snapshot.version)
+    get_cultural_summary(file_path, snapshot.version)
+    get_leaderboard(file_path, snapshot.version)
+    get_affinity_matrix(file_path, snapshot.version)
+    get_search_index(file_path, snapshot.version)
+    get_section_view(DEFAULT_SECTION, DEFAULT_METRIC, DEFAULT_TOP_N, DEFAULT_MIN_INDEX,
+                     file_path, snapshot.section_versions.get(DEFAULT_SECTION))
+    watcher.start_polling()
+
+@st.cache_resource(show_spinner=False)
+def start_warm_up(file_path: str = DATA_FILE) -> threading.Thread:
+    """Start the warm-up once per server process in a background thread"""
+    thread = threading.Thread(target=warm_up, args=(file_path,), name="dashboard-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+def select_data_source() -> str:
+    """Sidebar upload panel; returns the data file this session should show"""
+    with st.sidebar.expander("📤 Use your own export", expanded='upload_digest' in st.session_state):
+        uploaded = st.file_uploader("YouGov Profiles+ CSV export", type=['csv'])
+        if uploaded is None:
+            st.session_state.pop('upload_digest', None)
+            st.session_state.pop('upload_file_id', None)
+            st.caption("Showing the bundled Hilton Deep Divers export.")
+            return DATA_FILE
+        
+        # Hash the bytes only when a new file arrives, or when the upload was evicted
+        store = get_upload_store()
+        file_id = getattr(uploaded, 'file_id', None) or getattr(uploaded, 'id', None)
+        upload = None
+        if st.session_state.get('upload_file_id') == file_id:
+            upload = store.get(st.session_state.get('upload_digest'))
+        if upload is None:
+            with perf.phase("upload: hash + submit"):
+                upload = store.submit(uploaded.getvalue(), uploaded.name)
+            st.session_state['upload_file_id'] = file_id
+            st.session_state['upload_digest'] = upload.digest
+        
+        # Small files are usually parsed within a moment; don't block on big ones
+        wait([upload.future], timeout=2)
+        if not upload.ready:
+            st.info(f"Parsing {upload.name}... showing the bundled data until it is ready.")
+            st.button("🔄 Check again")
+            return DATA_FILE
+        if upload.error:
+            st.error(f"Could not read {upload.name}: {upload.error}")
+            return DATA_FILE
+        st.success(f"Showing {upload.name}")
+        return upload.path
+
+def perf_enabled() -> bool:
+    """Instrumentation is on with ?perf=1 in the URL or DASHBOARD_PERF=1 in the environment"""
+    if perf.env_enabled():
+        return True
+    # st.query_params replaced st.experimental_get_query_params in newer Streamlit
+    if hasattr(st, 'query_params'):
+        return perf.flag_enabled(st.query_params.get('perf'))
+    return perf.flag_enabled(st.experimental_get_query_params().get('perf'))
+
+def show_chart(fig, name: str):
+    """st.plotly_chart, timed and with its JSON payload size recorded when instrumented"""
+    if isinstance(fig, dict):
+        # Plotly's validation pops and restores each trace's 'type', so concurrent
+        # sessions must not hand it the same cached trace dicts
+        fig = {**fig, 'data': [dict(trace) for trace in fig['data']]}
+    with perf.phase(f"render: {name}"):
+        st.plotly_chart(fig, use_container_width=True)
+    if perf.current() is not None:
+        perf.add_payload(f"chart: {name}", len(pio.to_json(fig, validate=False)))
+
+def show_dataframe(df: pd.DataFrame, name: str, **kwargs):
+    """st.dataframe, timed and with the frame's in-memory size recorded when instrumented"""
+    with perf.phase(f"render: {name}"):
+        st.dataframe(df, **kwargs)
+    if perf.current() is not None:
+        perf.add_payload(f"table: {name}", df.memory_usage(index=True, deep=True).sum())
+
+def render_perf_panel(recorder: perf.RerunTimings):
+    """Show this rerun's timings in a collapsible sidebar panel and append them to the log"""
+    record = recorder.to_record()
+    log_path = recorder.append_to_log()
+    with st.sidebar.expander(f"⏱️ Performance ({record['total_ms']:.0f} ms)", expanded=False):
+        st.caption(f"View: {record['view']} | Payload: {record['payload_bytes'] / 1024:.1f} KB | Log: {log_path}")
+        phases = pd.DataFrame([
+            {'Phase': '\u2003' * p['depth'] + p['phase'], 'ms': p['ms']}
+            for p in record['phases']
+        ])
+        if not phases.empty:
+            st.dataframe(phases, use_container_width=True, hide_index=True)
+        if record['payloads']:
+            payloads = pd.DataFrame(record['payloads']).rename(columns={'payload': 'Payload', 'bytes': 'Bytes'})
+            st.dataframe(payloads, use_container_width=True, hide_index=True)
+
 def create_comparison_chart(df, section_name, top_n=10, metric='Index', question=None):
     """Create a comparison chart between Target and Control"""
     # Filter and sort
@@ -103,6 +580,16 @@ def create_comparison_chart(df, section_name, top_n=10, metric='Index', question
     if df_sorted.empty:
         return None, None
     
+    if FAST_FIGURES:
+        fig = fast_figures.comparison_chart(
+            df_sorted['Response label'].tolist(),
+            df_sorted['Target percent'].to_numpy(),
+            df_sorted['Control percent'].to_numpy(),
+            f"Top {top_n} by {title_metric}",
+            max(400, len(df_sorted) * 40)
+        )
+        return fig, df_sorted
+    
     fig = go.Figure()
     
     fig.add_trace(go.Bar(
@@ -146,6 +633,17 @@ def create_index_chart(df, section_name, top_n=15, question=None):
     if df_sorted.empty:
         return None, None
     
+    if FAST_FIGURES:
+        fig = fast_figures.index_chart(
+            df_sorted['Response label'].tolist(),
+            df_sorted['Index'].to_numpy(),
+            df_sorted['Target percent'].to_numpy(),
+            df_sorted['Control percent'].to_numpy(),
+            f"Index Analysis (Top {top_n})",
+            max(500, len(df_sorted) * 35)
+        )
+        return fig, df_sorted
+    
     colors = ['#0066CC' if idx >= 120 else '#66B2FF' if idx >= 100 else '#CCE5FF' 
               for idx in df_sorted['Index']]
     
@@ -173,6 +671,54 @@ def create_index_chart(df, section_name, top_n=15, question=None):
     
     return fig, df_sorted
 
+def downsample_scatter(df, max_points=SCATTER_MAX_POINTS, keep_top=SCATTER_KEEP_TOP):
+    """Thin a large scatter to at most max_points rows while preserving its density.
+
+    The top keep_top rows by Index are always kept. The rest are binned on a
+    Control x Target grid and each occupied cell keeps a share of its rows
+    proportional to its size (at least one), spread evenly over the cell's
+    Index range, so dense regions stay dense and sparse outliers survive.
+    """
+    if len(df) <= max_points:
+        return df
+    keep_top = min(keep_top, max_points)
+    order = np.argsort(-df['Index'].to_numpy(), kind='stable')
+    top_positions = order[:keep_top]
+    rest_positions = order[keep_top:]
+    budget = max_points - keep_top
+    if budget <= 0 or len(rest_positions) == 0:
+        return df.iloc[np.sort(top_positions)]
+    
+    # At most budget/4 cells, so one row per cell never exceeds the budget
+    grid = max(1, int(np.sqrt(budget / 4)))
+    x = df['Control percent'].to_numpy(dtype=float)[rest_positions]
+    y = df['Target percent'].to_numpy(dtype=float)[rest_positions]
+    def to_bins(values):
+        span = values.max() - values.min()
+        if span <= 0:
+            return np.zeros(len(values), dtype=np.int64)
+        return np.minimum(((values - values.min()) / span * grid).astype(np.int64), grid - 1)
+    cells = to_bins(x) * grid + to_bins(y)
+    
+    # rest_positions is already in descending Index order, so a stable sort by
+    # cell gives each cell's rows ranked by Index
+    by_cell = np.argsort(cells, kind='stable')
+    sorted_cells = cells[by_cell]
+    cell_ids, cell_starts, cell_counts = np.unique(sorted_cells, return_index=True, return_counts=True)
+    n_cells = len(cell_ids)
+    ratio = (budget - n_cells) / max(len(rest_positions) - n_cells, 1)
+    quotas = 1 + np.floor((cell_counts - 1) * min(ratio, 1.0)).astype(np.int64)
+    
+    # Keep rank r of a cell with count c and quota q when floor(r*q/c) steps up,
+    # which picks q rows evenly spaced through the cell
+    cell_index = np.repeat(np.arange(n_cells), cell_counts)
+    ranks = np.arange(len(sorted_cells)) - cell_starts[cell_index]
+    counts = cell_counts[cell_index]
+    quota = quotas[cell_index]
+    keep = (ranks * quota) // counts != ((ranks - 1) * quota) // counts
+    sampled = rest_positions[by_cell[keep]]
+    return df.iloc[np.sort(np.concatenate([top_positions, sampled]))]
+
 def create_scatter_chart(df, section_name, question=None):
     """Create scatter plot of Target vs Control with Index coloring"""
     df_filtered = df[
@@ -185,8 +731,31 @@ def create_scatter_chart(df, section_name, question=None):
     if df_filtered.empty:
         return None, None
     
+    # Large sections: plot a bounded, density-preserving sample and draw it with
+    # WebGL; the full filtered data is still returned for insights and tables
+    df_plot = downsample_scatter(df_filtered)
+    webgl = len(df_plot) > SCATTER_WEBGL_POINTS
+    title = "Target vs Control Comparison"
+    if len(df_plot) < len(df_filtered):
+        title += f" (showing {len(df_plot):,} of {len(df_filtered):,} labels)"
+    max_val = max(df_filtered['Control percent'].max(), df_filtered['Target percent'].max())
+    
+    if FAST_FIGURES:
+        fig = fast_figures.scatter_chart(
+            df_plot['Response label'].tolist(),
+            df_plot['Target percent'].to_numpy(),
+            df_plot['Control percent'].to_numpy(),
+            df_plot['Index'].to_numpy(),
+            df_plot['Diff'].to_numpy(),
+            max_val,
+            title=title,
+            webgl=webgl
+        )
+        return fig, df_filtered
+    
+    import plotly.express as px  # ~85 ms to import; only the graph_objects fallback needs it
     fig = px.scatter(
-        df_filtered,
+        df_plot,
         x='Control percent',
         y='Target percent',
         size='Index',
@@ -200,11 +769,11 @@ def create_scatter_chart(df, section_name, question=None):
             'Target percent': 'Hilton Deep Divers (%)',
             'Index': 'Index'
         },
-        title=f"Target vs Control Comparison"
+        title=title,
+        render_mode='webgl' if webgl else 'svg'
     )
     
     # Add diagonal line (y=x)
-    max_val = max(df_filtered['Control percent'].max(), df_filtered['Target percent'].max())
     fig.add_trace(go.Scatter(
         x=[0, max_val],
         y=[0, max_val],
@@ -383,11 +952,7 @@ def analyze_all_data_for_ai_summary(datasets: Dict) -> pd.DataFrame:
 
 def get_item_category(section_name: str) -> str:
     """Get category for a section"""
-    category_mapping = get_category_mapping()
-    for cat, keywords in category_mapping.items():
-        if any(kw.lower() in section_name.lower() for kw in keywords):
-            return cat
-    return 'Other'
+    return get_section_category(section_name)
 
 def generate_ai_insights(df_all: pd.DataFrame, datasets: Dict) -> list:
     """Generate 10 strategic insights based on comprehensive data analysis"""
@@ -543,6 +1108,9 @@ def create_insight_chart(chart_data: pd.DataFrame, chart_type: str, insight_data
     if chart_data is None or chart_data.empty:
         return None
     
+    if FAST_FIGURES:
+        return create_insight_chart_fast(chart_data, chart_type)
+    
     if chart_type in ['hotels', 'skincare', 'destinations', 'sports', 'digital', 'seasonal', 'travel', 'q2', 'personality']:
         fig = go.Figure()
         
@@ -603,7 +1171,27 @@ def create_insight_chart(chart_data: pd.DataFrame, chart_type: str, insight_data
     
     return None
 
-def render_ai_summary(datasets: Dict):
+def create_insight_chart_fast(chart_data: pd.DataFrame, chart_type: str):
+    """create_insight_chart built through the low-overhead fast_figures layer"""
+    if chart_type in ['hotels', 'skincare', 'destinations', 'sports', 'digital', 'seasonal', 'travel', 'q2', 'personality']:
+        return fast_figures.insight_index_chart(
+            chart_data['item'].tolist(),
+            chart_data['index'].to_numpy(),
+            chart_data['target_pct'].to_numpy(),
+            chart_data['control_pct'].to_numpy(),
+            max(400, len(chart_data) * 40)
+        )
+    
+    elif chart_type == 'gap':
+        return fast_figures.gap_chart(
+            chart_data['Category'].tolist(),
+            chart_data['Average Index'].to_numpy(),
+            chart_data['Count'].to_numpy()
+        )
+    
+    return None
+
+def render_ai_summary(file_path: str = DATA_FILE, version: str = None):
     """Render the AI Summary page"""
     st.markdown('<div class="main-header">🤖 AI Strategic Analysis</div>', unsafe_allow_html=True)
     st.markdown("""
@@ -613,10 +1201,9 @@ def render_ai_summary(datasets: Dict):
     </div>
     """, unsafe_allow_html=True)
     
-    # Analyze all data
+    # Analyze all data (usually already built by the warm-up thread)
     with st.spinner("Analyzing all data for strategic insights..."):
-        df_all = analyze_all_data_for_ai_summary(datasets)
-        insights = generate_ai_insights(df_all, datasets)
+        insights, figures = get_ai_summary(file_path, version or get_snapshot(file_path).version)
     
     if not insights:
         st.warning("Unable to generate insights. Please check the data.")
@@ -640,7 +1227,7 @@ def render_ai_summary(datasets: Dict):
     # 10 Strategic Insights
     st.markdown("## 💡 10 Strategic Insights for Q2 2025")
     
-    for i, insight in enumerate(insights[:10], 1):
+    for i, (insight, fig) in enumerate(zip(insights[:10], figures), 1):
         st.markdown(f"### Insight {i}: {insight['title']}")
         
         st.markdown(f"""
@@ -651,38 +1238,38 @@ def render_ai_summary(datasets: Dict):
         """, unsafe_allow_html=True)
         
         # Add chart if available
-        if insight.get('chart_data') is not None and not insight['chart_data'].empty:
-            fig = create_insight_chart(insight['chart_data'], insight['chart_type'], insight)
-            if fig:
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # For gap chart, also show examples
-                if insight['chart_type'] == 'gap' and 'high_examples' in insight and 'low_examples' in insight:
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.markdown("**Top High Affinity Examples:**")
-                        st.dataframe(
-                            insight['high_examples'].rename(columns={
-                                'item': 'Item',
-                                'index': 'Index',
-                                'target_pct': 'Target %',
-                                'control_pct': 'Control %'
-                            }),
-                            use_container_width=True,
-                            hide_index=True
-                        )
-                    with col2:
-                        st.markdown("**Top Under-indexing Examples:**")
-                        st.dataframe(
-                            insight['low_examples'].rename(columns={
-                                'item': 'Item',
-                                'index': 'Index',
-                                'target_pct': 'Target %',
-                                'control_pct': 'Control %'
-                            }),
-                            use_container_width=True,
-                            hide_index=True
-                        )
+        if fig:
+            show_chart(fig, f"insight {i} ({insight['chart_type']})")
+            
+            # For gap chart, also show examples
+            if insight['chart_type'] == 'gap' and 'high_examples' in insight and 'low_examples' in insight:
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.markdown("**Top High Affinity Examples:**")
+                    show_dataframe(
+                        insight['high_examples'].rename(columns={
+                            'item': 'Item',
+                            'index': 'Index',
+                            'target_pct': 'Target %',
+                            'control_pct': 'Control %'
+                        }),
+                        "high affinity examples",
+                        use_container_width=True,
+                        hide_index=True
+                    )
+                with col2:
+                    st.markdown("**Top Under-indexing Examples:**")
+                    show_dataframe(
+                        insight['low_examples'].rename(columns={
+                            'item': 'Item',
+                            'index': 'Index',
+                            'target_pct': 'Target %',
+                            'control_pct': 'Control %'
+                        }),
+                        "under-indexing examples",
+                        use_container_width=True,
+                        hide_index=True
+                    )
         
         if i < 10:
             st.markdown("---")
@@ -836,6 +1423,9 @@ def create_cultural_chart(chart_data, chart_type: str):
     if chart_data is None or (isinstance(chart_data, pd.DataFrame) and chart_data.empty):
         return None
     
+    if FAST_FIGURES:
+        return create_cultural_chart_fast(chart_data, chart_type)
+    
     if chart_type == 'hotels_destinations_scatter':
         fig = go.Figure()
         
@@ -949,6 +1539,7 @@ def create_cultural_chart(chart_data, chart_type: str):
     
     elif chart_type == 'hobbies_scatter':
         top_15 = chart_data.head(15)
+        import plotly.express as px
         fig = px.scatter(
             top_15,
             x='control_pct',
@@ -1067,7 +1658,124 @@ def create_cultural_chart(chart_data, chart_type: str):
     
     return None
 
-def render_cultural_insights(datasets: Dict):
+def create_affinity_heatmap(matrix: pd.DataFrame, order_by: str):
+    """Heatmap of every section's affinity statistics, sections grouped by category and ordered by order_by"""
+    matrix = order_affinity_sections(matrix, order_by)
+    percentiles = affinity_percentiles(matrix).to_numpy()
+    values = matrix[AFFINITY_STATS].to_numpy(dtype=float)
+    title = f'Section Affinity by Category (ordered by {order_by})'
+    if FAST_FIGURES:
+        return fast_figures.affinity_heatmap(matrix['Category'].tolist(), matrix['Section'].tolist(), AFFINITY_STATS,
+                                             values, percentiles, matrix['Items'].to_numpy(), title)
+    
+    text = [[f"{val * 100:.0f}%" if stat == 'High-affinity share' else f"{val:.0f}"
+             for stat, val in zip(AFFINITY_STATS, row)] for row in values]
+    fig = go.Figure(go.Heatmap(
+        z=percentiles,
+        x=AFFINITY_STATS,
+        y=[matrix['Category'].tolist(), matrix['Section'].tolist()],
+        colorscale='RdBu',
+        zmin=0,
+        zmax=1,
+        text=text,
+        texttemplate='%{text}',
+        customdata=[[f"{section} ({count:.0f} items)"] * len(AFFINITY_STATS)
+                    for section, count in zip(matrix['Section'], matrix['Items'])],
+        hovertemplate='<b>%{customdata}</b><br>%{x}: %{text}<br>Percentile among sections: %{z:.0%}<extra></extra>',
+        colorbar=dict(title='Percentile among sections', tickformat='.0%')
+    ))
+    fig.update_layout(
+        title=dict(text=title, automargin=True),
+        xaxis_side='top',
+        xaxis_automargin=True,
+        yaxis_autorange='reversed',
+        yaxis_automargin=True,
+        height=max(400, 24 * len(matrix) + 160)
+    )
+    return fig
+
+def create_audience_chart(table: pd.DataFrame, metric: str, section_name: str):
+    """Grouped bars of one section's labels, one colour per audience"""
+    title = f'{section_name}: {metric} by Audience'
+    hoverformat = '+.0f' if metric == 'Rank shift' else '.1f'
+    height = max(400, len(table) * (10 * len(table.columns) + 12) + 160)
+    if FAST_FIGURES:
+        return fast_figures.audience_bars(table.index.tolist(), table.columns.tolist(), table.to_numpy().T,
+                                          title, metric, hoverformat, height)
+    
+    fig = go.Figure()
+    for audience in table.columns:
+        fig.add_trace(go.Bar(
+            y=table.index.tolist(),
+            x=table[audience].to_numpy(dtype=float),
+            name=audience,
+            orientation='h',
+            hovertemplate=f'<b>%{{y}}</b><br>{audience}: %{{x:{hoverformat}}}<extra></extra>'
+        ))
+    fig.update_layout(
+        title=title,
+        xaxis_title=metric,
+        yaxis_autorange='reversed',
+        barmode='group',
+        height=height,
+        legend=dict(orientation='h', y=-0.15)
+    )
+    return fig
+
+def create_cultural_chart_fast(chart_data, chart_type: str):
+    """create_cultural_chart built through the low-overhead fast_figures layer"""
+    if chart_type == 'hotels_destinations_scatter':
+        hotels = chart_data['hotels']
+        destinations = chart_data['destinations']
+        max_val = max(hotels['target_pct'].max(), hotels['control_pct'].max(), 
+                     destinations['target_pct'].max(), destinations['control_pct'].max())
+        groups = [
+            {
+                'item': group['item'].tolist(),
+                'index': group['index'].to_numpy(),
+                'target': group['target_pct'].to_numpy(),
+                'control': group['control_pct'].to_numpy()
+            }
+            for group in (hotels, destinations)
+        ]
+        return fast_figures.hotels_destinations_chart(groups[0], groups[1], max_val)
+    
+    if chart_type == 'pattern_heatmap':
+        return fast_figures.pattern_chart(
+            chart_data.index.tolist(),
+            chart_data['Avg Index'].to_numpy(),
+            chart_data['Item Count'].to_numpy()
+        )
+    
+    # Remaining chart types show the top rows of an item table
+    top_count = {'sports_categories': 12, 'hobbies_scatter': 15}.get(chart_type, 10)
+    top = chart_data.head(top_count)
+    labels = top['item'].tolist()
+    index_values = top['index'].to_numpy()
+    target = top['target_pct'].to_numpy()
+    control = top['control_pct'].to_numpy()
+    
+    if chart_type == 'travel_heatmap':
+        return fast_figures.travel_heatmap_chart(labels, index_values, target, control, max(500, len(top) * 50))
+    
+    elif chart_type in ['spring_comparison', 'beliefs_comparison', 'rejections_bar']:
+        return fast_figures.cultural_comparison_chart(labels, target, control, max(500, len(top) * 50))
+    
+    elif chart_type == 'hobbies_scatter':
+        max_val = max(top['target_pct'].max(), top['control_pct'].max())
+        return fast_figures.hobbies_scatter_chart(labels, target, control, index_values, max_val)
+    
+    elif chart_type == 'sports_categories':
+        return fast_figures.scaled_index_chart(labels, index_values, target, control,
+                                               'Sports & Leagues: Interest Levels', 'Viridis', max(500, len(top) * 40))
+    
+    elif chart_type in ['music_events', 'brands_multi']:
+        return fast_figures.scaled_index_chart(labels, index_values, target, control,
+                                               'Top Items by Index', 'Blues', max(500, len(top) * 45))
+    
+    return None
+
+def render_cultural_insights(file_path: str = DATA_FILE, version: str = None):
     """Render the Deep Cultural Insights page"""
     st.markdown('<div class="main-header">🔍 Deep Cultural Insights</div>', unsafe_allow_html=True)
     st.markdown("""
@@ -1078,17 +1786,16 @@ def render_cultural_insights(datasets: Dict):
     </div>
     """, unsafe_allow_html=True)
     
-    # Analyze all data
+    # Analyze all data (usually already built by the warm-up thread)
     with st.spinner("Analizando datos para insights culturales profundos..."):
-        df_all = analyze_all_data_for_ai_summary(datasets)
-        insights = generate_cultural_insights(df_all, datasets)
+        insights, figures = get_cultural_summary(file_path, version or get_snapshot(file_path).version)
     
     if not insights:
         st.warning("No se pudieron generar insights. Por favor verifica los datos.")
         return
     
     # Display insights
-    for i, insight in enumerate(insights, 1):
+    for i, (insight, fig) in enumerate(zip(insights, figures), 1):
         st.markdown(f"### {i}. {insight['title']}")
         
         st.markdown(f"""
@@ -1098,10 +1805,8 @@ def render_cultural_insights(datasets: Dict):
         """, unsafe_allow_html=True)
         
         # Add chart
-        if insight.get('chart_data') is not None:
-            fig = create_cultural_chart(insight['chart_data'], insight['chart_type'])
-            if fig:
-                st.plotly_chart(fig, use_container_width=True)
+        if fig:
+            show_chart(fig, f"insight {i} ({insight['chart_type']})")
         
         if i < len(insights):
             st.markdown("---")
@@ -1112,30 +1817,231 @@ def render_cultural_insights(datasets: Dict):
         st.session_state['view'] = 'dashboard'
         st.rerun()
 
+def render_leaderboard(file_path: str = DATA_FILE, version: str = None):
+    """Render the cross-section Leaderboard page"""
+    st.markdown('<div class="main-header">🏆 Leaderboard</div>', unsafe_allow_html=True)
+    st.markdown("""
+    <div style="text-align: center; color: #666; margin-bottom: 2rem;">
+        <p style="font-size: 1.1rem;">Every response label across all sections, ranked</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    version = version or get_snapshot(file_path).version
+    leaderboard = get_leaderboard(file_path, version)
+    table = leaderboard['table']
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        ranking = st.selectbox(
+            "Rank by", LEADERBOARD_RANKINGS,
+            help=f"Adjusted Index shrinks Index towards 100 for small target bases "
+                 f"(weight = base / (base + {RELIABILITY_PRIOR}))"
+        )
+    with col2:
+        categories = st.multiselect("Categories", sorted(table['Category'].cat.categories) if len(table) else [])
+    with col3:
+        section_pattern = st.text_input("Section contains", help="Case-insensitive; use * and ? for wildcards")
+    with col4:
+        min_base = int(st.number_input("Minimum target base", min_value=0, value=0, step=5))
+    
+    with perf.phase("leaderboard filter"):
+        positions = get_leaderboard_positions(file_path, version, ranking, tuple(sorted(categories)),
+                                              section_pattern, min_base)
+    total_rows = len(positions)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox("Rows per page", TABLE_PAGE_SIZES, index=1, key="leaderboard_page_size")
+    page_count = max(1, -(-total_rows // page_size))
+    with col2:
+        page = st.number_input(
+            f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1,
+            key=f"leaderboard_page_{ranking}_{categories}_{section_pattern}_{min_base}_{page_size}"
+        )
+    start = (page - 1) * page_size
+    page_rows = table.iloc[positions[start:start + page_size]]
+    page_rows = page_rows.assign(Rank=np.arange(start + 1, start + len(page_rows) + 1))[
+        ['Rank', 'Response label', 'Section', 'Category', 'Index', 'Adjusted Index',
+         'Target percent', 'Control percent', 'Diff', 'Target base']]
+    
+    show_dataframe(
+        page_rows,
+        "leaderboard",
+        use_container_width=True,
+        hide_index=True,
+        height=400
+    )
+    st.caption(f"Rows {min(start + 1, total_rows):,}–{start + len(page_rows):,} of {total_rows:,} "
+               f"({len(table):,} items in {table['Section'].nunique() if len(table) else 0} sections)")
+    
+    # Back to Dashboard button
+    st.markdown("---")
+    if st.button("← Back to Dashboard", type="primary"):
+        st.session_state['view'] = 'dashboard'
+        st.rerun()
+
+def render_affinity_heatmap(file_path: str = DATA_FILE, version: str = None):
+    """Render the whole-dataset Affinity Heatmap page: every section's statistics, grouped by category"""
+    st.markdown('<div class="main-header">🗺️ Affinity Heatmap</div>', unsafe_allow_html=True)
+    st.markdown("""
+    <div style="text-align: center; color: #666; margin-bottom: 2rem;">
+        <p style="font-size: 1.1rem;">How strongly every section over-indexes, grouped by category</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    version = version or get_snapshot(file_path).version
+    matrix = get_affinity_matrix(file_path, version)
+    if matrix.empty:
+        st.warning("No Index values to summarise.")
+    else:
+        order_by = st.radio("Order sections by", AFFINITY_STATS, horizontal=True,
+                            help="Sections stay grouped by category. Colours show each section's percentile "
+                                 "among all sections on a statistic; High-affinity share is the fraction of a "
+                                 "section's items with Index ≥ 120")
+        with perf.phase("affinity heatmap"):
+            fig = create_affinity_heatmap(matrix, order_by)
+        show_chart(fig, "affinity heatmap")
+        
+        with st.expander("📋 Summary table"):
+            show_dataframe(
+                matrix.round({'Mean Index': 1, 'Median Index': 1}).assign(
+                    **{'High-affinity share': (matrix['High-affinity share'] * 100).round(1)}
+                ).rename(columns={'High-affinity share': 'High-affinity share (%)'}),
+                "affinity table",
+                use_container_width=True,
+                hide_index=True
+            )
+    
+    # Back to Dashboard button
+    st.markdown("---")
+    if st.button("← Back to Dashboard", type="primary"):
+        st.session_state['view'] = 'dashboard'
+        st.rerun()
+
+def render_audience_comparison(file_path: str = DATA_FILE, version: str = None):
+    """Render the audience comparison page: every export's target group side by side"""
+    st.markdown('<div class="main-header">👥 Audience Comparison</div>', unsafe_allow_html=True)
+    st.markdown("""
+    <div style="text-align: center; color: #666; margin-bottom: 2rem;">
+        <p style="font-size: 1.1rem;">The same sections and response labels across several target audiences</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    sources = audience_sources(file_path)
+    matrix = get_audience_matrix(tuple(sources), audience_versions(sources, file_path,
+                                                                   version or get_snapshot(file_path).version))
+    st.caption(" · ".join(f"**{name}**" + (f" (n={size:,})" if size else "")
+                          for name, size in zip(matrix.audiences, matrix.sizes)))
+    
+    if len(matrix.audiences) < 2:
+        st.info(f"Only one audience found. Add more Profiles+ exports to `{os.path.abspath(AUDIENCE_DIR)}` "
+                "(or point DASHBOARD_AUDIENCE_DIR at a folder of exports) to compare audiences.")
+    else:
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            metric = st.radio("Compare", AUDIENCE_METRICS, horizontal=True,
+                              help="Cross-audience index: Target % against the mean of the other audiences "
+                                   "(100 = typical)\nRank shift: places a label climbs within its section "
+                                   "against the reference audience")
+        with col2:
+            reference = st.selectbox("Reference audience", matrix.audiences, disabled=metric != 'Rank shift')
+        default_index = next((i for i, name in enumerate(matrix.section_names)
+                              if DEFAULT_SECTION.lower() in name.lower()), 0)
+        section_name = st.selectbox("Section", matrix.section_names, index=default_index)
+        
+        with perf.phase("audience comparison"):
+            if metric == 'Cross-audience index':
+                grid = matrix.cross_index()
+            elif metric == 'Rank shift':
+                grid = matrix.rank_shift(matrix.audiences.index(reference))
+            else:
+                grid = matrix.metric(metric)
+            table = matrix.section_table(section_name, grid)
+            fig = create_audience_chart(table, metric, section_name)
+        show_chart(fig, "audience comparison")
+        with st.expander("📋 Section table"):
+            show_dataframe(table.round(1).reset_index(), "audience section table", use_container_width=True,
+                           hide_index=True)
+        
+        st.markdown("### 🎯 Most distinctive audience per item")
+        st.caption("Labels where one audience's Target % stands furthest above the mean of the others; "
+                   "Lead is its margin over the runner-up's cross-audience index.")
+        distinctive = matrix.most_distinctive()
+        audience_filter = st.selectbox("Audience", ['All audiences'] + matrix.audiences)
+        if audience_filter != 'All audiences':
+            distinctive = distinctive[distinctive['Audience'] == audience_filter]
+        show_dataframe(distinctive.head(AUDIENCE_TOP_ITEMS).round(1), "most distinctive table",
+                       use_container_width=True, hide_index=True)
+    
+    # Back to Dashboard button
+    st.markdown("---")
+    if st.button("← Back to Dashboard", type="primary"):
+        st.session_state['view'] = 'dashboard'
+        st.rerun()
+
 def main():
     # Initialize session state for navigation
     if 'view' not in st.session_state:
         st.session_state['view'] = 'dashboard'
     
-    # Check if we should show AI Summary or Cultural Insights
-    if st.session_state.get('view') == 'ai_summary':
-        datasets = load_data()
-        if datasets:
-            datasets = filter_sections_with_data(datasets)
-            render_ai_summary(datasets)
-        else:
-            st.error("Could not load data. Please check the file.")
-        return
+    recorder = perf.begin_rerun(st.session_state['view'], enabled=perf_enabled())
+    file_path = select_data_source()
     
-    if st.session_state.get('view') == 'cultural_insights':
-        datasets = load_data()
-        if datasets:
-            datasets = filter_sections_with_data(datasets)
-            render_cultural_insights(datasets)
-        else:
+    # Pin this rerun to the data version current now; a reload that lands
+    # mid-rerun is picked up on the next one
+    with perf.phase("data load"):
+        version = get_snapshot(file_path).version
+    
+    # Check if we should show AI Summary, Cultural Insights, the Leaderboard, the Heatmap or Audiences
+    if st.session_state.get('view') in ('ai_summary', 'cultural_insights', 'leaderboard', 'heatmap', 'audiences'):
+        datasets = get_datasets(file_path, version)
+        if datasets is None:
             st.error("Could not load data. Please check the file.")
-        return
+        elif st.session_state.get('view') == 'ai_summary':
+            render_ai_summary(file_path, version)
+        elif st.session_state.get('view') == 'leaderboard':
+            render_leaderboard(file_path, version)
+        elif st.session_state.get('view') == 'heatmap':
+            render_affinity_heatmap(file_path, version)
+        elif st.session_state.get('view') == 'audiences':
+            render_audience_comparison(file_path, version)
+        else:
+            render_cultural_insights(file_path, version)
+    else:
+        render_dashboard(file_path, version)
     
+    if recorder is not None:
+        render_perf_panel(recorder)
+
+def jump_to_section(section_name: str, hit: dict):
+    """Search result callback: select the hit's category and section on the dashboard"""
+    category = get_item_category(section_name)
+    st.session_state['category_select'] = category if category in get_category_mapping() else 'All Categories'
+    st.session_state['section_select'] = section_name
+    st.session_state['search_hit'] = hit
+    st.session_state['view'] = 'dashboard'
+
+def render_search(file_path: str, version: str, datasets: Dict):
+    """Sidebar search box; results jump straight to their section"""
+    query = st.sidebar.text_input("🔎 Search labels, sections and questions", key='search_query',
+                                  placeholder="e.g. Lush, skiing, Marriott")
+    if not query.strip():
+        return
+    with perf.phase("search"):
+        hits = [hit for hit in get_search_index(file_path, version).search(query, SEARCH_RESULTS)
+                if hit['section'] in datasets]
+    if not hits:
+        st.sidebar.caption("No matches.")
+        return
+    for i, hit in enumerate(hits):
+        icon = {'label': '🏷️', 'section': '📂', 'question': '❓'}[hit['kind']]
+        detail = f" · Index {hit['index']:.0f}" if hit['index'] is not None else ''
+        label = hit['text'] if hit['kind'] == 'section' else f"{hit['text'][:60]} — {hit['section']}{detail}"
+        st.sidebar.button(f"{icon} {label}", key=f"search_hit_{i}", use_container_width=True,
+                          on_click=jump_to_section, args=(hit['section'], hit))
+
+def render_dashboard(file_path: str = DATA_FILE, version: str = None):
+    """Render the main dashboard page"""
     # Header
     st.markdown('<div class="main-header">🏨 Hilton Deep Divers Analytics Dashboard</div>', unsafe_allow_html=True)
     st.markdown("""
@@ -1145,17 +2051,15 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
-    # Load data
+    # Load data (sections without valid data are already filtered out)
     with st.spinner("Loading data..."):
-        datasets = load_data()
+        snapshot = get_watcher(file_path).get(version) if version else get_snapshot(file_path)
+        datasets = snapshot.datasets
     
-    if not datasets:
+    if datasets is None:
         st.error("Could not load data. Please check the file.")
         return
     
-    # Filter sections with valid data
-    datasets = filter_sections_with_data(datasets)
-    
     if not datasets:
         st.error("No sections with valid data found.")
         return
@@ -1171,18 +2075,28 @@ def main():
     if st.sidebar.button("🤖 View AI Summary", type="secondary", use_container_width=True):
         st.session_state['view'] = 'ai_summary'
         st.rerun()
+    if st.sidebar.button("🏆 Leaderboard", type="secondary", use_container_width=True):
+        st.session_state['view'] = 'leaderboard'
+        st.rerun()
+    if st.sidebar.button("🗺️ Affinity Heatmap", type="secondary", use_container_width=True):
+        st.session_state['view'] = 'heatmap'
+        st.rerun()
+    if st.sidebar.button("👥 Audience Comparison", type="secondary", use_container_width=True):
+        st.session_state['view'] = 'audiences'
+        st.rerun()
     st.sidebar.markdown("---")
     
+    render_search(file_path, snapshot.version, datasets)
+    
     # Category filter
     category_mapping = get_category_mapping()
     all_categories = ['All Categories'] + list(category_mapping.keys())
     
-    # Set default category to "Lifestyle & Interests"
-    default_category_index = 0
-    if 'Lifestyle & Interests' in all_categories:
-        default_category_index = all_categories.index('Lifestyle & Interests')
+    # Set default category to "Lifestyle & Interests" (keyed so search results can select it)
+    if st.session_state.get('category_select') not in all_categories:
+        st.session_state['category_select'] = DEFAULT_CATEGORY if DEFAULT_CATEGORY in all_categories else all_categories[0]
     
-    selected_category = st.sidebar.selectbox("Select Category", all_categories, index=default_category_index)
+    selected_category = st.sidebar.selectbox("Select Category", all_categories, key='category_select')
     
     # Section filter - only show sections with data
     if selected_category == 'All Categories':
@@ -1199,16 +2113,12 @@ def main():
         st.info("Please select a different category or section.")
         return
     
-    # Set default section to "Springtime activities"
-    default_section_index = 0
-    default_section_name = "Springtime activities"
+    # Set default section to "Springtime activities" whenever the current one isn't in this category
+    if st.session_state.get('section_select') not in available_sections:
+        matching_sections = [s for s in available_sections if DEFAULT_SECTION.lower() in s.lower()]
+        st.session_state['section_select'] = matching_sections[0] if matching_sections else available_sections[0]
     
-    # Try to find exact match first
-    matching_sections = [s for s in available_sections if default_section_name.lower() in s.lower()]
-    if matching_sections:
-        default_section_index = available_sections.index(matching_sections[0])
-    
-    selected_section = st.sidebar.selectbox("Select Section", available_sections, index=default_section_index)
+    selected_section = st.sidebar.selectbox("Select Section", available_sections, key='section_select')
     
     # Metric filter
     metric_choice = st.sidebar.radio(
@@ -1218,24 +2128,35 @@ def main():
     )
     
     # Top N filter
-    top_n = st.sidebar.slider("Number of items to show", 5, 25, 10)
+    top_n = st.sidebar.slider("Number of items to show", 5, 25, DEFAULT_TOP_N)
     
     # Index threshold filter
-    min_index = st.sidebar.slider("Minimum Index", 0, 200, 120)
+    min_index = st.sidebar.slider("Minimum Index", 0, 200, DEFAULT_MIN_INDEX)
     
     # Main content
     if selected_section and selected_section in datasets:
         section_data = datasets[selected_section]
-        df = section_data['data'].copy()
         
-        # Apply index filter - show items with index >= min_index OR items with no index data
-        df_display = df[
-            (df['Index'].isna()) | (df['Index'] >= min_index) |
-            ((df['Target percent'].notna()) & (df['Target percent'] > 0))
-        ].copy()
+        # Point at the label the search jumped to
+        hit = st.session_state.get('search_hit')
+        if hit is not None and hit['section'] != selected_section:
+            st.session_state.pop('search_hit')
+        elif hit is not None and hit['kind'] == 'label':
+            note = f"🔎 **{hit['text']}**"
+            if hit['index'] is not None:
+                note += f" — Index {hit['index']:.0f}"
+                if hit['index'] < min_index:
+                    note += " (below the Minimum Index filter; it is listed in the Data Table)"
+            st.info(note)
+        
+        # Filtered data and figures for this view (shared cache across sessions)
+        with perf.phase("section view"):
+            view = get_section_view(selected_section, metric_choice, top_n, min_index,
+                                    file_path, snapshot.section_versions[selected_section])
+        df_display = view['df_display']
         
         # Check if we have data to display
-        has_data = len(df[(df['Target percent'].notna()) & (df['Target percent'] > 0)]) > 0
+        has_data = view['has_data']
         
         if not has_data:
             st.warning("This section doesn't have valid data to display.")
@@ -1255,12 +2176,13 @@ def main():
                 st.markdown(f"**Question:** {section_data['question']}")
                 st.markdown("---")
             
-            fig, chart_data = create_comparison_chart(df_display, selected_section, top_n, metric_choice, section_data['question'])
+            fig, chart_data = view['comparison']
             if fig:
-                st.plotly_chart(fig, use_container_width=True)
+                show_chart(fig, "comparison")
                 
                 # Generate and display chart-specific insights
-                chart_insights = generate_chart_insights(chart_data, "comparison")
+                with perf.phase("insight generation: comparison"):
+                    chart_insights = generate_chart_insights(chart_data, "comparison")
                 if chart_insights:
                     st.markdown("#### 💡 Chart Insights")
                     for insight in chart_insights:
@@ -1283,12 +2205,13 @@ def main():
             </div>
             """, unsafe_allow_html=True)
             
-            fig, chart_data = create_index_chart(df_display, selected_section, top_n, section_data['question'])
+            fig, chart_data = view['index']
             if fig:
-                st.plotly_chart(fig, use_container_width=True)
+                show_chart(fig, "index")
                 
                 # Generate and display chart-specific insights
-                chart_insights = generate_chart_insights(chart_data, "index")
+                with perf.phase("insight generation: index"):
+                    chart_insights = generate_chart_insights(chart_data, "index")
                 if chart_insights:
                     st.markdown("#### 💡 Chart Insights")
                     for insight in chart_insights:
@@ -1309,15 +2232,16 @@ def main():
             </div>
             """, unsafe_allow_html=True)
             
-            fig, chart_data = create_scatter_chart(df_display, selected_section, section_data['question'])
+            fig, chart_data = view['scatter']
             if fig:
-                st.plotly_chart(fig, use_container_width=True)
+                show_chart(fig, "scatter")
                 
                 # Generate and display chart-specific insights
                 # For scatter plot, use top items by Index
                 if chart_data is not None and not chart_data.empty:
-                    top_scatter = chart_data.nlargest(10, 'Index')
-                    chart_insights = generate_chart_insights(top_scatter, "scatter")
+                    with perf.phase("insight generation: scatter"):
+                        top_scatter = chart_data.nlargest(10, 'Index')
+                        chart_insights = generate_chart_insights(top_scatter, "scatter")
                     if chart_insights:
                         st.markdown("#### 💡 Chart Insights")
                         for insight in chart_insights:
@@ -1332,37 +2256,73 @@ def main():
                 st.markdown("---")
             
             st.markdown("### Detailed Data Table")
-            # Filter columns
-            display_cols = ['Response label', 'Target percent', 'Control percent', 'Index', 'Diff', 'Z-Score']
-            available_cols = [col for col in display_cols if col in df_display.columns]
+            with perf.phase("table store"):
+                table = get_section_table(selected_section, min_index, file_path,
+                                          snapshot.section_versions[selected_section])
             
-            # Sort
+            # Default sort follows the selected metric
             if metric_choice == 'Index':
-                sort_col = 'Index'
+                default_sort = 'Index'
             elif metric_choice == 'Target percent':
-                sort_col = 'Target percent'
+                default_sort = 'Target percent'
             else:
-                sort_col = 'Diff'
+                default_sort = 'Diff'
+            sortable_cols = [col for col in table.columns if col != 'Response label']
             
-            if sort_col in df_display.columns:
-                df_sorted = df_display.sort_values(sort_col, ascending=False, na_position='last')
-            else:
-                df_sorted = df_display
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                sort_col = st.selectbox(
+                    "Sort by", sortable_cols,
+                    index=sortable_cols.index(default_sort) if default_sort in sortable_cols else 0
+                )
+            with col2:
+                ascending = st.selectbox("Order", ["Descending", "Ascending"]) == "Ascending"
+            with col3:
+                page_size = st.selectbox("Rows per page", TABLE_PAGE_SIZES, index=1)
+            
+            with perf.phase("table sort"):
+                order = get_table_order(selected_section, min_index, sort_col, ascending,
+                                        file_path, snapshot.section_versions[selected_section])
+            total_rows = len(order)
+            page_count = max(1, -(-total_rows // page_size))
+            page = 1
+            if page_count > 1:
+                page = st.number_input(
+                    f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1,
+                    key=f"table_page_{selected_section}_{min_index}_{page_size}_{sort_col}_{ascending}"
+                )
+            start = (page - 1) * page_size
+            page_rows = table.iloc[order[start:start + page_size]]
             
-            st.dataframe(
-                df_sorted[available_cols],
+            show_dataframe(
+                page_rows,
+                "data table",
                 use_container_width=True,
                 height=400
             )
+            st.caption(f"Rows {min(start + 1, total_rows):,}–{start + len(page_rows):,} of {total_rows:,}")
             
-            # Download button
-            csv = df_sorted[available_cols].to_csv(index=False)
-            st.download_button(
-                label="📥 Download filtered data as CSV",
-                data=csv,
-                file_name=f"{selected_section.replace(' ', '_')}_data.csv",
-                mime="text/csv"
-            )
+            # Download button: the CSV is only generated when requested
+            file_name = f"{selected_section.replace(' ', '_')}_data.csv"
+            def export_csv():
+                return build_csv(table.iloc[order])
+            if DEFERRED_DOWNLOADS:
+                st.download_button(
+                    label="📥 Download filtered data as CSV",
+                    data=export_csv,
+                    file_name=file_name,
+                    mime="text/csv"
+                )
+            elif st.button("📄 Prepare CSV export"):
+                with perf.phase("csv export"):
+                    csv = export_csv()
+                perf.add_payload("download: csv", len(csv))
+                st.download_button(
+                    label="📥 Download filtered data as CSV",
+                    data=csv,
+                    file_name=file_name,
+                    mime="text/csv"
+                )
     else:
         st.info("Please select a section from the sidebar to view analysis.")
     
@@ -1376,5 +2336,6 @@ def main():
     """, unsafe_allow_html=True)
 
 if __name__ == "__main__":
+    start_warm_up(DATA_FILE)
     main()
 
@@ -0,0 +1,398 @@
+"""
+Comparison of several target audiences exported against the same control.
+
+A Profiles+ export holds one target group against one control group. Exports
+of different audiences usually share the control ("Nationally representative"),
+so its columns would otherwise be held once per audience. Loading an export
+splits it in two: the control rows of each section are interned in a
+ControlStore, keyed by the control group's name and size and a hash of the
+section's labels and control values, so identical control data is stored once
+and referenced by every Audience; only the target columns are kept per
+audience. A Workspace loads exports into Audiences on one shared store and
+caches both halves on disk (``DASHBOARD_AUDIENCE_CACHE``, default
+``.audience_cache``), each control block in a file of its own.
+
+An AudienceMatrix aligns audiences on (section, response label) and stores
+every target metric as a dense (audience x item) array, NaN where an audience's
+export lacks the item; control metrics are one row per distinct control group.
+Audiences that share control blocks share their item positions, so alignment
+is worked out once per block. Cross-audience statistics are whole-matrix
+operations, so another audience adds a row to each array rather than another
+pass over the sections:
+
+- cross index: an audience's Target percent against the mean of the other
+  audiences (100 = typical of the group being compared);
+- rank: an item's position within its section by Index (1 = highest), and the
+  shift of that rank against a reference audience;
+- most distinctive audience per item: the highest cross index, with its lead
+  over the runner-up.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_parser import clean_numeric_column, parse_csv_file, process_datasets, read_export_groups
+from data_watch import file_hash
+
+TARGET_METRICS = ['Target percent', 'Target count', 'Target weighted base', 'Target base',
+                  'Z-Score', 'Diff', 'Index', 'Population estimate']
+CONTROL_METRICS = ['Control percent', 'Control count', 'Control weighted base', 'Control base']
+METRICS = TARGET_METRICS + CONTROL_METRICS
+
+AUDIENCE_CACHE_ENV_VAR = 'DASHBOARD_AUDIENCE_CACHE'
+DEFAULT_AUDIENCE_CACHE = '.audience_cache'
+
+def numeric_column(df: pd.DataFrame, column: str) -> np.ndarray:
+    """A column as float64 (NaN where missing or unparseable, all NaN if the export lacks it)"""
+    if column not in df.columns:
+        return np.full(len(df), np.nan)
+    series = df[column]
+    if not pd.api.types.is_numeric_dtype(series):
+        series = clean_numeric_column(series)
+    return series.to_numpy(dtype=float)
+
+class ControlBlock:
+    """One section's control rows, shared by every audience exported against the same control"""
+
+    def __init__(self, block_id: str, control: Optional[str], control_n: Optional[int], section: str,
+                 labels, values: Dict[str, np.ndarray]):
+        self.block_id = block_id
+        self.control = control
+        self.control_n = control_n
+        self.section = section
+        self.labels = np.asarray(labels, dtype=object)
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(values.nbytes for values in self.values.values())
+
+def control_block_id(control: Optional[str], control_n: Optional[int], section: str, labels,
+                     values: Dict[str, np.ndarray]) -> str:
+    """Hash of a control group's identity and one section's labels and control values"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([control, control_n, section]).encode('utf-8'))
+    digest.update('\x1f'.join(labels).encode('utf-8'))
+    for metric in CONTROL_METRICS:
+        digest.update(np.nan_to_num(values[metric], nan=-1.0).tobytes())
+    return digest.hexdigest()[:24]
+
+class ControlStore:
+    """Interned control blocks: identical control data is held once however many exports carry it"""
+
+    def __init__(self):
+        self.blocks = {}
+        self._lock = threading.Lock()
+
+    def intern(self, control: Optional[str], control_n: Optional[int], section: str, labels,
+               values: Dict[str, np.ndarray]) -> ControlBlock:
+        block_id = control_block_id(control, control_n, section, labels, values)
+        return self.add(ControlBlock(block_id, control, control_n, section, labels, values))
+
+    def add(self, block: ControlBlock) -> ControlBlock:
+        """The stored block with this id (the given one if it is new)"""
+        with self._lock:
+            return self.blocks.setdefault(block.block_id, block)
+
+    def retain(self, block_ids):
+        """Drop every block not in block_ids"""
+        block_ids = set(block_ids)
+        with self._lock:
+            for block_id in [block_id for block_id in self.blocks if block_id not in block_ids]:
+                del self.blocks[block_id]
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(block.nbytes for block in list(self.blocks.values()))
+
+class Audience:
+    """One export's target group: its target columns plus references to the shared control blocks"""
+
+    def __init__(self, name: str, size: Optional[int], blocks: List[ControlBlock], target: Dict[str, np.ndarray]):
+        self.name = name
+        self.size = size
+        self.blocks = blocks
+        self.target = target
+
+    @classmethod
+    def from_datasets(cls, name: str, datasets: Dict, store: ControlStore, size: Optional[int] = None,
+                      control: Optional[str] = None, control_n: Optional[int] = None) -> 'Audience':
+        """Split parsed sections into shared control blocks and this audience's target columns"""
+        blocks, target = [], {metric: [] for metric in TARGET_METRICS}
+        for section_name, section_data in datasets.items():
+            df = section_data['data']
+            if 'Response label' not in df.columns:
+                continue
+            labels = df['Response label'].astype(str).tolist()
+            control_values = {metric: numeric_column(df, metric) for metric in CONTROL_METRICS}
+            blocks.append(store.intern(control, control_n, section_name, labels, control_values))
+            for metric in TARGET_METRICS:
+                target[metric].append(numeric_column(df, metric))
+        target = {metric: np.concatenate(parts) if parts else np.zeros(0) for metric, parts in target.items()}
+        return cls(name, size, blocks, target)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by this audience alone (its control blocks are shared)"""
+        return sum(values.nbytes for values in self.target.values())
+
+class Workspace:
+    """Audiences loaded from export files onto one ControlStore, cached in memory and on disk.
+
+    Audiences are addressed by the SHA-256 of their file, like uploads; a file
+    that changes replaces its previous audience, and forget(path) drops it (the
+    upload store's eviction does this). Set ``cache_dir`` to '' to keep nothing
+    on disk.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        if cache_dir is None:
+            cache_dir = os.environ.get(AUDIENCE_CACHE_ENV_VAR, DEFAULT_AUDIENCE_CACHE)
+        self.cache_dir = cache_dir
+        self.store = ControlStore()
+        self._audiences = {}
+        self._paths = {}
+        self._lock = threading.Lock()
+
+    def load(self, path: str, digest: Optional[str] = None) -> Audience:
+        """The audience of an export file (digest: its SHA-256 if already known)"""
+        if digest is None:
+            digest = file_hash(path)
+        with self._lock:
+            audience = self._audiences.get(digest)
+        if audience is None:
+            audience = self._read(digest) if self.cache_dir else None
+            if audience is None:
+                audience = self._parse(path)
+                if self.cache_dir:
+                    self._write(digest, audience)
+        with self._lock:
+            previous = self._paths.get(path)
+            if previous is not None and previous != digest:
+                self._audiences.pop(previous, None)
+            self._paths[path] = digest
+            self._audiences[digest] = audience
+        return audience
+
+    def forget(self, path: str) -> bool:
+        """Drop the audience loaded from path (unless another path has the same contents) and the control
+        blocks only it used; False if path was never loaded. The disk cache is kept"""
+        with self._lock:
+            digest = self._paths.pop(path, None)
+            if digest is None:
+                return False
+            if digest not in self._paths.values():
+                self._audiences.pop(digest, None)
+            self.store.retain(block.block_id for audience in self._audiences.values() for block in audience.blocks)
+        return True
+
+    def _parse(self, path: str) -> Audience:
+        groups = read_export_groups(path)
+        datasets = process_datasets(parse_csv_file(path))
+        name = groups['target'] or os.path.splitext(os.path.basename(path))[0]
+        return Audience.from_datasets(name, datasets, self.store, groups['target_n'],
+                                      groups['control'], groups['control_n'])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._audiences)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held in memory: every audience's target columns plus each control block once"""
+        with self._lock:
+            audiences = list(self._audiences.values())
+        return sum(audience.nbytes for audience in audiences) + self.store.nbytes
+
+    def _audience_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"audience-{digest[:24]}.npz")
+
+    def _block_path(self, block_id: str) -> str:
+        return os.path.join(self.cache_dir, f"control-{block_id}.npz")
+
+    def _write(self, digest: str, audience: Audience):
+        """Save the audience's target columns, and any control block not on disk yet (atomically)"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        for block in audience.blocks:
+            path = self._block_path(block.block_id)
+            if not os.path.exists(path):
+                meta = json.dumps({'control': block.control, 'control_n': block.control_n, 'section': block.section})
+                save_npz(path, meta=np.array(meta), labels=np.array(block.labels.tolist(), dtype=str),
+                         **{metric: values for metric, values in block.values.items()})
+        meta = json.dumps({'name': audience.name, 'size': audience.size,
+                           'blocks': [block.block_id for block in audience.blocks]})
+        save_npz(self._audience_path(digest), meta=np.array(meta), **audience.target)
+
+    def _read(self, digest: str) -> Optional[Audience]:
+        """The audience from the disk cache, or None if it (or one of its control blocks) is missing"""
+        try:
+            with np.load(self._audience_path(digest)) as data:
+                meta = json.loads(str(data['meta']))
+                target = {metric: data[metric] for metric in TARGET_METRICS}
+            blocks = []
+            for block_id in meta['blocks']:
+                block = self.store.blocks.get(block_id)
+                if block is None:
+                    with np.load(self._block_path(block_id)) as data:
+                        block_meta = json.loads(str(data['meta']))
+                        block = self.store.add(ControlBlock(
+                            block_id, block_meta['control'], block_meta['control_n'], block_meta['section'],
+                            data['labels'].tolist(), {metric: data[metric] for metric in CONTROL_METRICS}))
+                blocks.append(block)
+        except (OSError, KeyError, ValueError):
+            return None
+        return Audience(meta['name'], meta['size'], blocks, target)
+
+def save_npz(path: str, **arrays):
+    tmp_path = f"{path}.{threading.get_ident()}.tmp.npz"
+    np.savez_compressed(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+class AudienceMatrix:
+    """Metrics of N audiences over the union of their (section, response label) items"""
+
+    def __init__(self, audiences: List[str], sections, labels, values: Dict[str, np.ndarray], sizes=None,
+                 control_values: Optional[Dict[str, np.ndarray]] = None, control_of=None):
+        self.audiences = list(audiences)
+        self.sections = np.asarray(sections, dtype=object)
+        self.labels = np.asarray(labels, dtype=object)
+        self.values = values
+        self.sizes = list(sizes) if sizes is not None else [None] * len(self.audiences)
+        self.control_values = control_values or {}
+        self.control_of = np.zeros(len(self.audiences), dtype=np.int64) if control_of is None else control_of
+        self.section_names = list(dict.fromkeys(self.sections))
+        self.section_ids = pd.factorize(self.sections)[0] if len(self.sections) else np.zeros(0, dtype=np.int64)
+
+    @classmethod
+    def from_audiences(cls, audiences: List[Audience], names: Optional[List[str]] = None) -> 'AudienceMatrix':
+        """Align loaded audiences; items are in order of first appearance, once per distinct control block"""
+        names = names or [audience.name for audience in audiences]
+        blocks = list({block.block_id: block for audience in audiences for block in audience.blocks}.values())
+        if blocks:
+            item_ids, keys = pd.factorize(pd.MultiIndex.from_arrays([
+                np.concatenate([np.full(len(block), block.section, dtype=object) for block in blocks]),
+                np.concatenate([block.labels for block in blocks]),
+            ]))
+        else:
+            item_ids, keys = np.zeros(0, dtype=np.int64), pd.MultiIndex.from_arrays([[], []])
+        offsets = np.cumsum([0] + [len(block) for block in blocks])
+        block_items = {block.block_id: item_ids[offsets[i]:offsets[i + 1]] for i, block in enumerate(blocks)}
+
+        values = {metric: np.full((len(audiences), len(keys)), np.nan) for metric in TARGET_METRICS}
+        for row, audience in enumerate(audiences):
+            if audience.blocks:
+                items = np.concatenate([block_items[block.block_id] for block in audience.blocks])
+                for metric in TARGET_METRICS:
+                    values[metric][row, items] = audience.target[metric]
+
+        # Control metrics: one row per control group (name and size), shared by its audiences
+        groups = {}
+        control_of = np.array([groups.setdefault(
+            (audience.blocks[0].control, audience.blocks[0].control_n) if audience.blocks else None, len(groups))
+            for audience in audiences], dtype=np.int64)
+        control_values = {metric: np.full((len(groups), len(keys)), np.nan) for metric in CONTROL_METRICS}
+        for block in blocks:
+            group = groups[(block.control, block.control_n)]
+            for metric in CONTROL_METRICS:
+                control_values[metric][group, block_items[block.block_id]] = block.values[metric]
+        sections = keys.get_level_values(0) if len(keys) else []
+        labels = keys.get_level_values(1) if len(keys) else []
+        return cls(names, sections, labels, values, [audience.size for audience in audiences],
+                   control_values, control_of)
+
+    @classmethod
+    def from_datasets(cls, audiences: Dict[str, Dict], sizes=None) -> 'AudienceMatrix':
+        """Align {audience name: processed datasets} exported against one control into a matrix"""
+        store = ControlStore()
+        sizes = sizes or [None] * len(audiences)
+        return cls.from_audiences([Audience.from_datasets(name, datasets, store, size)
+                                   for (name, datasets), size in zip(audiences.items(), sizes)])
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(grid.nbytes for grid in self.values.values()) + sum(
+            grid.nbytes for grid in self.control_values.values())
+
+    def metric(self, name: str) -> np.ndarray:
+        """(audience x item) grid of a target or control metric (control rows repeat per audience)"""
+        if name in self.control_values:
+            return self.control_values[name][self.control_of]
+        return self.values[name]
+
+    def cross_index(self, metric: str = 'Target percent') -> np.ndarray:
+        """100 x each audience's value over the mean of the other audiences that have the item"""
+        values = self.metric(metric)
+        present = ~np.isnan(values)
+        filled = np.where(present, values, 0.0)
+        others = present.sum(axis=0) - present
+        with np.errstate(divide='ignore', invalid='ignore'):
+            other_mean = (filled.sum(axis=0) - filled) / others
+            cross = 100 * values / other_mean
+        cross[~present | (others == 0) | ~(other_mean > 0)] = np.nan
+        return cross
+
+    def ranks(self, metric: str = 'Index') -> np.ndarray:
+        """Each item's rank within its section for every audience, highest value first (NaN if missing)"""
+        values = self.metric(metric)
+        count, items = values.shape
+        flat = values.ravel()
+        missing = np.isnan(flat)
+        audience = np.repeat(np.arange(count), items)
+        section = np.tile(self.section_ids, count)
+        # One sort for every (audience, section) group; missing values sort last, ties keep item order
+        order = np.lexsort((np.tile(np.arange(items), count), np.where(missing, np.inf, -flat), section, audience))
+        group = audience[order] * (len(self.section_names) + 1) + section[order]
+        starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+        first = np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+        rank = np.empty(len(order))
+        rank[order] = np.arange(len(order)) - first + 1
+        rank[missing] = np.nan
+        return rank.reshape(count, items)
+
+    def rank_shift(self, reference: int = 0, metric: str = 'Index') -> np.ndarray:
+        """Places each item climbs (positive) or drops within its section against the reference audience"""
+        ranks = self.ranks(metric)
+        return ranks[reference] - ranks
+
+    def most_distinctive(self, metric: str = 'Target percent') -> pd.DataFrame:
+        """Per item, the audience with the highest cross index and its lead over the runner-up"""
+        cross = self.cross_index(metric)
+        columns = ['Section', 'Response label', 'Audience', 'Cross index', 'Lead', metric]
+        if len(self.audiences) < 2 or not len(self):
+            return pd.DataFrame(columns=columns)
+        filled = np.where(np.isnan(cross), -np.inf, cross)
+        best = filled.argmax(axis=0)
+        top_two = -np.sort(-filled, axis=0)[:2]
+        keep = np.isfinite(top_two[0])
+        items = np.flatnonzero(keep)
+        with np.errstate(invalid='ignore'):
+            lead = top_two[0] - top_two[1]
+        table = pd.DataFrame({
+            'Section': self.sections[items],
+            'Response label': self.labels[items],
+            'Audience': np.asarray(self.audiences, dtype=object)[best[items]],
+            'Cross index': top_two[0][items],
+            'Lead': np.where(np.isfinite(lead[items]), lead[items], np.nan),  # NaN when no runner-up
+            metric: self.metric(metric)[best[items], items],
+        }, columns=columns)
+        return table.sort_values('Cross index', ascending=False, kind='stable').reset_index(drop=True)
+
+    def section_table(self, section_name: str, grid: np.ndarray) -> pd.DataFrame:
+        """One (audience x item) grid restricted to a section, response labels down and audiences across"""
+        items = np.flatnonzero(self.sections == section_name)
+        return pd.DataFrame(grid[:, items].T, index=pd.Index(self.labels[items], name='Response label'),
+                            columns=self.audiences)
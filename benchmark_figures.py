@@ -0,0 +1,50 @@
+"""
+Benchmark figure construction: graph_objects builders vs fast_figures dict builders
+
+Usage: python benchmark_figures.py [repeats]
+"""
+import sys
+import time
+
+from test_fast_figures import load_app, build_all
+
+def time_builds(app, fast, repeats):
+    """Best and mean wall time (ms) to build every benchmarked figure once"""
+    build_all(app, fast)  # warm caches (templates, colorscales, imports)
+    runs = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        figures = build_all(app, fast)
+        runs.append((time.perf_counter() - start) * 1000)
+    return len(figures), min(runs), sum(runs) / len(runs)
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    app = load_app()
+
+    # Data loading and insight generation are shared by both paths; time them
+    # separately so the figure-only share can be reported.
+    shared_runs = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        datasets = app.filter_sections_with_data(app.load_data(app.DATA_FILE))
+        df_all = app.analyze_all_data_for_ai_summary(datasets)
+        app.generate_ai_insights(df_all, datasets)
+        app.generate_cultural_insights(df_all, datasets)
+        shared_runs.append((time.perf_counter() - start) * 1000)
+    shared_ms = min(shared_runs)
+
+    count, go_best, go_mean = time_builds(app, False, repeats)
+    _, fast_best, fast_mean = time_builds(app, True, repeats)
+    go_figures = max(go_best - shared_ms, 0.001)
+    fast_figures = max(fast_best - shared_ms, 0.001)
+
+    print(f"Figures per build: {count} ({repeats} repeats, best of)")
+    print(f"Shared data + insight generation: {shared_ms:8.1f} ms")
+    print(f"graph_objects build:              {go_best:8.1f} ms (mean {go_mean:.1f})")
+    print(f"fast_figures build:               {fast_best:8.1f} ms (mean {fast_mean:.1f})")
+    print(f"Figure construction only:         {go_figures:8.1f} ms -> {fast_figures:.1f} ms "
+          f"({go_figures / fast_figures:.1f}x faster)")
+
+if __name__ == "__main__":
+    main()
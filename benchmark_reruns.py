@@ -0,0 +1,266 @@
+"""
+Rerun-latency benchmark for app.py, driven headlessly through Streamlit's AppTest
+
+Runs main() for every category x metric x top_n x min_index combination of the
+dashboard, plus the AI Summary and Cultural Insights views, on the bundled CSV
+and on synthetic large exports (the bundled sections with every row repeated
+--scale times, jittered). Each combination is rendered twice: "cold" is its
+first rerun in the process (the file is parsed but its views are not cached),
+"warm" is an identical rerun straight after. The first rerun on each file is
+reported separately as the cold start.
+
+Timings come from a plain pass; a second pass from empty caches runs under
+tracemalloc to record allocated KB per perf phase (skip it with
+--no-allocations). Results go to --output as JSON. Budgets from
+benchmark_budgets.json are checked and the exit status is 1 if any is exceeded.
+
+Usage: python benchmark_reruns.py [--quick] [--scale 10] [--output bench_results.json]
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BUDGETS = os.path.join(HERE, 'benchmark_budgets.json')
+METRICS = ["Index", "Target percent", "Difference"]
+TARGETS = ['dashboard', 'ai_summary', 'cultural_insights']
+
+# Streamlit script that drives app.main() for the data file and view chosen in session state
+DRIVER = '''
+import sys
+sys.path.insert(0, {here!r})
+import streamlit as st
+import app
+import perf
+
+app.DATA_FILE = st.session_state['bench_data_file']
+app.main()
+st.session_state['bench_record'] = perf.current().to_record()
+'''
+
+def make_synthetic_export(source: str, path: str, scale: int, seed: int = 0) -> str:
+    """Write a Profiles+ style export whose data rows are the source's, repeated scale times with jitter"""
+    rng = random.Random(seed)
+    with open(source, 'r', encoding='utf-8-sig', newline='') as f:
+        rows = list(csv.reader(f))
+    columns = None
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        for i, row in enumerate(rows):
+            if i < 8 or not row:
+                writer.writerow(row)
+                continue
+            row_str = ','.join(row)
+            if 'Target:' in row_str and 'Control:' in row_str:
+                columns = None
+            elif row and row[0] == 'Response label':
+                columns = {name.strip(): j for j, name in enumerate(row)}
+            elif columns and len(row) >= len(columns):
+                writer.writerow(row)
+                for copy in range(1, scale):
+                    writer.writerow(jitter_row(row, columns, copy, rng))
+                continue
+            writer.writerow(row)
+    return path
+
+def jitter_row(row: list, columns: dict, copy: int, rng: random.Random) -> list:
+    """A copy of a data row with a new label and a perturbed Target percent (Diff/Index recomputed)"""
+    row = list(row)
+    row[columns['Response label']] = f"{row[columns['Response label']]} ({copy + 1})"
+    try:
+        target = float(row[columns['Target percent']].rstrip('%')) * rng.uniform(0.6, 1.4)
+        control = float(row[columns['Control percent']].rstrip('%'))
+    except (KeyError, ValueError):
+        return row
+    row[columns['Target percent']] = f"{min(target, 100.0):.2f}%"
+    if 'Diff' in columns:
+        row[columns['Diff']] = f"{min(target, 100.0) - control:.2f}"
+    if 'Index' in columns and control > 0:
+        row[columns['Index']] = f"{min(target, 100.0) / control * 100:.2f}"
+    return row
+
+def phase_summary(record: dict) -> list:
+    keys = ('phase', 'depth', 'ms', 'alloc_kb')
+    return [{key: phase[key] for key in keys if key in phase} for phase in record.get('phases', [])]
+
+class Driver:
+    """One AppTest session pointed at one data file"""
+
+    def __init__(self, data_file: str, timeout: float):
+        from streamlit.testing.v1 import AppTest
+        self.at = AppTest.from_string(DRIVER.format(here=HERE), default_timeout=timeout)
+        self.at.session_state['bench_data_file'] = data_file
+        self.at.session_state['view'] = 'dashboard'
+
+    def run(self) -> dict:
+        """One rerun with the current widget/session state; its wall time and perf phases"""
+        start = time.perf_counter()
+        self.at.run()
+        ms = (time.perf_counter() - start) * 1000
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].value)
+        record = self.at.session_state['bench_record']
+        return {'ms': round(ms, 2), 'phases': phase_summary(record),
+                **({'peak_alloc_kb': record['peak_alloc_kb']} if 'peak_alloc_kb' in record else {})}
+
+def run_matrix(data_name: str, data_file: str, categories, top_ns, min_indexes, timeout: float) -> list:
+    """Cold and warm reruns for every combination on one data file"""
+    driver = Driver(data_file, timeout)
+    results = [{'data': data_name, 'target': 'cold_start', 'pass': 'cold', **driver.run()}]
+    at = driver.at
+    for category in categories or at.sidebar.selectbox[0].options:
+        for metric in METRICS:
+            for top_n in top_ns:
+                for min_index in min_indexes:
+                    at.sidebar.selectbox[0].set_value(category)
+                    at.sidebar.radio[0].set_value(metric)
+                    at.sidebar.slider[0].set_value(top_n)
+                    at.sidebar.slider[1].set_value(min_index)
+                    combination = {'data': data_name, 'target': 'dashboard', 'category': category, 'metric': metric,
+                                   'top_n': top_n, 'min_index': min_index}
+                    cold = driver.run()
+                    combination['section'] = at.sidebar.selectbox[1].value
+                    results.append({**combination, 'pass': 'cold', **cold})
+                    results.append({**combination, 'pass': 'warm', **driver.run()})
+    for target in TARGETS[1:]:
+        at.session_state['view'] = target
+        results.append({'data': data_name, 'target': target, 'pass': 'cold', **driver.run()})
+        results.append({'data': data_name, 'target': target, 'pass': 'warm', **driver.run()})
+    at.session_state['view'] = 'dashboard'
+    return results
+
+def summarise(results: list) -> dict:
+    """p50/p95/max per data file, target and pass"""
+    groups = {}
+    for r in results:
+        groups.setdefault((r['data'], r['target'], r['pass']), []).append(r['ms'])
+    summary = {}
+    for (data, target, run_pass), values in sorted(groups.items()):
+        summary.setdefault(data, {}).setdefault(target, {})[run_pass] = {
+            'runs': len(values),
+            'p50_ms': round(float(np.percentile(values, 50)), 1),
+            'p95_ms': round(float(np.percentile(values, 95)), 1),
+            'max_ms': round(float(np.max(values)), 1),
+        }
+    return summary
+
+def check_budgets(summary: dict, budgets: dict) -> list:
+    """Violations of budgets shaped {"<data>": {"<target>": {"<pass>_<p50|p95|max>_ms": limit}}}"""
+    violations = []
+    for data, targets in budgets.items():
+        for target, limits in targets.items():
+            for key, limit in limits.items():
+                run_pass, stat = key.split('_', 1)
+                value = summary.get(data, {}).get(target, {}).get(run_pass, {}).get(stat)
+                if value is not None and value > limit:
+                    violations.append(f"{data} {target} {run_pass} {stat.replace('_ms', '')}: "
+                                      f"{value:.0f} ms > budget {limit:.0f} ms")
+    return violations
+
+def allocation_summary(results: list) -> dict:
+    """Mean allocated KB per phase name, by data file and pass"""
+    totals = {}
+    for r in results:
+        for phase in r['phases']:
+            if 'alloc_kb' in phase:
+                key = (r['data'], r['pass'], phase['phase'])
+                totals.setdefault(key, []).append(phase['alloc_kb'])
+    summary = {}
+    for (data, run_pass, name), values in sorted(totals.items()):
+        summary.setdefault(data, {}).setdefault(run_pass, {})[name] = round(float(np.mean(values)), 1)
+    return summary
+
+def clear_caches():
+    import streamlit as st
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+def benchmark(data_files: dict, categories=None, top_ns=(5, 10, 25), min_indexes=(0, 120, 200),
+              allocations: bool = True, timeout: float = 300) -> dict:
+    """Timings (and optionally allocations) for the matrix on each {name: path} data file"""
+    saved_env = {key: os.environ.get(key) for key in ('DASHBOARD_PERF', 'DASHBOARD_PERF_LOG')}
+    os.environ['DASHBOARD_PERF'] = '1'
+    os.environ['DASHBOARD_PERF_LOG'] = os.devnull
+    try:
+        return _benchmark(data_files, categories, top_ns, min_indexes, allocations, timeout)
+    finally:
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+def _benchmark(data_files, categories, top_ns, min_indexes, allocations, timeout) -> dict:
+    timings = []
+    for name, path in data_files.items():
+        timings.extend(run_matrix(name, path, categories, top_ns, min_indexes, timeout))
+    output = {'timings': timings, 'summary': summarise(timings)}
+    if allocations:
+        clear_caches()
+        tracemalloc.start()
+        try:
+            traced = []
+            for name, path in data_files.items():
+                traced.extend(run_matrix(name, path, categories, top_ns, min_indexes, timeout))
+        finally:
+            tracemalloc.stop()
+        output['allocations'] = [{key: r[key] for key in r if key != 'ms'} for r in traced]
+        output['allocation_summary'] = allocation_summary(traced)
+    return output
+
+def print_summary(summary: dict):
+    print(f"{'data':<14} {'target':<18} {'pass':<5} {'runs':>5} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for data, targets in summary.items():
+        for target, passes in targets.items():
+            for run_pass, stats in passes.items():
+                print(f"{data:<14} {target:<18} {run_pass:<5} {stats['runs']:>5} "
+                      f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['max_ms']:>8.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help="one top_n and min_index value per category/metric")
+    parser.add_argument('--top-n', default='5,10,25', help="comma-separated top_n values")
+    parser.add_argument('--min-index', default='0,120,200', help="comma-separated min_index values")
+    parser.add_argument('--scale', default='10', help="comma-separated synthetic export scales ('' for none)")
+    parser.add_argument('--no-allocations', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--budgets', default=DEFAULT_BUDGETS)
+    parser.add_argument('--output', default='bench_results.json')
+    args = parser.parse_args(argv)
+
+    import app
+    top_ns = [10] if args.quick else [int(n) for n in args.top_n.split(',')]
+    min_indexes = [120] if args.quick else [int(n) for n in args.min_index.split(',')]
+    bundled = os.path.join(HERE, app.DATA_FILE)
+    with tempfile.TemporaryDirectory() as directory:
+        data_files = {'bundled': bundled}
+        for scale in [int(s) for s in args.scale.split(',') if s.strip()]:
+            data_files[f'synthetic_x{scale}'] = make_synthetic_export(
+                bundled, os.path.join(directory, f'synthetic_x{scale}.csv'), scale)
+        output = benchmark(data_files, top_ns=top_ns, min_indexes=min_indexes,
+                           allocations=not args.no_allocations)
+
+    budgets = {}
+    if args.budgets and os.path.exists(args.budgets):
+        with open(args.budgets, encoding='utf-8') as f:
+            budgets = json.load(f)
+    output['budgets'] = budgets
+    output['violations'] = check_budgets(output['summary'], budgets)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=1)
+
+    print_summary(output['summary'])
+    print(f"\nResults written to {args.output}")
+    for violation in output['violations']:
+        print(f"BUDGET EXCEEDED: {violation}")
+    return 1 if output['violations'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,21 @@
-import pandas as pd
+from __future__ import annotations
+
+import hashlib
+import os
 import re
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple, TYPE_CHECKING
 
 import csv
 
+if TYPE_CHECKING:
+    import pandas as pd  # imported on first use so the category mapping and HTML writers stay pandas-free
+
 def parse_csv_file(file_path: str) -> Dict[str, pd.DataFrame]:
     """
     Parse the YouGov Profiles+ CSV file into a dictionary of DataFrames
     organized by question set/category.
     """
+    import pandas as pd
     datasets = {}
     current_section = None
     current_question = None
@@ -139,6 +146,7 @@ def parse_csv_file(file_path: str) -> Dict[str, pd.DataFrame]:
 
 def clean_numeric_column(series: pd.Series) -> pd.Series:
     """Clean and convert numeric columns"""
+    import pandas as pd
     return pd.to_numeric(series.astype(str).str.replace('%', '').str.replace(',', ''), errors='coerce')
 
 def process_datasets(datasets: Dict) -> Dict[str, pd.DataFrame]:
@@ -164,6 +172,32 @@ def process_datasets(datasets: Dict) -> Dict[str, pd.DataFrame]:
     
     return processed
 
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def file_signature(path: str) -> Optional[tuple]:
+    """(mtime_ns, size) of a file, or None if it is missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def section_fingerprint(section_data: dict) -> str:
+    """Hash of a section's question, columns and values"""
+    import pandas as pd
+    df = section_data['data']
+    digest = hashlib.sha256()
+    digest.update(str(section_data.get('question')).encode('utf-8'))
+    digest.update('\x1f'.join(map(str, df.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
 def get_category_mapping() -> Dict[str, List[str]]:
     """Map question sets to categories for better organization"""
     return {
@@ -215,3 +249,69 @@ def get_category_mapping() -> Dict[str, List[str]]:
         ]
     }
 
+def get_section_category(section_name: str, category_mapping: Dict[str, List[str]] = None) -> str:
+    """The first category with a keyword contained in the section name, else 'Other'"""
+    category_mapping = category_mapping or get_category_mapping()
+    for cat, keywords in category_mapping.items():
+        if any(kw.lower() in section_name.lower() for kw in keywords):
+            return cat
+    return 'Other'
+
+
+_GROUP_LINE = re.compile(r'^(Target|Control) Group:\s*(.*?)\s*(?:\(n\.\s*([\d,]+)\))?\s*$')
+
+def read_export_groups(file_path: str) -> Dict[str, object]:
+    """Target and control group names and sizes from an export's metadata header (None where absent)"""
+    groups = {'target': None, 'target_n': None, 'control': None, 'control_n': None}
+    with open(file_path, 'r', encoding='utf-8-sig') as f:
+        for row, _ in zip(csv.reader(f), range(8)):
+            match = _GROUP_LINE.match(','.join(row).strip()) if row else None
+            if match:
+                key = match.group(1).lower()
+                groups[key] = match.group(2)
+                groups[f'{key}_n'] = int(match.group(3).replace(',', '')) if match.group(3) else None
+    return groups
+
+AFFINITY_STATS = ['Mean Index', 'Median Index', 'High-affinity share']
+
+def build_affinity_matrix(datasets: Dict, high_affinity: float = 120) -> pd.DataFrame:
+    """Mean, median and share of Index >= high_affinity for every category x section, in one grouped pass"""
+    import pandas as pd
+    category_mapping = get_category_mapping()
+    frames = [
+        pd.DataFrame({'Section': section_name, 'Index': pd.to_numeric(section_data['data']['Index'], errors='coerce')})
+        for section_name, section_data in datasets.items()
+        if 'Index' in section_data['data'].columns
+    ]
+    columns = ['Category', 'Section', 'Items', *AFFINITY_STATS]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    items = pd.concat(frames, ignore_index=True).dropna(subset=['Index'])
+    items['High'] = items['Index'] >= high_affinity
+    grouped = items.groupby('Section', sort=False)
+    stats = pd.DataFrame({
+        'Items': grouped['Index'].size(),
+        'Mean Index': grouped['Index'].mean(),
+        'Median Index': grouped['Index'].median(),
+        'High-affinity share': grouped['High'].mean(),
+    }).reset_index()
+    
+    # The dashboards' category lookup, once per section
+    category_order = [*category_mapping, 'Other']
+    categories = stats['Section'].map(lambda name: get_section_category(name, category_mapping))
+    stats['Category'] = pd.Categorical(categories, categories=category_order)
+    stats = stats.sort_values(['Category', 'Mean Index'], ascending=[True, False], kind='stable')
+    stats['Category'] = stats['Category'].astype(str)
+    return stats[columns].reset_index(drop=True)
+
+def order_affinity_sections(matrix: pd.DataFrame, order_by: str) -> pd.DataFrame:
+    """The affinity matrix with sections kept in their category groups, highest order_by first within each"""
+    import pandas as pd
+    categories = pd.Categorical(matrix['Category'], categories=list(dict.fromkeys(matrix['Category'])))
+    order = pd.DataFrame({'category': categories.codes, 'value': matrix[order_by].to_numpy()}).sort_values(
+        ['category', 'value'], ascending=[True, False], kind='stable').index
+    return matrix.iloc[order].reset_index(drop=True)
+
+def affinity_percentiles(matrix: pd.DataFrame) -> pd.DataFrame:
+    """Each section's percentile (0-1) among all sections on every affinity statistic, so the three share one scale"""
+    return matrix[AFFINITY_STATS].rank(pct=True)
@@ -0,0 +1,162 @@
+"""
+Hot reload for the dashboard's data files.
+
+A DataWatcher owns the parsed datasets of one CSV. It checks the file's mtime
+and size (every ``DASHBOARD_RELOAD_INTERVAL`` seconds, default 5) and, when they
+change and the SHA-256 of the contents differs, re-ingests the file in the
+background and swaps in the new snapshot with a single assignment. Readers take
+a snapshot once and keep using it, so a rerun that started on the old data
+finishes on it. The previous snapshot is retained until the next swap.
+
+Every snapshot carries a fingerprint per section, so caches keyed by section
+fingerprint rather than file version survive reloads for unchanged sections.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from data_parser import file_hash, file_signature, section_fingerprint
+
+RELOAD_INTERVAL_ENV_VAR = 'DASHBOARD_RELOAD_INTERVAL'
+DEFAULT_RELOAD_INTERVAL = 5.0
+KEEP_SNAPSHOTS = 2
+
+class DataSnapshot:
+    """One version of a data file: its content hash, datasets and section fingerprints"""
+
+    def __init__(self, version: str, signature: Optional[tuple], datasets: Optional[Dict],
+                 previous: Optional['DataSnapshot'] = None):
+        self.version = version
+        self.signature = signature
+        self.datasets = datasets
+        self.section_versions = {name: section_fingerprint(data) for name, data in (datasets or {}).items()}
+        self.loaded_at = time.time()
+        if previous is None:
+            self.changed_sections = sorted(self.section_versions)
+        else:
+            self.changed_sections = sorted(
+                name for name in set(self.section_versions) | set(previous.section_versions)
+                if self.section_versions.get(name) != previous.section_versions.get(name)
+            )
+
+class DataWatcher:
+    """Keeps the current snapshot of a data file and reloads it when the file changes.
+
+    ``load(path)`` parses the file into the datasets dict (or None if it holds no
+    usable data). ``on_retire(path, snapshot)`` is called when a snapshot is no
+    longer retained so caches keyed by its version can be cleared.
+    """
+
+    def __init__(self, file_path: str, load: Callable[[str], Optional[Dict]],
+                 interval: Optional[float] = None,
+                 on_retire: Optional[Callable[[str, DataSnapshot], None]] = None):
+        self.file_path = file_path
+        self.load = load
+        if interval is None:
+            interval = float(os.environ.get(RELOAD_INTERVAL_ENV_VAR, DEFAULT_RELOAD_INTERVAL))
+        self.interval = interval
+        self.on_retire = on_retire
+        self.last_error = None
+        self._check_lock = threading.Lock()
+        self._snapshots_lock = threading.Lock()
+        self._last_check = time.monotonic()
+        self._poller = None
+
+        signature = file_signature(file_path)
+        if signature is None:
+            # Missing file: an empty snapshot (datasets None) until it appears
+            self.current = DataSnapshot('', None, None)
+        else:
+            self.current = DataSnapshot(file_hash(file_path), signature, load(file_path))
+        self._snapshots = OrderedDict([(self.current.version, self.current)])
+
+    def snapshot(self) -> DataSnapshot:
+        """The current snapshot; starts a background check if the interval has passed"""
+        if time.monotonic() - self._last_check >= self.interval:
+            self._last_check = time.monotonic()
+            threading.Thread(target=self.check, kwargs={'blocking': False},
+                             name="dashboard-data-reload", daemon=True).start()
+        return self.current
+
+    def get(self, version: Optional[str]) -> DataSnapshot:
+        """A retained snapshot by version, falling back to the current one"""
+        with self._snapshots_lock:
+            return self._snapshots.get(version, self.current)
+
+    def versions(self) -> List[str]:
+        with self._snapshots_lock:
+            return list(self._snapshots)
+
+    def section(self, section_name: str, section_version: Optional[str]) -> Optional[dict]:
+        """A section's data from whichever retained snapshot has that fingerprint"""
+        with self._snapshots_lock:
+            snapshots = list(reversed(self._snapshots.values()))
+        for snapshot in snapshots:
+            if snapshot.section_versions.get(section_name) == section_version:
+                return snapshot.datasets[section_name]
+        return None
+
+    def check(self, blocking: bool = True) -> bool:
+        """Reload if the file changed; returns True when a new snapshot was swapped in"""
+        if not self._check_lock.acquire(blocking=blocking):
+            return False
+        try:
+            self._last_check = time.monotonic()
+            current = self.current
+            signature = file_signature(self.file_path)
+            if signature is None or signature == current.signature:
+                return False
+            try:
+                version = file_hash(self.file_path)
+            except OSError:
+                return False  # replaced or removed mid-check; the next check sees the new file
+            if version == current.version:
+                current.signature = signature  # touched but unchanged
+                return False
+            try:
+                datasets = self.load(self.file_path)
+            except Exception as exc:
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                return False
+            if file_signature(self.file_path) != signature:
+                return False  # still being written; pick it up on the next check
+            self.last_error = None
+            self._swap(DataSnapshot(version, signature, datasets, previous=current))
+            return True
+        finally:
+            self._check_lock.release()
+
+    def start_polling(self):
+        """Check the file every interval from a daemon thread (once per watcher)"""
+        with self._check_lock:
+            if self._poller is not None:
+                return
+            self._poller = threading.Thread(target=self._poll, name="dashboard-data-watch", daemon=True)
+        self._poller.start()
+
+    def _poll(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.check()
+            except Exception as exc:  # keep polling: the next change may load fine
+                self.last_error = f"{type(exc).__name__}: {exc}"
+
+
+    def _swap(self, snapshot: DataSnapshot):
+        retired = []
+        with self._snapshots_lock:
+            self._snapshots[snapshot.version] = snapshot
+            self._snapshots.move_to_end(snapshot.version)
+            self.current = snapshot
+            while len(self._snapshots) > KEEP_SNAPSHOTS:
+                retired.append(self._snapshots.popitem(last=False)[1])
+        if self.on_retire is not None:
+            for old in retired:
+                try:
+                    self.on_retire(self.file_path, old)
+                except Exception as exc:  # the new snapshot is already live; stale cache entries just linger
+                    self.last_error = f"{type(exc).__name__}: {exc}"
+
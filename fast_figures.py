@@ -0,0 +1,275 @@
+"""
+Low-overhead figure builders for the dashboard charts.
+
+Building charts with go.Figure/add_trace/update_layout (or plotly.express) runs
+every property through Plotly's validators. The functions here emit the same
+figure as a plain dict straight from NumPy arrays instead: text labels are
+formatted with vectorised string operations, colorscales are expanded once and
+the default template is attached so the chart renders exactly as the
+graph_objects version does. st.plotly_chart accepts these dicts directly.
+"""
+import json
+from functools import lru_cache
+from typing import List, Optional
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+def format_values(values, fmt: str, prefix: str = '', suffix: str = '') -> List[str]:
+    """Vectorised f"{prefix}{value:fmt}{suffix}" for a numeric array (fmt like '.1f')"""
+    text = np.char.mod(f'%{fmt}', np.asarray(values, dtype=float))
+    if prefix:
+        text = np.char.add(prefix, text)
+    if suffix:
+        text = np.char.add(text, suffix)
+    return text.tolist()
+
+def index_colors(index_values) -> List[str]:
+    """Bar colours by affinity band: ≥120 strong, ≥100 moderate, otherwise under-indexing"""
+    index_values = np.asarray(index_values, dtype=float)
+    return np.where(index_values >= 120, '#0066CC',
+                    np.where(index_values >= 100, '#66B2FF', '#CCE5FF')).tolist()
+
+@lru_cache(maxsize=None)
+def _colorscale(name: str) -> tuple:
+    # Expanded once through the validator so the stop positions round exactly as go.* does
+    return tuple(tuple(step) for step in go.bar.Marker(colorscale=name).colorscale)
+
+def colorscale(name: str) -> list:
+    """Named colorscale expanded to [[position, colour], ...] as the validators would"""
+    return [list(step) for step in _colorscale(name)]
+
+@lru_cache(maxsize=None)
+def _template(name: str) -> dict:
+    return json.loads(pio.json.to_json_plotly(pio.templates[name].to_plotly_json()))
+
+def default_template() -> dict:
+    """The active default template (Streamlit installs its own) as a plain dict, shared read-only"""
+    return _template(pio.templates.default)
+
+def figure(data: list, layout: dict) -> dict:
+    """Assemble a figure dict with the default template, like go.Figure does"""
+    layout = dict(layout)
+    layout['template'] = default_template()
+    return {'data': data, 'layout': layout}
+
+def titled(text: str) -> dict:
+    return {'title': {'text': text}}
+
+def vline(x, color: str, text: str, position: Optional[str] = None):
+    """Shape and annotation equivalent to fig.add_vline(..., line_dash="dash")"""
+    shape = {'line': {'color': color, 'dash': 'dash'}, 'type': 'line',
+             'x0': x, 'x1': x, 'xref': 'x', 'y0': 0, 'y1': 1, 'yref': 'y domain'}
+    if position == 'top':
+        anchors = {'xanchor': 'center', 'y': 1, 'yanchor': 'bottom'}
+    elif position == 'bottom':
+        anchors = {'xanchor': 'center', 'y': 0, 'yanchor': 'top'}
+    else:  # Plotly's default "top right"
+        anchors = {'xanchor': 'left', 'y': 1, 'yanchor': 'top'}
+    annotation = {'showarrow': False, 'text': text, 'x': x, 'xref': 'x', 'yref': 'y domain', **anchors}
+    return shape, annotation
+
+def hline(y, color: str, text: str):
+    """Shape and annotation equivalent to fig.add_hline(..., annotation_position="right")"""
+    shape = {'line': {'color': color, 'dash': 'dash'}, 'type': 'line',
+             'x0': 0, 'x1': 1, 'xref': 'x domain', 'y0': y, 'y1': y, 'yref': 'y'}
+    annotation = {'showarrow': False, 'text': text, 'x': 1, 'xanchor': 'left', 'xref': 'x domain',
+                  'y': y, 'yanchor': 'middle', 'yref': 'y'}
+    return shape, annotation
+
+def with_lines(layout: dict, *lines) -> dict:
+    """Add (shape, annotation) pairs from vline/hline to a layout"""
+    layout['shapes'] = [shape for shape, _ in lines]
+    layout['annotations'] = [annotation for _, annotation in lines]
+    return layout
+
+def parity_line(max_val, name: str) -> dict:
+    return {'line': {'color': 'red', 'dash': 'dash'}, 'mode': 'lines', 'name': name,
+            'showlegend': False, 'x': [0, max_val], 'y': [0, max_val], 'type': 'scatter'}
+
+def percent_bar(labels: List[str], values, name: str, color: str) -> dict:
+    """Horizontal bar with "12.3%" labels outside the bars"""
+    return {'marker': {'color': color}, 'name': name, 'orientation': 'h',
+            'text': format_values(values, '.1f', suffix='%'), 'textposition': 'outside',
+            'x': np.asarray(values, dtype=float), 'y': labels, 'type': 'bar'}
+
+INDEX_HOVER = ('<b>%{y}</b><br>Index: %{x:.0f}<br>Target: %{customdata[0]:.1f}%'
+               '<br>Control: %{customdata[1]:.1f}%<extra></extra>')
+
+def index_bar(labels: List[str], index_values, target, control, marker: dict) -> dict:
+    """Horizontal Index bar with "Index: 123" labels and Target/Control in the hover"""
+    return {'customdata': np.column_stack([np.asarray(target, dtype=float), np.asarray(control, dtype=float)]),
+            'hovertemplate': INDEX_HOVER, 'marker': marker, 'orientation': 'h',
+            'text': format_values(index_values, '.0f', prefix='Index: '), 'textposition': 'outside',
+            'x': np.asarray(index_values, dtype=float), 'y': labels, 'type': 'bar'}
+
+def scaled_marker(color_values, scale: str) -> dict:
+    """Marker coloured by value on a named colorscale with an "Index" colorbar"""
+    return {'color': np.asarray(color_values, dtype=float), 'colorbar': titled('Index'),
+            'colorscale': colorscale(scale), 'showscale': True}
+
+def px_scatter(x, y, size, hovertext: List[str], customdata, hovertemplate: str,
+               size_max: int, x_title: str, y_title: str, title: str, scale: str = 'Blues',
+               webgl: bool = False):
+    """Trace and layout equivalent to px.scatter(..., size=Index, color=Index, render_mode=...)"""
+    size = np.asarray(size, dtype=float)
+    trace = {'customdata': customdata, 'hovertemplate': hovertemplate, 'hovertext': hovertext,
+             'legendgroup': '',
+             'marker': {'color': size, 'coloraxis': 'coloraxis', 'size': size, 'sizemode': 'area',
+                        'sizeref': float(size.max()) / size_max ** 2, 'symbol': 'circle'},
+             'mode': 'markers', 'name': '', 'showlegend': False,
+             'x': np.asarray(x, dtype=float), 'xaxis': 'x', 'y': np.asarray(y, dtype=float), 'yaxis': 'y',
+             'type': 'scattergl' if webgl else 'scatter'}
+    if not webgl:
+        trace['orientation'] = 'v'  # scattergl has no orientation
+    layout = {'xaxis': {'anchor': 'y', 'domain': [0.0, 1.0], **titled(x_title)},
+              'yaxis': {'anchor': 'x', 'domain': [0.0, 1.0], **titled(y_title)},
+              'coloraxis': {'colorbar': titled('Index'), 'colorscale': colorscale(scale), 'autocolorscale': False},
+              'legend': {'tracegroupgap': 0, 'itemsizing': 'constant'},
+              'title': {'text': title}}
+    return trace, layout
+
+# Chart builders: one per figure in app.py, taking plain arrays/lists
+
+def comparison_chart(labels, target, control, title: str, height: int) -> dict:
+    """create_comparison_chart: grouped Target vs Control bars"""
+    return figure(
+        [percent_bar(labels, target, 'Hilton Deep Divers', '#0066CC'),
+         percent_bar(labels, control, 'National Average', '#CCCCCC')],
+        {**titled(title), 'xaxis': titled('Percentage (%)'), 'yaxis': titled(''),
+         'barmode': 'group', 'height': height, 'showlegend': True, 'hovermode': 'closest'})
+
+def index_chart(labels, index_values, target, control, title: str, height: int) -> dict:
+    """create_index_chart: Index bars coloured by affinity band with a baseline at 100"""
+    layout = {**titled(title), 'xaxis': titled('Index (100 = National Average)'), 'yaxis': titled(''),
+              'height': height, 'showlegend': False}
+    with_lines(layout, vline(100, 'red', 'Baseline (100)', 'top'))
+    return figure([index_bar(labels, index_values, target, control, {'color': index_colors(index_values)})], layout)
+
+def scatter_chart(labels, target, control, index_values, diff, max_val,
+                  title: str = 'Target vs Control Comparison', webgl: bool = False) -> dict:
+    """create_scatter_chart: Target vs Control sized and coloured by Index"""
+    index_values = np.asarray(index_values, dtype=float)
+    trace, layout = px_scatter(
+        control, target, index_values, labels,
+        np.column_stack([index_values, np.asarray(diff, dtype=float)]),
+        '<b>%{hovertext}</b><br><br>National Average (%)=%{x}<br>Hilton Deep Divers (%)=%{y}'
+        '<br>Index=%{marker.color}<br>Diff=%{customdata[1]}<extra></extra>',
+        20, 'National Average (%)', 'Hilton Deep Divers (%)', title, webgl=webgl)
+    layout['height'] = 600
+    return figure([trace, parity_line(max_val, 'Parity Line')], layout)
+
+def insight_index_chart(labels, index_values, target, control, height: int) -> dict:
+    """create_insight_chart: Index bars with Strong Affinity and Baseline markers"""
+    layout = {**titled('Top Items by Index'), 'xaxis': titled('Index (100 = National Average)'),
+              'yaxis': titled(''), 'height': height, 'showlegend': False}
+    with_lines(layout,
+               vline(120, 'green', 'Strong Affinity (120)', 'top'),
+               vline(100, 'red', 'Baseline (100)', 'bottom'))
+    return figure([index_bar(labels, index_values, target, control, {'color': '#0066CC'})], layout)
+
+def gap_chart(categories, avg_index, counts) -> dict:
+    """create_insight_chart('gap'): average Index of high- vs under-indexing items"""
+    counts = np.asarray(counts)
+    text = np.char.add(np.char.add(np.char.mod('Avg: %.0f', np.asarray(avg_index, dtype=float)), '<br>Items: '),
+                       counts.astype(str)).tolist()
+    trace = {'customdata': counts,
+             'hovertemplate': '<b>%{x}</b><br>Average Index: %{y:.0f}<br>Number of Items: %{customdata}<extra></extra>',
+             'marker': {'color': ['#0066CC', '#FF6B6B']}, 'text': text, 'textposition': 'outside',
+             'x': list(categories), 'y': np.asarray(avg_index, dtype=float), 'type': 'bar'}
+    layout = {**titled('Cultural Gap: High Affinity vs Under-indexing'), 'yaxis': titled('Average Index'),
+              'xaxis': titled(''), 'height': 500, 'showlegend': False}
+    with_lines(layout, hline(100, 'red', 'Baseline (100)'))
+    return figure([trace], layout)
+
+def hotels_destinations_chart(hotels: dict, destinations: dict, max_val) -> dict:
+    """create_cultural_chart('hotels_destinations_scatter'); each group has item/index/target/control arrays"""
+    hover = '<b>%{text}</b><br>Target: %{y:.1f}%<br>Control: %{x:.1f}%<br>Index: %{marker.size:.0f}<extra></extra>'
+    traces = []
+    for name, color, group in (('Hotels', '#0066CC', hotels), ('Destinations', '#FF6B6B', destinations)):
+        traces.append({'hovertemplate': hover,
+                       'marker': {'color': color, 'opacity': 0.7, 'size': np.asarray(group['index'], dtype=float) / 20},
+                       'mode': 'markers+text', 'name': name, 'text': group['item'], 'textposition': 'top center',
+                       'x': np.asarray(group['control'], dtype=float), 'y': np.asarray(group['target'], dtype=float),
+                       'type': 'scatter'})
+    traces.append(parity_line(max_val, 'Parity'))
+    return figure(traces, {**titled('Hotels vs Destinations: Target vs Control'),
+                           'xaxis': titled('National Average (%)'), 'yaxis': titled('Hilton Deep Divers (%)'),
+                           'height': 600})
+
+def travel_heatmap_chart(labels, index_values, target, control, height: int) -> dict:
+    """create_cultural_chart('travel_heatmap'): Index bars on the Blues scale with Target/Control labels"""
+    text = np.char.add(np.char.add(np.char.add(np.char.add(
+        np.char.mod('Index: %.0f', np.asarray(index_values, dtype=float)), '<br>Target: '),
+        np.char.mod('%.1f', np.asarray(target, dtype=float))), '%<br>Control: '),
+        np.char.mod('%.1f%%', np.asarray(control, dtype=float))).tolist()
+    trace = {'hovertemplate': '<b>%{y}</b><br>%{text}<extra></extra>',
+             'marker': scaled_marker(index_values, 'Blues'), 'orientation': 'h', 'text': text,
+             'textposition': 'outside', 'x': np.asarray(index_values, dtype=float), 'y': labels, 'type': 'bar'}
+    layout = {**titled('Travel Activities Heatmap'), 'xaxis': titled('Index'), 'yaxis': titled(''), 'height': height}
+    with_lines(layout, vline(120, 'green', 'Strong Affinity (120)'))
+    return figure([trace], layout)
+
+def cultural_comparison_chart(labels, target, control, height: int) -> dict:
+    """create_cultural_chart comparison types: grouped Deep Divers vs National Avg bars"""
+    return figure(
+        [percent_bar(labels, target, 'Deep Divers', '#0066CC'),
+         percent_bar(labels, control, 'National Avg', '#CCCCCC')],
+        {**titled('Comparison: Target vs Control'), 'xaxis': titled('Percentage (%)'), 'yaxis': titled(''),
+         'barmode': 'group', 'height': height})
+
+def hobbies_scatter_chart(labels, target, control, index_values, max_val) -> dict:
+    """create_cultural_chart('hobbies_scatter'): px-style affinity scatter"""
+    index_values = np.asarray(index_values, dtype=float)
+    trace, layout = px_scatter(
+        control, target, index_values, labels, index_values.reshape(-1, 1),
+        '<b>%{hovertext}</b><br><br>National Average (%)=%{x}<br>Deep Divers (%)=%{y}'
+        '<br>Index=%{marker.color}<extra></extra>',
+        30, 'National Average (%)', 'Deep Divers (%)', 'Hobbies & Interests: Affinity Analysis')
+    layout['height'] = 600
+    return figure([trace, parity_line(max_val, 'Parity')], layout)
+
+def scaled_index_chart(labels, index_values, target, control, title: str, scale: str, height: int) -> dict:
+    """create_cultural_chart sports/music/brands: Index bars on a colorscale"""
+    layout = {**titled(title), 'xaxis': titled('Index'), 'yaxis': titled(''), 'height': height}
+    with_lines(layout, vline(120, 'green', 'Strong Affinity (120)'))
+    return figure([index_bar(labels, index_values, target, control, scaled_marker(index_values, scale))], layout)
+
+def pattern_chart(categories, avg_index, item_counts) -> dict:
+    """create_cultural_chart('pattern_heatmap'): average Index per category"""
+    trace = {'customdata': np.asarray(item_counts),
+             'hovertemplate': '<b>%{x}</b><br>Avg Index: %{y:.0f}<br>Items: %{customdata}<extra></extra>',
+             'marker': {'color': '#0066CC'}, 'text': format_values(avg_index, '.0f'), 'textposition': 'outside',
+             'x': list(categories), 'y': np.asarray(avg_index, dtype=float), 'type': 'bar'}
+    return figure([trace], {**titled('Cultural Patterns: Average Affinity by Category'),
+                            'xaxis': titled('Category'), 'yaxis': titled('Average Index'), 'height': 400})
+
+def affinity_heatmap(categories: List[str], sections: List[str], stats: List[str], values, percentiles, items,
+                     title: str) -> dict:
+    """Section x statistic heatmap, sections grouped by category; colour is the percentile, text the value"""
+    values = np.asarray(values, dtype=float)
+    share = np.array([stat == 'High-affinity share' for stat in stats])
+    text = np.where(share, np.char.mod('%.0f%%', values * 100), np.char.mod('%.0f', values))
+    hover = [[f"{section} ({count:.0f} items)"] * len(stats) for section, count in zip(sections, items)]
+    trace = {'colorbar': {**titled('Percentile among sections'), 'tickformat': '.0%'},
+             'colorscale': colorscale('RdBu'), 'customdata': hover,
+             'hovertemplate': '<b>%{customdata}</b><br>%{x}: %{text}<br>Percentile among sections: %{z:.0%}'
+                              '<extra></extra>',
+             'text': text.tolist(), 'texttemplate': '%{text}', 'x': list(stats), 'y': [list(categories), list(sections)],
+             'z': np.asarray(percentiles, dtype=float), 'zmax': 1, 'zmin': 0, 'type': 'heatmap'}
+    layout = {'title': {'automargin': True, 'text': title}, 'xaxis': {'automargin': True, 'side': 'top'},
+              'yaxis': {'autorange': 'reversed', 'automargin': True},
+              'height': max(400, 24 * len(sections) + 160)}
+    return figure([trace], layout)
+
+def audience_bars(labels: List[str], audiences: List[str], values, title: str, axis_title: str,
+                  hoverformat: str, height: int) -> dict:
+    """Grouped horizontal bars, one trace per audience (values is audiences x labels)"""
+    values = np.asarray(values, dtype=float)
+    data = [{'hovertemplate': f'<b>%{{y}}</b><br>{audience}: %{{x:{hoverformat}}}<extra></extra>',
+             'name': audience, 'orientation': 'h', 'x': values[i], 'y': list(labels), 'type': 'bar'}
+            for i, audience in enumerate(audiences)]
+    layout = {'barmode': 'group', 'height': height, 'legend': {'orientation': 'h', 'y': -0.15},
+              **titled(title), 'xaxis': titled(axis_title), 'yaxis': {'autorange': 'reversed'}}
+    return figure(data, layout)
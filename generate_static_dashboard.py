@@ -3,107 +3,337 @@ Generate complete static HTML dashboard with all features from Streamlit version
 Includes: Main Dashboard, AI Strategic Analysis, and Deep Cultural Insights
 All text in English
 """
+from __future__ import annotations
+
+import hashlib
 import json
-from data_parser import parse_csv_file, process_datasets, get_category_mapping
-import pandas as pd
-from typing import Dict
+import math
+import numbers
+import os
+import re
+from data_parser import (parse_csv_file, process_datasets, get_category_mapping, get_section_category,
+                         build_affinity_matrix, affinity_percentiles, AFFINITY_STATS, file_hash, file_signature,
+                         section_fingerprint)
+from typing import Dict, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd  # imported on first use; writing the HTML needs neither pandas nor numpy
+
+METADATA = {
+    'target_group': 'Hilton Deep Divers (n=93)',
+    'control_group': 'Nationally representative (n=411,511)',
+    'data_source': 'YouGov Profiles+ USA 2025-12-07'
+}
 
-def prepare_data_for_html(datasets):
+def section_columns(df: pd.DataFrame) -> dict:
+    """Payload columns of one processed section: rows with a positive Target percent and an Index"""
+    valid = df[df['Target percent'].gt(0) & df['Index'].notna()]
+    control = valid['Control percent']
+    return {
+        'label': valid['Response label'].astype(str).tolist(),
+        'target_pct': valid['Target percent'].to_numpy(dtype=float),
+        'control_pct': control.to_numpy(dtype=float),  # NaN where the export has no Control percent
+        'index': valid['Index'].to_numpy(dtype=float),
+    }
+
+def prepare_data_for_html(datasets, processed=None):
     """Prepare data in format suitable for JavaScript/HTML"""
-    processed = process_datasets(datasets)
+    processed = processed if processed is not None else process_datasets(datasets)
     category_mapping = get_category_mapping()
     
     # Structure data for frontend
     dashboard_data = {
         'sections': {},
         'categories': category_mapping,
-        'metadata': {
-            'target_group': 'Hilton Deep Divers (n=93)',
-            'control_group': 'Nationally representative (n=411,511)',
-            'data_source': 'YouGov Profiles+ USA 2025-12-07'
-        }
+        'metadata': METADATA
     }
     
-    # Process each section
+    # One columnar pass per section; the chunk encoder consumes the arrays as they are
     for section_name, section_data in processed.items():
-        df = section_data['data']
-        
-        # Filter valid data
-        df_valid = df[
-            (df['Target percent'].notna()) & 
-            (df['Target percent'] > 0) &
-            (df['Index'].notna())
-        ].copy()
-        
-        if df_valid.empty:
-            continue
-        
-        # Convert to list of dictionaries
-        items = []
-        for _, row in df_valid.iterrows():
-            try:
-                items.append({
-                    'label': str(row['Response label']),
-                    'target_pct': float(row['Target percent']) if pd.notna(row['Target percent']) else 0,
-                    'control_pct': float(row['Control percent']) if pd.notna(row['Control percent']) else 0,
-                    'index': float(row['Index']) if pd.notna(row['Index']) else 0,
-                    'diff': float(row['Target percent']) - float(row['Control percent']) if pd.notna(row['Control percent']) else 0
-                })
-            except (ValueError, TypeError):
-                continue
-        
-        if items:
+        columns = section_columns(section_data['data'])
+        if columns['label']:
             dashboard_data['sections'][section_name] = {
                 'question': section_data.get('question', ''),
-                'items': items,
+                'columns': columns,
                 'category': get_section_category(section_name, category_mapping)
             }
     
     return dashboard_data
 
-def get_section_category(section_name, category_mapping):
-    """Get category for a section"""
-    for cat, keywords in category_mapping.items():
-        if any(kw.lower() in section_name.lower() for kw in keywords):
-            return cat
-    return 'Other'
+def prepare_affinity_data(datasets, processed=None):
+    """Per-section affinity statistics and their percentiles, in category order; the page orders sections
+    within each category by the chosen statistic"""
+    matrix = build_affinity_matrix(processed if processed is not None else process_datasets(datasets))
+    percentiles = affinity_percentiles(matrix)
+    return {
+        'stats': AFFINITY_STATS,
+        'categories': list(dict.fromkeys(matrix['Category'])),
+        'sections': matrix['Section'].tolist(),
+        'section_categories': matrix['Category'].tolist(),
+        'items': matrix['Items'].astype(int).tolist(),
+        'values': {stat: matrix[stat].round(4).tolist() for stat in AFFINITY_STATS},
+        'percentiles': {stat: percentiles[stat].round(4).tolist() for stat in AFFINITY_STATS},
+    }
+
+def prepare_search_data(datasets, dashboard_data, processed=None):
+    """Serialised search index over the labels, names and questions of the sections on the page"""
+    from search_index import SearchIndex
+    processed = processed if processed is not None else process_datasets(datasets)
+    return SearchIndex.from_datasets(
+        {name: processed[name] for name in dashboard_data['sections'] if name in processed}
+    ).to_payload()
+
+DATA_DIR = 'data'
+
+# Section chunks are columnar: numbers are fixed-point integers (value x SCALE, the
+# export's own two-decimal precision) and each sort order ships precomputed. Labels
+# stay inline so a chunk's hash depends on its own section only
+SCALE = 100
+SORT_KEYS = {'index': 'index', 'target': 'target_pct', 'diff': 'diff'}
+
+def fixed_point(values) -> list:
+    """A scaled, rounded float column as ints (None for NaN)"""
+    return [None if value != value else int(value) for value in values.tolist()]
+
+def encode_section(section) -> dict:
+    """One section's columns as fixed-point lists plus a descending order per sort key (ties keep item order)"""
+    import numpy as np
+    columns = section['columns']
+    target, control, index = (np.rint(columns[name] * SCALE) for name in ('target_pct', 'control_pct', 'index'))
+    # diff is target - control (0 when control is missing), so the page derives it instead of downloading it
+    keys = {'index': index, 'target_pct': target, 'diff': np.where(np.isnan(control), 0, target - control)}
+    return {
+        'question': section['question'],
+        'labels': columns['label'],
+        'target': fixed_point(target),
+        'control': fixed_point(control),
+        'index': fixed_point(index),
+        'order': {key: np.argsort(-keys[column], kind='stable').tolist() for key, column in SORT_KEYS.items()},
+    }
+
+def chunk_path(kind: str, name: str, digest: str) -> str:
+    """Site-relative path of a data chunk; the content hash in the name lets browsers cache it forever"""
+    slug = re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')[:48] or kind
+    return f"{DATA_DIR}/{kind}/{slug}-{digest[:10]}.json"
+
+# Output is streamed: JSON is encoded in slices of at most JSON_SLICE list elements
+# and written in STREAM_BUFFER-sized blocks, so a payload's text never exists whole
+# in memory. --compress adds .gz/.br copies written in the same pass.
+JSON_SLICE = 4096
+STREAM_BUFFER = 1 << 16
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'brotli': '.br'}
+
+def finite_json(value):
+    """value with NaN and infinities (Python or numpy floats) as None, which JSON encodes as null"""
+    if isinstance(value, dict):
+        return {key: finite_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [finite_json(item) for item in value]
+    if isinstance(value, numbers.Real) and not isinstance(value, numbers.Integral):
+        value = float(value)
+        return value if math.isfinite(value) else None
+    return value
+
+def compact_json(value) -> str:
+    """Strict JSON (never NaN/Infinity, which browsers cannot parse); non-finite numbers become null"""
+    try:
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':'), allow_nan=False)
+    except (ValueError, TypeError):
+        return json.dumps(finite_json(value), ensure_ascii=False, separators=(',', ':'), allow_nan=False)
+
+def iter_json(value):
+    """compact_json(value) in pieces: dicts and lists are opened up, scalar lists dumped a slice at a time"""
+    if isinstance(value, dict) and all(isinstance(key, str) for key in value):
+        yield '{'
+        for i, (key, item) in enumerate(value.items()):
+            yield (',' if i else '') + compact_json(key) + ':'
+            yield from iter_json(item)
+        yield '}'
+    elif isinstance(value, (list, tuple)) and value:
+        yield '['
+        for start in range(0, len(value), JSON_SLICE):
+            part = value[start:start + JSON_SLICE]
+            if start:
+                yield ','
+            if any(isinstance(item, (dict, list, tuple)) for item in part):
+                for i, item in enumerate(part):
+                    if i:
+                        yield ','
+                    yield from iter_json(item)
+            else:
+                yield compact_json(part)[1:-1]
+        yield ']'
+    else:
+        yield compact_json(value)
+
+class BrotliFile:
+    """Write/close adapter over brotli's streaming compressor (the optional `brotli` package)"""
+
+    def __init__(self, raw):
+        import brotli
+        self.raw = raw
+        self.compressor = brotli.Compressor(quality=11)
+
+    def write(self, data: bytes):
+        self.raw.write(self.compressor.process(data))
+
+    def close(self):
+        self.raw.write(self.compressor.finish())
+
+class SiteFile:
+    """A site file written under a temporary name, with its SHA-256 and compressed copies kept in step.
+
+    commit(path) moves it (and path.gz / path.br) into place; discard() drops it.
+    """
+
+    def __init__(self, directory: str, compress=()):
+        import gzip
+        os.makedirs(directory, exist_ok=True)
+        self.digest = hashlib.sha256()
+        self.parts = []
+        for suffix in ['', *(COMPRESSION_SUFFIXES[method] for method in compress)]:
+            temporary = os.path.join(directory, f".{os.getpid()}-{id(self):x}{suffix}.tmp")
+            raw = open(temporary, 'wb')
+            if suffix == '.gz':
+                stream = gzip.GzipFile(filename='', mode='wb', fileobj=raw, mtime=0)
+            elif suffix == '.br':
+                stream = BrotliFile(raw)
+            else:
+                stream = raw
+            self.parts.append((suffix, temporary, raw, stream))
+        self.closed = False
+
+    def write(self, data: bytes):
+        self.digest.update(data)
+        for *_, stream in self.parts:
+            stream.write(data)
+
+    def write_json(self, value):
+        buffer, size = [], 0
+        for piece in iter_json(value):
+            buffer.append(piece)
+            size += len(piece)
+            if size >= STREAM_BUFFER:
+                self.write(''.join(buffer).encode('utf-8'))
+                buffer, size = [], 0
+        self.write(''.join(buffer).encode('utf-8'))
+
+    def close(self):
+        if not self.closed:
+            for _, _, raw, stream in self.parts:
+                if stream is not raw:
+                    stream.close()
+                raw.close()
+            self.closed = True
+
+    def commit(self, path: str):
+        self.close()
+        for suffix, temporary, *_ in self.parts:
+            os.replace(temporary, path + suffix)
+
+    def discard(self):
+        self.close()
+        for _, temporary, *_ in self.parts:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.discard()  # no-op after commit
+
+def site_files_exist(path: str, compress=()) -> bool:
+    return all(os.path.exists(path + suffix) for suffix in ['', *(COMPRESSION_SUFFIXES[m] for m in compress)])
+
+class ChunkWriter:
+    """Streams data chunks to output_dir/data as they are added; chunks already on disk are left alone"""
+
+    def __init__(self, output_dir: str, compress=()):
+        self.output_dir = output_dir
+        self.compress = tuple(compress)
+
+    def add(self, kind: str, name: str, payload) -> str:
+        with SiteFile(os.path.join(self.output_dir, DATA_DIR, kind), self.compress) as out:
+            out.write_json(payload)
+            path = chunk_path(kind, name, out.digest.hexdigest())
+            full_path = os.path.join(self.output_dir, path)
+            if not site_files_exist(full_path, self.compress):
+                out.commit(full_path)
+        return path
+
+def write_data_chunks(output_dir, data_json, ai_insights_data, cultural_insights_data, affinity_data=None,
+                      search_data=None, compress=()):
+    """Write one JSON chunk per section and per page under output_dir/data and return the page's manifest.
+
+    The manifest (categories, section list, chunk paths) is small enough to inline;
+    the page fetches each chunk only when a view needs it. Chunks left over from
+    earlier builds are removed.
+    """
+    chunks = ChunkWriter(output_dir, compress)
+    manifest = {
+        'categories': data_json['categories'],
+        'metadata': data_json['metadata'],
+        'scale': SCALE,
+        'sections': [section_entry(name, section, chunks) for name, section in data_json['sections'].items()],
+        'pages': page_chunks({'ai-summary': ai_insights_data, 'cultural-insights': cultural_insights_data,
+                              'affinity-heatmap': affinity_data, 'search': search_data}, chunks),
+    }
+    remove_stale_chunks(output_dir, manifest, compress)
+    return manifest
+
+def section_entry(name: str, section: dict, chunks: ChunkWriter) -> dict:
+    """A section's manifest entry, writing its chunk"""
+    return {'name': name, 'category': section['category'], 'items': len(section['columns']['label']),
+            'chunk': chunks.add('sections', name, encode_section(section))}
+
+def page_chunks(pages: dict, chunks: ChunkWriter) -> dict:
+    """{page: chunk path} for the pages that have data"""
+    return {page: chunks.add('pages', page, payload) for page, payload in pages.items() if payload is not None}
+
+def remove_stale_chunks(output_dir: str, manifest: dict, compress=()):
+    """Delete chunks (and compressed copies) that the manifest no longer references or compress no longer asks for"""
+    chunks = {entry['chunk'] for entry in manifest['sections']} | set(manifest['pages'].values())
+    keep = {path + suffix for path in chunks for suffix in ['', *(COMPRESSION_SUFFIXES[m] for m in compress)]}
+    for kind in ('sections', 'pages'):
+        kind_dir = os.path.join(output_dir, DATA_DIR, kind)
+        if os.path.isdir(kind_dir):
+            for file_name in os.listdir(kind_dir):
+                if (f"{DATA_DIR}/{kind}/{file_name}" not in keep
+                        and file_name.endswith(('.json', '.json.gz', '.json.br', '.tmp'))):
+                    os.remove(os.path.join(kind_dir, file_name))
 
 def analyze_all_data_for_ai_summary(datasets: Dict) -> pd.DataFrame:
     """Analyze all data to extract key insights"""
-    all_items = []
+    import pandas as pd
+    frames = []
     
     for section_name, section_data in datasets.items():
         df = section_data['data']
         if 'Index' in df.columns and 'Response label' in df.columns:
-            for _, row in df.iterrows():
-                if pd.notna(row.get('Index')) and pd.notna(row.get('Response label')):
-                    try:
-                        index_val = float(row['Index']) if pd.notna(row['Index']) else 0
-                        target_pct = float(row['Target percent']) if pd.notna(row['Target percent']) else 0
-                        control_pct = float(row['Control percent']) if pd.notna(row['Control percent']) else 0
-                        
-                        if index_val > 0 and target_pct > 0:
-                            all_items.append({
-                                'section': section_name,
-                                'item': str(row['Response label']),
-                                'index': index_val,
-                                'target_pct': target_pct,
-                                'control_pct': control_pct,
-                                'gap': target_pct - control_pct,
-                                'category': get_item_category(section_name)
-                            })
-                    except (ValueError, TypeError):
-                        continue
+            index_val = pd.to_numeric(df['Index'], errors='coerce')
+            target_pct = pd.to_numeric(df['Target percent'], errors='coerce')
+            control_pct = pd.to_numeric(df['Control percent'], errors='coerce')
+            # A missing Control percent counts as 0; one that is present but not a number drops the row
+            keep = (df['Response label'].notna() & index_val.gt(0) & target_pct.gt(0)
+                    & (control_pct.notna() | df['Control percent'].isna()))
+            if keep.any():
+                control = control_pct[keep].fillna(0)
+                frames.append(pd.DataFrame({
+                    'section': section_name,
+                    'item': df['Response label'][keep].astype(str),
+                    'index': index_val[keep],
+                    'target_pct': target_pct[keep],
+                    'control_pct': control,
+                    'gap': target_pct[keep] - control,
+                    'category': get_item_category(section_name)
+                }))
     
-    return pd.DataFrame(all_items) if all_items else pd.DataFrame()
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
 
 def get_item_category(section_name: str) -> str:
     """Get category for a section"""
-    category_mapping = get_category_mapping()
-    for cat, keywords in category_mapping.items():
-        if any(kw.lower() in section_name.lower() for kw in keywords):
-            return cat
-    return 'Other'
+    return get_section_category(section_name)
 
 def filter_reliable_data(df_all: pd.DataFrame, max_index: float = 500) -> pd.DataFrame:
     """Filter out extreme index values"""
@@ -410,10 +640,44 @@ def generate_cultural_insights_data(df_all: pd.DataFrame) -> list:
     
     return insights[:10]
 
-def generate_html_dashboard(data_json, ai_insights_data, cultural_insights_data, output_file='index.html'):
-    """Generate static HTML dashboard"""
+def generate_html_dashboard(data_json, ai_insights_data, cultural_insights_data, output_file='index.html',
+                            affinity_data=None, search_data=None, compress=()):
+    """Generate static HTML dashboard, with its data as lazily fetched chunks beside it"""
+    manifest = write_data_chunks(os.path.dirname(os.path.abspath(output_file)), data_json, ai_insights_data,
+                                 cultural_insights_data, affinity_data, search_data, compress)
+    write_page(output_file, manifest, compress)
+    
+    print(f"Dashboard HTML generated: {output_file}")
+
+def write_if_changed(output_file: str, write, compress=()) -> bool:
+    """Stream a file through write(out) and replace output_file (and its compressed copies) only if the
+    content differs; False if it was already up to date"""
+    with SiteFile(os.path.dirname(os.path.abspath(output_file)), compress) as out:
+        write(out)
+        changed = not site_files_exist(output_file, compress) or file_hash(output_file) != out.digest.hexdigest()
+        if changed:
+            out.commit(output_file)
+    for method, suffix in COMPRESSION_SUFFIXES.items():
+        if method not in compress and os.path.exists(output_file + suffix):
+            os.remove(output_file + suffix)
+    return changed
+
+def write_page(output_file: str, manifest: dict, compress=(), assets=None) -> bool:
+    """Stream the page to output_file (and its compressed copies); False if it was already up to date.
+
+    With `assets` (see write_offline_assets) the page links its vendored Plotly, CSS and script.
+    """
+    head, tail = offline_page(assets) if assets else (PAGE_HEAD, PAGE_TAIL)
     
-    html_template = f"""<!DOCTYPE html>
+    def write(out):
+        out.write(head.encode('utf-8'))
+        out.write_json(manifest)
+        out.write(tail.encode('utf-8'))
+    return write_if_changed(output_file, write, compress)
+
+# The page is static text around its inlined manifest: write_page streams PAGE_HEAD,
+# the manifest JSON and PAGE_TAIL straight into the output file
+PAGE_HEAD = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -421,43 +685,82 @@ def generate_html_dashboard(data_json, ai_insights_data, cultural_insights_data,
     <title>Hilton Deep Divers Analytics Dashboard</title>
     <script src="https://cdn.plot.ly/plotly-2.26.0.min.js"></script>
     <style>
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
             background: #f5f5f5;
             color: #333;
-        }}
+        }
         
-        .header {{
+        .header {
             background: linear-gradient(135deg, #003366 0%, #0066CC 100%);
             color: white;
             padding: 2rem;
             text-align: center;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
+        }
         
-        .header h1 {{
+        .header h1 {
             font-size: 2.5rem;
             margin-bottom: 0.5rem;
-        }}
+        }
         
-        .header p {{
+        .header p {
             opacity: 0.9;
             font-size: 1rem;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1400px;
             margin: 0 auto;
             padding: 2rem;
-        }}
+        }
+        
+        .search-box {
+            position: relative;
+            margin-bottom: 1rem;
+        }
         
-        .filters {{
+        .search-box input {
+            width: 100%;
+            padding: 0.75rem 1rem;
+            border: 2px solid #ddd;
+            border-radius: 10px;
+            font-size: 1rem;
+        }
+        
+        .search-results {
+            position: absolute;
+            z-index: 10;
+            left: 0;
+            right: 0;
+            background: white;
+            border-radius: 0 0 10px 10px;
+            box-shadow: 0 4px 12px rgba(0,0,0,0.15);
+            max-height: 400px;
+            overflow-y: auto;
+        }
+        
+        .search-result {
+            padding: 0.6rem 1rem;
+            cursor: pointer;
+            border-bottom: 1px solid #eee;
+        }
+        
+        .search-result:hover {
+            background: #E8F4F8;
+        }
+        
+        .search-result small {
+            color: #666;
+        }
+        
+        .filters {
             background: white;
             padding: 1.5rem;
             border-radius: 10px;
@@ -467,59 +770,59 @@ def generate_html_dashboard(data_json, ai_insights_data, cultural_insights_data,
             gap: 1rem;
             flex-wrap: wrap;
             align-items: center;
-        }}
+        }
         
-        .filter-group {{
+        .filter-group {
             display: flex;
             flex-direction: column;
             gap: 0.5rem;
-        }}
+        }
         
-        .filter-group label {{
+        .filter-group label {
             font-weight: 600;
             font-size: 0.9rem;
             color: #666;
-        }}
+        }
         
-        select, input {{
+        select, input {
             padding: 0.5rem;
             border: 2px solid #e0e0e0;
             border-radius: 5px;
             font-size: 1rem;
-        }}
+        }
         
-        select:focus, input:focus {{
+        select:focus, input:focus {
             outline: none;
             border-color: #0066CC;
-        }}
+        }
         
-        .section-card {{
+        .section-card {
             background: white;
             border-radius: 10px;
             padding: 2rem;
             margin-bottom: 2rem;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
+        }
         
-        .section-header {{
+        .section-header {
             border-bottom: 3px solid #0066CC;
             padding-bottom: 1rem;
             margin-bottom: 1.5rem;
-        }}
+        }
         
-        .section-header h2 {{
+        .section-header h2 {
             color: #0066CC;
             font-size: 1.8rem;
             margin-bottom: 0.5rem;
-        }}
+        }
         
-        .section-header .question {{
+        .section-header .question {
             color: #666;
             font-style: italic;
             font-size: 1rem;
-        }}
+        }
         
-        .chart-container {{
+        .chart-container {
             margin: 1.5rem 0;
             min-height: 400px;
             width: 100%;
@@ -528,58 +831,97 @@ def generate_html_dashboard(data_json, ai_insights_data, cultural_insights_data,
             padding: 1.5rem;
             border-radius: 8px;
             box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }}
+        }
         
-        .chart-container .js-plotly-plot {{
+        .chart-container .js-plotly-plot {
             width: 100% !important;
-        }}
+        }
         
-        .chart-container svg {{
+        .chart-container svg {
             max-width: 100%;
             height: auto;
-        }}
+        }
         
-        .table-container {{
+        .table-container {
             margin: 1.5rem 0;
             width: 100%;
             overflow-x: auto;
-        }}
+        }
         
-        .table-wrapper {{
+        .table-wrapper {
             overflow-x: auto;
             max-width: 100%;
-        }}
+        }
         
-        .data-table {{
-            width: 100%;
-            border-collapse: collapse;
+        .data-table {
+            height: 480px;
+            max-height: 70vh;
+            min-width: 640px;
+            overflow-y: auto;
             background: white;
             box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }}
+        }
+        
+        /* Rows have a fixed height (TABLE_ROW_HEIGHT in the script) so only the visible ones need to exist */
+        .data-table .table-row {
+            display: grid;
+            grid-template-columns: minmax(200px, 3fr) repeat(4, minmax(90px, 1fr));
+            height: 44px;
+            box-sizing: border-box;
+            border-bottom: 1px solid #e0e0e0;
+        }
         
-        .data-table th {{
+        .data-table .table-row > div {
+            padding: 0 1rem;
+            line-height: 43px;
+            white-space: nowrap;
+            overflow: hidden;
+            text-overflow: ellipsis;
+            border-right: 1px solid #e0e0e0;
+        }
+        
+        .data-table .table-head {
+            position: sticky;
+            top: 0;
+            z-index: 1;
             background: #0066CC;
             color: white;
-            padding: 1rem;
-            text-align: left;
             font-weight: 600;
-            border: 1px solid #0052a3;
-        }}
+        }
         
-        .data-table td {{
-            padding: 0.75rem 1rem;
-            border: 1px solid #e0e0e0;
-        }}
+        .data-table .table-head > div {
+            border-right-color: #0052a3;
+            cursor: pointer;
+            user-select: none;
+        }
+        
+        .data-table .table-head > div[aria-sort="descending"]::after {
+            content: ' ▼';
+        }
         
-        .data-table tr:nth-child(even) {{
+        .data-table .table-head > div[aria-sort="ascending"]::after {
+            content: ' ▲';
+        }
+        
+        .data-table .table-body {
+            position: relative;
+        }
+        
+        .data-table .table-body .table-row {
+            position: absolute;
+            left: 0;
+            right: 0;
+        }
+        
+        .data-table .table-body .table-row.odd {
             background: #f9f9f9;
-        }}
+        }
         
-        .data-table tr:hover {{
+        .data-table .table-body .table-row:hover {
             background: #E8F4F8;
-        }}
+        }
         
-        .download-btn {{
+        .download-btn {
             background: #0066CC;
             color: white;
             border: none;
@@ -589,43 +931,43 @@ def generate_html_dashboard(data_json, ai_insights_data, cultural_insights_data,
             font-weight: 600;
             font-size: 1rem;
             transition: all 0.3s;
-        }}
+        }
         
-        .download-btn:hover {{
+        .download-btn:hover {
             background: #0052a3;
             transform: translateY(-2px);
             box-shadow: 0 4px 8px rgba(0,102,204,0.3);
-        }}
+        }
         
-        .insights {{
+        .insights {
             background: #E8F4F8;
             padding: 1rem;
             border-radius: 8px;
             border-left: 5px solid #0066CC;
             margin-top: 1.5rem;
-        }}
+        }
         
-        .insights h3 {{
+        .insights h3 {
             color: #0066CC;
             margin-bottom: 0.5rem;
-        }}
+        }
         
-        .insights ul {{
+        .insights ul {
             margin-left: 1.5rem;
-        }}
+        }
         
-        .insights li {{
+        .insights li {
             margin: 0.5rem 0;
-        }}
+        }
         
-        .tabs {{
+        .tabs {
             display: flex;
             gap: 0.5rem;
             margin-bottom: 1rem;
             border-bottom: 2px solid #e0e0e0;
-        }}
+        }
         
-        .tab {{
+        .tab {
             padding: 0.75rem 1.5rem;
             background: #f5f5f5;
             border: none;
@@ -634,46 +976,46 @@ def generate_html_dashboard(data_json, ai_insights_data, cultural_insights_data,
             font-weight: 600;
             color: #666;
             transition: all 0.3s;
-        }}
+        }
         
-        .tab:hover {{
+        .tab:hover {
             background: #e8f4f8;
-        }}
+        }
         
-        .tab.active {{
+        .tab.active {
             background: #0066CC;
             color: white;
-        }}
+        }
         
-        .tab-content {{
+        .tab-content {
             display: none;
-        }}
+        }
         
-        .tab-content.active {{
+        .tab-content.active {
             display: block;
-        }}
+        }
         
-        .loading {{
+        .loading {
             text-align: center;
             padding: 3rem;
             color: #666;
-        }}
+        }
         
-        .no-data {{
+        .no-data {
             text-align: center;
             padding: 3rem;
             color: #999;
-        }}
+        }
         
-        .nav-tabs {{
+        .nav-tabs {
             display: flex;
             gap: 1rem;
             justify-content: center;
             margin: 2rem 0;
             padding: 0 2rem;
-        }}
+        }
         
-        .nav-tab {{
+        .nav-tab {
             padding: 1rem 2rem;
             background: white;
             border: 2px solid #0066CC;
@@ -683,33 +1025,33 @@ def generate_html_dashboard(data_json, ai_insights_data, cultural_insights_data,
             font-size: 1rem;
             color: #0066CC;
             transition: all 0.3s;
-        }}
+        }
         
-        .nav-tab:hover {{
+        .nav-tab:hover {
             background: #E8F4F8;
             transform: translateY(-2px);
             box-shadow: 0 4px 8px rgba(0,102,204,0.2);
-        }}
+        }
         
-        .nav-tab.active {{
+        .nav-tab.active {
             background: #0066CC;
             color: white;
             box-shadow: 0 4px 12px rgba(0,102,204,0.3);
-        }}
+        }
         
-        .view-content {{
+        .view-content {
             display: block;
-        }}
+        }
         
-        @media (max-width: 768px) {{
-            .filters {{
+        @media (max-width: 768px) {
+            .filters {
                 flex-direction: column;
-            }}
+            }
             
-            .filter-group {{
+            .filter-group {
                 width: 100%;
-            }}
-        }}
+            }
+        }
     </style>
 </head>
 <body>
@@ -723,9 +1065,15 @@ def generate_html_dashboard(data_json, ai_insights_data, cultural_insights_data,
         <button class="nav-tab active" onclick="showView('dashboard')">📊 Main Dashboard</button>
         <button class="nav-tab" onclick="showView('ai-summary')">🤖 AI Strategic Analysis</button>
         <button class="nav-tab" onclick="showView('cultural-insights')">🔍 Deep Cultural Insights</button>
+        <button class="nav-tab" onclick="showView('affinity-heatmap')">🗺️ Affinity Heatmap</button>
     </div>
     
     <div class="container">
+        <div class="search-box">
+            <input type="search" id="searchInput" placeholder="🔎 Search labels, sections and questions (e.g. Lush, skiing, Marriott)" autocomplete="off">
+            <div id="searchResults" class="search-results"></div>
+        </div>
+        
         <div class="filters">
             <div class="filter-group">
                 <label>Category</label>
@@ -770,94 +1118,441 @@ def generate_html_dashboard(data_json, ai_insights_data, cultural_insights_data,
         <div id="culturalInsightsView" class="view-content" style="display: none;">
             <div id="culturalInsightsContent"></div>
         </div>
+        
+        <div id="affinityHeatmapView" class="view-content" style="display: none;">
+            <div id="affinityHeatmapContent"></div>
+        </div>
     </div>
     
     <script>
-        // Data embedded in page
-        const dashboardData = {json.dumps(data_json, ensure_ascii=False, indent=2)};
-        const aiInsightsData = {json.dumps(ai_insights_data, ensure_ascii=False, indent=2)};
-        const culturalInsightsData = {json.dumps(cultural_insights_data, ensure_ascii=False, indent=2)};
+        // Manifest embedded in page; section and page data are fetched from data/ on first use
+        const manifest = """
+
+PAGE_TAIL = """;
+        const dashboardData = { categories: manifest.categories, metadata: manifest.metadata, sections: {} };
+        manifest.sections.forEach(entry => {
+            dashboardData.sections[entry.name] = { category: entry.category, chunk: entry.chunk, question: '', loaded: false };
+        });
+        let aiInsightsData = null;
+        let culturalInsightsData = null;
+        let affinityData = null;
+        let searchData = null;
+        let currentView = 'dashboard';
+        let sectionView = null;
+        let sectionQuery = 0;
+        const renderedPages = {};
+        
+        // Each chunk is downloaded once; concurrent requests share the pending promise
+        const chunkRequests = {};
+        function fetchChunk(path) {
+            if (!chunkRequests[path]) {
+                chunkRequests[path] = fetch(path).then(response => {
+                    if (!response.ok) throw new Error(`${path}: HTTP ${response.status}`);
+                    return response.json();
+                }).catch(err => {
+                    delete chunkRequests[path];
+                    throw err;
+                });
+            }
+            return chunkRequests[path];
+        }
+        
+        // Section data lives in a Web Worker as fixed-point typed arrays: filtering, ordering and CSV building
+        // happen there and the page only receives the rows it draws. The worker runs this function's source;
+        // where workers are unavailable the page runs it itself behind the same messages.
+        function dataWorker(scope) {
+            const sections = {};
+            
+            function decodeSection(chunk, scale) {
+                const size = chunk.labels.length;
+                const section = {
+                    scale: scale,
+                    labels: chunk.labels,
+                    target: Int32Array.from(chunk.target),
+                    control: new Int32Array(size),
+                    hasControl: new Uint8Array(size),
+                    index: Int32Array.from(chunk.index),
+                    order: {},
+                    views: {}
+                };
+                chunk.control.forEach((value, i) => {
+                    if (value !== null) {
+                        section.control[i] = value;
+                        section.hasControl[i] = 1;
+                    }
+                });
+                Object.keys(chunk.order).forEach(key => { section.order[key] = Uint32Array.from(chunk.order[key]); });
+                return section;
+            }
+            
+            function item(section, i) {
+                const scale = section.scale;
+                const hasControl = section.hasControl[i] === 1;
+                return {
+                    label: section.labels[i],
+                    target_pct: section.target[i] / scale,
+                    control_pct: hasControl ? section.control[i] / scale : 0,
+                    index: section.index[i] / scale,
+                    diff: hasControl ? (section.target[i] - section.control[i]) / scale : 0
+                };
+            }
+            
+            // The rows of a section in a sort key's order: the chunk's precomputed orders, and for the other
+            // table columns a permutation built here on first use and kept
+            function permutation(section, sortBy) {
+                if (!section.order[sortBy]) {
+                    const order = new Uint32Array(section.labels.length).map((_, i) => i);
+                    if (sortBy === 'label') {
+                        const collator = new Intl.Collator(undefined, { numeric: true, sensitivity: 'base' });
+                        order.sort((a, b) => collator.compare(section.labels[a], section.labels[b]) || a - b);
+                    } else if (sortBy === 'control') {
+                        const control = i => section.hasControl[i] === 1 ? section.control[i] : 0;
+                        order.sort((a, b) => control(b) - control(a) || a - b);
+                    } else {
+                        return section.order.diff;
+                    }
+                    section.order[sortBy] = order;
+                }
+                return section.order[sortBy];
+            }
+            
+            // Row numbers passing the Index filter in the chosen order, or its reverse (no sorting per request)
+            function rows(name, sortBy, minIndex, reversed) {
+                const section = sections[name];
+                if (!section) throw new Error(`${name} is not loaded`);
+                const key = `${sortBy}|${minIndex}|${reversed ? 'reversed' : ''}`;
+                if (!section.views[key]) {
+                    const order = permutation(section, sortBy);
+                    const selected = new Uint32Array(order.length);
+                    let count = 0;
+                    for (let k = 0; k < order.length; k++) {
+                        const i = order[reversed ? order.length - 1 - k : k];
+                        if (section.index[i] / section.scale >= minIndex) selected[count++] = i;
+                    }
+                    section.views = { [key]: selected.subarray(0, count) };
+                }
+                return section.views[key];
+            }
+            
+            const handlers = {
+                load: message => fetch(message.url).then(response => {
+                    if (!response.ok) throw new Error(`${message.url}: HTTP ${response.status}`);
+                    return response.json();
+                }).then(chunk => {
+                    sections[message.name] = decodeSection(chunk, message.scale);
+                    return { question: chunk.question };
+                }),
+                query: message => {
+                    const selected = rows(message.name, message.sortBy, message.minIndex, message.reversed);
+                    const start = Math.min(message.start || 0, selected.length);
+                    const end = message.limit === null ? selected.length : Math.min(selected.length, start + message.limit);
+                    return { count: selected.length, items: Array.from(selected.subarray(start, end), i => item(sections[message.name], i)) };
+                },
+                csv: message => {
+                    const section = sections[message.name];
+                    const lines = ['Response Label,Target %,Control %,Index,Difference'];
+                    rows(message.name, message.sortBy, message.minIndex, message.reversed).forEach(i => {
+                        const row = item(section, i);
+                        lines.push(`"${row.label.replace(/"/g, '""')}",${row.target_pct.toFixed(2)},${row.control_pct.toFixed(2)},${row.index.toFixed(0)},${row.diff.toFixed(2)}`);
+                    });
+                    return new Blob([lines.join('\\n')], { type: 'text/csv' });
+                }
+            };
+            
+            scope.onmessage = event => {
+                const message = event.data;
+                Promise.resolve().then(() => handlers[message.type](message)).then(
+                    result => scope.postMessage({ id: message.id, result: result }),
+                    err => scope.postMessage({ id: message.id, error: err.message })
+                );
+            };
+        }
+        
+        function startDataWorker() {
+            if (window.Worker && window.Blob && window.URL && URL.createObjectURL) {
+                try {
+                    const source = new Blob([`(${dataWorker.toString()})(self);`], { type: 'text/javascript' });
+                    return new Worker(URL.createObjectURL(source));
+                } catch (err) {
+                    // Fall through: some browsers refuse blob: workers (file:// pages, strict CSP)
+                }
+            }
+            const page = { postMessage: data => setTimeout(() => port.onmessage({ data: data })) };
+            const port = { postMessage: data => setTimeout(() => page.onmessage({ data: data })) };
+            dataWorker(page);
+            return port;
+        }
+        
+        const dataPort = startDataWorker();
+        const workerReplies = {};
+        let workerMessages = 0;
+        dataPort.onmessage = event => {
+            const reply = workerReplies[event.data.id];
+            delete workerReplies[event.data.id];
+            if (event.data.error) {
+                reply.reject(new Error(event.data.error));
+            } else {
+                reply.resolve(event.data.result);
+            }
+        };
+        
+        function askWorker(message) {
+            return new Promise((resolve, reject) => {
+                const id = ++workerMessages;
+                workerReplies[id] = { resolve: resolve, reject: reject };
+                dataPort.postMessage(Object.assign({ id: id }, message));
+            });
+        }
+        
+        // Each section is loaded into the worker once; concurrent requests share the pending promise
+        const sectionLoads = {};
+        function ensureSection(sectionName) {
+            const section = dashboardData.sections[sectionName];
+            if (!section) return Promise.resolve(null);
+            if (!sectionLoads[sectionName]) {
+                const url = new URL(section.chunk, location.href).href;
+                sectionLoads[sectionName] = askWorker({ type: 'load', name: sectionName, url: url, scale: manifest.scale }).then(info => {
+                    section.question = info.question;
+                    section.loaded = true;
+                    return section;
+                }).catch(err => {
+                    delete sectionLoads[sectionName];
+                    throw err;
+                });
+            }
+            return sectionLoads[sectionName];
+        }
+        
+        // Up to `limit` items from `start` among those passing the filters (all of them when limit is null),
+        // plus how many pass. query: { sortBy, minIndex, limit, start, reversed }
+        function querySection(sectionName, query) {
+            return ensureSection(sectionName).then(() => askWorker(Object.assign({ type: 'query', name: sectionName }, query)));
+        }
+        
+        function ensurePage(page) {
+            return manifest.pages[page] ? fetchChunk(manifest.pages[page]) : Promise.resolve(null);
+        }
+        
+        // Fetch the sections either side of the current one while the browser is idle
+        function prefetchNeighbours(sectionName) {
+            const names = Array.from(document.getElementById('sectionFilter').options).map(opt => opt.value).filter(Boolean);
+            const i = names.indexOf(sectionName);
+            const idle = window.requestIdleCallback || (fn => setTimeout(fn, 200));
+            idle(() => [names[i + 1], names[i - 1]].forEach(name => {
+                if (name) ensureSection(name).catch(() => {});
+            }));
+        }
+        
+        function showLoading(containerId, promise, render) {
+            const container = document.getElementById(containerId);
+            replaceContent(container, '<div class="no-data">Loading…</div>');
+            promise.then(render, err => {
+                replaceContent(container, `<div class="no-data">Could not load data (${escapeHtml(err.message)}).</div>`);
+            });
+        }
+        
+        // Plotly keeps listeners and layout state on every plot; purge them before their markup is thrown away
+        function replaceContent(container, html) {
+            container.querySelectorAll('.js-plotly-plot').forEach(plot => Plotly.purge(plot));
+            container.innerHTML = html;
+        }
+        
+        // Insight charts are drawn as they come within a screen of the viewport rather than all at once
+        const pendingCharts = {};
+        const chartObserver = window.IntersectionObserver ? new IntersectionObserver(entries => {
+            entries.forEach(entry => {
+                if (!entry.isIntersecting) return;
+                chartObserver.unobserve(entry.target);
+                const draw = pendingCharts[entry.target.id];
+                delete pendingCharts[entry.target.id];
+                if (draw) draw();
+            });
+        }, { rootMargin: '100% 0px' }) : null;
+        
+        function renderWhenVisible(containerId, draw) {
+            const container = document.getElementById(containerId);
+            if (!chartObserver || !container) return draw();
+            pendingCharts[containerId] = draw;
+            chartObserver.observe(container);
+        }
+        
+        // Deep links: #section=<name> selects a section, #view=<name> opens a page
+        function setHash(key, value) {
+            const hash = value ? `#${key}=${encodeURIComponent(value)}` : '';
+            if (window.history && history.replaceState) {
+                history.replaceState(null, '', hash || location.pathname + location.search);
+            } else {
+                location.hash = hash;
+            }
+        }
+        
+        function applyHash(hash) {
+            const params = new URLSearchParams((typeof hash === 'string' ? hash : location.hash).slice(1));
+            const sectionName = params.get('section');
+            const view = params.get('view');
+            if (sectionName && dashboardData.sections[sectionName]) {
+                jumpToSection(sectionName);
+                return true;
+            }
+            if (view && ['ai-summary', 'cultural-insights', 'affinity-heatmap'].includes(view)) {
+                showView(view);
+                return true;
+            }
+            return false;
+        }
         
         // Navigation
-        function showView(viewName) {{
+        function showView(viewName) {
             document.querySelectorAll('.view-content').forEach(v => v.style.display = 'none');
             document.querySelectorAll('.nav-tab').forEach(t => t.classList.remove('active'));
+            currentView = viewName;
             
-            if (viewName === 'dashboard') {{
+            if (viewName === 'dashboard') {
                 document.getElementById('dashboardView').style.display = 'block';
                 document.querySelectorAll('.nav-tab')[0].classList.add('active');
-            }} else if (viewName === 'ai-summary') {{
+                setHash('section', document.getElementById('sectionFilter').value);
+            } else if (viewName === 'ai-summary') {
                 document.getElementById('aiSummaryView').style.display = 'block';
                 document.querySelectorAll('.nav-tab')[1].classList.add('active');
-                renderAISummary();
-            }} else if (viewName === 'cultural-insights') {{
+                setHash('view', viewName);
+                if (renderedPages['ai-summary']) return;
+                showLoading('aiSummaryContent', ensurePage('ai-summary'), data => {
+                    aiInsightsData = data || [];
+                    if (currentView === 'ai-summary') renderAISummary();
+                });
+            } else if (viewName === 'cultural-insights') {
                 document.getElementById('culturalInsightsView').style.display = 'block';
                 document.querySelectorAll('.nav-tab')[2].classList.add('active');
-                renderCulturalInsights();
-            }}
-        }}
+                setHash('view', viewName);
+                if (renderedPages['cultural-insights']) return;
+                showLoading('culturalInsightsContent', ensurePage('cultural-insights'), data => {
+                    culturalInsightsData = data || [];
+                    if (currentView === 'cultural-insights') renderCulturalInsights();
+                });
+            } else if (viewName === 'affinity-heatmap') {
+                document.getElementById('affinityHeatmapView').style.display = 'block';
+                document.querySelectorAll('.nav-tab')[3].classList.add('active');
+                setHash('view', viewName);
+                if (renderedPages['affinity-heatmap']) return;
+                showLoading('affinityHeatmapContent', ensurePage('affinity-heatmap'), data => {
+                    affinityData = data;
+                    if (currentView === 'affinity-heatmap') renderAffinityHeatmap('Mean Index');
+                });
+            }
+        }
         
-        function renderAISummary() {{
+        function renderAffinityHeatmap(stat) {
+            const content = document.getElementById('affinityHeatmapContent');
+            renderedPages['affinity-heatmap'] = true;
+            if (!affinityData || affinityData.sections.length === 0) {
+                replaceContent(content, '<div class="section-card"><h2>🗺️ Affinity Heatmap</h2><p>No Index values to summarise.</p></div>');
+                return;
+            }
+            if (!document.getElementById('affinity-heatmap')) {
+                let html = '<div class="section-card"><h2>🗺️ Affinity Heatmap</h2><p>Mean Index, Median Index and High-affinity share (the fraction of items with Index ≥ 120) of every section, grouped by category. Colours show the percentile of a section among all sections on that statistic; the tabs choose the order within each category.</p><div class="tabs">';
+                affinityData.stats.forEach(name => {
+                    html += `<button class="tab" data-stat="${name}" onclick="renderAffinityHeatmap('${name}')">${name}</button>`;
+                });
+                html += '</div><div id="affinity-heatmap" class="chart-container"></div></div>';
+                replaceContent(content, html);
+            }
+            content.querySelectorAll('.tab').forEach(tab => tab.classList.toggle('active', tab.dataset.stat === stat));
+            
+            // Sections stay in their category groups, highest chosen statistic first within each (ties keep order)
+            const stats = affinityData.stats;
+            const rows = affinityData.sections.map((_, i) => i).sort((a, b) =>
+                affinityData.categories.indexOf(affinityData.section_categories[a]) -
+                affinityData.categories.indexOf(affinityData.section_categories[b]) ||
+                affinityData.values[stat][b] - affinityData.values[stat][a] || a - b);
+            const format = (name, value) => name === 'High-affinity share' ? `${(value * 100).toFixed(0)}%` : value.toFixed(0);
+            const trace = {
+                type: 'heatmap',
+                z: rows.map(i => stats.map(name => affinityData.percentiles[name][i])),
+                x: stats,
+                y: [rows.map(i => affinityData.section_categories[i]), rows.map(i => affinityData.sections[i])],
+                text: rows.map(i => stats.map(name => format(name, affinityData.values[name][i]))),
+                texttemplate: '%{text}',
+                customdata: rows.map(i => stats.map(() => `${affinityData.sections[i]} (${affinityData.items[i]} items)`)),
+                hovertemplate: '<b>%{customdata}</b><br>%{x}: %{text}<br>Percentile among sections: %{z:.0%}<extra></extra>',
+                // plotly.js runs this named scale the other way round from plotly.py
+                colorscale: 'RdBu',
+                reversescale: true,
+                zmin: 0,
+                zmax: 1,
+                colorbar: { title: { text: 'Percentile among sections' }, tickformat: '.0%' }
+            };
+            const layout = {
+                title: { text: `Section Affinity by Category (ordered by ${stat})`, automargin: true },
+                xaxis: { side: 'top', automargin: true },
+                yaxis: { autorange: 'reversed', automargin: true },
+                height: Math.max(400, 24 * rows.length + 160)
+            };
+            Plotly.react('affinity-heatmap', [trace], layout);
+        }
+        
+        function renderAISummary() {
             const content = document.getElementById('aiSummaryContent');
             let html = '<div class="section-card"><h2>🤖 AI Strategic Analysis</h2><p>Comprehensive insights for Q2 2025 Communication Strategy</p><p>Based on analysis of all data sections and 1,126+ data points</p></div>';
             html += '<div class="section-card"><h3>📋 Executive Summary</h3><div class="insight-box"><p><strong>Hilton Deep Divers represent a distinct cultural segment:</strong> High-income (200%+ median), luxury-oriented consumers aged 35-44 who view premium experiences as core to their identity. Analysis of 1,126+ data points across 51 sections reveals exceptional affinity for premium hospitality, exclusive destinations, luxury brands, and sophisticated lifestyle experiences. The cultural gap from mainstream consumers is significant, requiring communications that acknowledge their sophisticated taste and premium preferences. Q2 2025 presents strong opportunities around spring travel, premium seasonal activities, and luxury lifestyle experiences.</p></div></div>';
             
-            aiInsightsData.forEach((insight, i) => {{
-                html += `<div class="section-card"><h3>Insight ${{i+1}}: ${{insight.title}}</h3><div class="insight-box"><p>${{insight.description}}</p><p><strong>Strategic Implication for Q2:</strong> ${{insight.implication}}</p></div>`;
-                if (insight.chart_data && (Array.isArray(insight.chart_data) ? insight.chart_data.length > 0 : true)) {{
-                    html += `<div id="ai-chart-${{i}}" class="chart-container"></div>`;
-                }}
-                if (insight.chart_type === 'gap' && insight.high_examples && insight.low_examples) {{
+            aiInsightsData.forEach((insight, i) => {
+                html += `<div class="section-card"><h3>Insight ${i+1}: ${insight.title}</h3><div class="insight-box"><p>${insight.description}</p><p><strong>Strategic Implication for Q2:</strong> ${insight.implication}</p></div>`;
+                if (insight.chart_data && (Array.isArray(insight.chart_data) ? insight.chart_data.length > 0 : true)) {
+                    html += `<div id="ai-chart-${i}" class="chart-container"></div>`;
+                }
+                if (insight.chart_type === 'gap' && insight.high_examples && insight.low_examples) {
                     html += `<div style="display: grid; grid-template-columns: 1fr 1fr; gap: 1rem; margin-top: 1rem;"><div><strong>Top High Affinity Examples:</strong><table style="width: 100%; margin-top: 0.5rem; border-collapse: collapse;"><tr style="background: #0066CC; color: white;"><th style="padding: 0.5rem; border: 1px solid #ddd;">Item</th><th style="padding: 0.5rem; border: 1px solid #ddd;">Index</th><th style="padding: 0.5rem; border: 1px solid #ddd;">Target %</th><th style="padding: 0.5rem; border: 1px solid #ddd;">Control %</th></tr>`;
-                    insight.high_examples.forEach(ex => {{
-                        html += `<tr><td style="padding: 0.5rem; border: 1px solid #ddd;">${{ex.item}}</td><td style="padding: 0.5rem; border: 1px solid #ddd;">${{ex.index.toFixed(0)}}</td><td style="padding: 0.5rem; border: 1px solid #ddd;">${{ex.target_pct.toFixed(1)}}%</td><td style="padding: 0.5rem; border: 1px solid #ddd;">${{ex.control_pct.toFixed(1)}}%</td></tr>`;
-                    }});
+                    insight.high_examples.forEach(ex => {
+                        html += `<tr><td style="padding: 0.5rem; border: 1px solid #ddd;">${ex.item}</td><td style="padding: 0.5rem; border: 1px solid #ddd;">${ex.index.toFixed(0)}</td><td style="padding: 0.5rem; border: 1px solid #ddd;">${ex.target_pct.toFixed(1)}%</td><td style="padding: 0.5rem; border: 1px solid #ddd;">${ex.control_pct.toFixed(1)}%</td></tr>`;
+                    });
                     html += `</table></div><div><strong>Top Under-indexing Examples:</strong><table style="width: 100%; margin-top: 0.5rem; border-collapse: collapse;"><tr style="background: #FF6B6B; color: white;"><th style="padding: 0.5rem; border: 1px solid #ddd;">Item</th><th style="padding: 0.5rem; border: 1px solid #ddd;">Index</th><th style="padding: 0.5rem; border: 1px solid #ddd;">Target %</th><th style="padding: 0.5rem; border: 1px solid #ddd;">Control %</th></tr>`;
-                    insight.low_examples.forEach(ex => {{
-                        html += `<tr><td style="padding: 0.5rem; border: 1px solid #ddd;">${{ex.item}}</td><td style="padding: 0.5rem; border: 1px solid #ddd;">${{ex.index.toFixed(0)}}</td><td style="padding: 0.5rem; border: 1px solid #ddd;">${{ex.target_pct.toFixed(1)}}%</td><td style="padding: 0.5rem; border: 1px solid #ddd;">${{ex.control_pct.toFixed(1)}}%</td></tr>`;
-                    }});
+                    insight.low_examples.forEach(ex => {
+                        html += `<tr><td style="padding: 0.5rem; border: 1px solid #ddd;">${ex.item}</td><td style="padding: 0.5rem; border: 1px solid #ddd;">${ex.index.toFixed(0)}</td><td style="padding: 0.5rem; border: 1px solid #ddd;">${ex.target_pct.toFixed(1)}%</td><td style="padding: 0.5rem; border: 1px solid #ddd;">${ex.control_pct.toFixed(1)}%</td></tr>`;
+                    });
                     html += `</table></div></div>`;
-                }}
+                }
                 html += '</div>';
-            }});
+            });
             
-            content.innerHTML = html;
+            replaceContent(content, html);
+            renderedPages['ai-summary'] = true;
             
             // Render charts
-            aiInsightsData.forEach((insight, i) => {{
-                if (insight.chart_data) {{
-                    if (insight.chart_type === 'gap') {{
-                        renderCulturalChart(`ai-chart-${{i}}`, insight.chart_data, insight.chart_type);
-                    }} else if (Array.isArray(insight.chart_data) && insight.chart_data.length > 0) {{
-                        renderInsightChart(`ai-chart-${{i}}`, insight.chart_data, insight.chart_type);
-                    }}
-                }}
-            }});
-        }}
-        
-        function renderCulturalInsights() {{
+            aiInsightsData.forEach((insight, i) => {
+                if (insight.chart_data) {
+                    if (insight.chart_type === 'gap') {
+                        renderWhenVisible(`ai-chart-${i}`, () => renderCulturalChart(`ai-chart-${i}`, insight.chart_data, insight.chart_type));
+                    } else if (Array.isArray(insight.chart_data) && insight.chart_data.length > 0) {
+                        renderWhenVisible(`ai-chart-${i}`, () => renderInsightChart(`ai-chart-${i}`, insight.chart_data, insight.chart_type));
+                    }
+                }
+            });
+        }
+        
+        function renderCulturalInsights() {
             const content = document.getElementById('culturalInsightsContent');
             let html = '<div class="section-card"><h2>🔍 Deep Cultural Insights</h2><p>In-depth cultural analysis with specific questions about preferences, beliefs, and behaviors</p><p><em>Note: Extreme indices (>500) were filtered for statistical reliability (n=93)</em></p></div>';
             
-            culturalInsightsData.forEach((insight, i) => {{
-                html += `<div class="section-card"><h3>${{i+1}}. ${{insight.title}}</h3><div class="insight-box"><p>${{insight.description}}</p></div>`;
-                if (insight.chart_data) {{
-                    html += `<div id="cultural-chart-${{i}}" class="chart-container"></div>`;
-                }}
+            culturalInsightsData.forEach((insight, i) => {
+                html += `<div class="section-card"><h3>${i+1}. ${insight.title}</h3><div class="insight-box"><p>${insight.description}</p></div>`;
+                if (insight.chart_data) {
+                    html += `<div id="cultural-chart-${i}" class="chart-container"></div>`;
+                }
                 html += '</div>';
-            }});
+            });
             
-            content.innerHTML = html;
+            replaceContent(content, html);
+            renderedPages['cultural-insights'] = true;
             
             // Render charts
-            culturalInsightsData.forEach((insight, i) => {{
-                if (insight.chart_data) {{
-                    renderCulturalChart(`cultural-chart-${{i}}`, insight.chart_data, insight.chart_type);
-                }}
-            }});
-        }}
-        
-        function renderInsightChart(containerId, chartData, chartType) {{
+            culturalInsightsData.forEach((insight, i) => {
+                if (insight.chart_data) {
+                    renderWhenVisible(`cultural-chart-${i}`, () => renderCulturalChart(`cultural-chart-${i}`, insight.chart_data, insight.chart_type));
+                }
+            });
+        }
+        
+        function renderInsightChart(containerId, chartData, chartType) {
             // Similar to existing chart rendering but for insights
             const items = chartData;
             if (!items || items.length === 0) return;
@@ -866,50 +1561,50 @@ def generate_html_dashboard(data_json, ai_insights_data, cultural_insights_data,
             const indexData = items.map(i => i.index);
             const colors = indexData.map(idx => idx >= 120 ? '#0066CC' : idx >= 100 ? '#66B2FF' : '#CCE5FF');
             
-            const trace = {{
+            const trace = {
                 x: indexData,
                 y: labels,
                 type: 'bar',
                 orientation: 'h',
-                marker: {{ color: colors }},
-                text: indexData.map(idx => `Index: ${{idx.toFixed(0)}}`),
+                marker: { color: colors },
+                text: indexData.map(idx => `Index: ${idx.toFixed(0)}`),
                 textposition: 'outside'
-            }};
+            };
             
-            const layout = {{
-                title: 'Top Items by Index',
-                xaxis: {{ 
-                    title: 'Index (100 = National Average)',
+            const layout = {
+                title: { text: 'Top Items by Index' },
+                xaxis: { 
+                    title: { text: 'Index (100 = National Average)' },
                     automargin: true
-                }},
-                yaxis: {{ 
-                    title: '',
+                },
+                yaxis: { 
+                    title: { text: '' },
                     automargin: true,
                     tickangle: 0
-                }},
+                },
                 height: Math.max(400, items.length * 50),
-                margin: {{ l: 200, r: 120, t: 50, b: 50 }},
-                shapes: [{{
+                margin: { l: 200, r: 120, t: 50, b: 50 },
+                shapes: [{
                     type: 'line',
                     x0: 120,
                     x1: 120,
                     y0: -0.5,
                     y1: items.length - 0.5,
-                    line: {{ color: 'green', dash: 'dash' }},
-                    annotation: {{ text: 'Strong Affinity (120)', x: 120, y: items.length }}
-                }}]
-            }};
+                    line: { color: 'green', dash: 'dash' },
+                    annotation: { text: 'Strong Affinity (120)', x: 120, y: items.length }
+                }]
+            };
             
-            Plotly.newPlot(containerId, [trace], layout);
-        }}
+            Plotly.react(containerId, [trace], layout);
+        }
         
-        function renderCulturalChart(containerId, chartData, chartType) {{
+        function renderCulturalChart(containerId, chartData, chartType) {
             // Handle different chart types for cultural insights
-            if (chartType === 'hotels_destinations_scatter' && chartData.hotels && chartData.destinations) {{
+            if (chartType === 'hotels_destinations_scatter' && chartData.hotels && chartData.destinations) {
                 const hotels = chartData.hotels;
                 const destinations = chartData.destinations;
                 
-                const trace1 = {{
+                const trace1 = {
                     x: hotels.map(h => h.control_pct),
                     y: hotels.map(h => h.target_pct),
                     mode: 'markers+text',
@@ -917,12 +1612,12 @@ def generate_html_dashboard(data_json, ai_insights_data, cultural_insights_data,
                     name: 'Hotels',
                     text: hotels.map(h => h.item),
                     textposition: 'top center',
-                    marker: {{ size: hotels.map(h => Math.min(h.index/20, 30)), color: '#0066CC', opacity: 0.7 }},
+                    marker: { size: hotels.map(h => Math.min(h.index/20, 30)), color: '#0066CC', opacity: 0.7 },
                     customdata: hotels.map(h => h.index),
-                    hovertemplate: '<b>%{{text}}</b><br>Target: %{{y:.1f}}%<br>Control: %{{x:.1f}}%<br>Index: %{{customdata:.0f}}<extra></extra>'
-                }};
+                    hovertemplate: '<b>%{text}</b><br>Target: %{y:.1f}%<br>Control: %{x:.1f}%<br>Index: %{customdata:.0f}<extra></extra>'
+                };
                 
-                const trace2 = {{
+                const trace2 = {
                     x: destinations.map(d => d.control_pct),
                     y: destinations.map(d => d.target_pct),
                     mode: 'markers+text',
@@ -930,242 +1625,379 @@ def generate_html_dashboard(data_json, ai_insights_data, cultural_insights_data,
                     name: 'Destinations',
                     text: destinations.map(d => d.item),
                     textposition: 'top center',
-                    marker: {{ size: destinations.map(d => Math.min(d.index/20, 30)), color: '#FF6B6B', opacity: 0.7 }},
+                    marker: { size: destinations.map(d => Math.min(d.index/20, 30)), color: '#FF6B6B', opacity: 0.7 },
                     customdata: destinations.map(d => d.index),
-                    hovertemplate: '<b>%{{text}}</b><br>Target: %{{y:.1f}}%<br>Control: %{{x:.1f}}%<br>Index: %{{customdata:.0f}}<extra></extra>'
-                }};
+                    hovertemplate: '<b>%{text}</b><br>Target: %{y:.1f}%<br>Control: %{x:.1f}%<br>Index: %{customdata:.0f}<extra></extra>'
+                };
                 
                 const maxVal = Math.max(...hotels.map(h => Math.max(h.target_pct, h.control_pct)), ...destinations.map(d => Math.max(d.target_pct, d.control_pct)));
                 
-                const trace3 = {{
+                const trace3 = {
                     x: [0, maxVal],
                     y: [0, maxVal],
                     mode: 'lines',
                     type: 'scatter',
-                    line: {{ color: 'red', dash: 'dash' }},
+                    line: { color: 'red', dash: 'dash' },
                     name: 'Parity',
                     showlegend: false
-                }};
+                };
                 
-                Plotly.newPlot(containerId, [trace1, trace2, trace3], {{
-                    title: 'Hotels vs Destinations: Target vs Control',
-                    xaxis: {{ 
-                        title: 'National Average (%)',
+                Plotly.react(containerId, [trace1, trace2, trace3], {
+                    title: { text: 'Hotels vs Destinations: Target vs Control' },
+                    xaxis: { 
+                        title: { text: 'National Average (%)' },
                         automargin: true
-                    }},
-                    yaxis: {{ 
-                        title: 'Hilton Deep Divers (%)',
+                    },
+                    yaxis: { 
+                        title: { text: 'Hilton Deep Divers (%)' },
                         automargin: true
-                    }},
+                    },
                     height: 600,
-                    margin: {{ l: 80, r: 50, t: 50, b: 60 }}
-                }});
-            }} else if (chartType === 'travel_heatmap' || chartType === 'hobbies_scatter') {{
+                    margin: { l: 80, r: 50, t: 50, b: 60 }
+                });
+            } else if (chartType === 'travel_heatmap' || chartType === 'hobbies_scatter') {
                 // Scatter plot
                 const items = Array.isArray(chartData) ? chartData : [];
-                const trace = {{
+                const trace = {
                     x: items.map(i => i.control_pct),
                     y: items.map(i => i.target_pct),
                     mode: 'markers',
                     type: 'scatter',
                     text: items.map(i => i.item || i.label),
-                    marker: {{
+                    marker: {
                         size: items.map(i => Math.min(i.index/5, 30)),
                         color: items.map(i => i.index),
                         colorscale: 'Blues',
                         showscale: true,
-                        colorbar: {{ title: 'Index' }}
-                    }},
+                        colorbar: { title: { text: 'Index' } }
+                    },
                     customdata: items.map(i => i.index),
-                    hovertemplate: '<b>%{{text}}</b><br>Target: %{{y:.1f}}%<br>Control: %{{x:.1f}}%<br>Index: %{{customdata:.0f}}<extra></extra>'
-                }};
+                    hovertemplate: '<b>%{text}</b><br>Target: %{y:.1f}%<br>Control: %{x:.1f}%<br>Index: %{customdata:.0f}<extra></extra>'
+                };
                 
                 const maxVal = Math.max(...items.map(i => Math.max(i.target_pct, i.control_pct)));
-                const trace2 = {{
+                const trace2 = {
                     x: [0, maxVal],
                     y: [0, maxVal],
                     mode: 'lines',
                     type: 'scatter',
-                    line: {{ color: 'red', dash: 'dash' }},
+                    line: { color: 'red', dash: 'dash' },
                     showlegend: false
-                }};
+                };
                 
-                Plotly.newPlot(containerId, [trace, trace2], {{
-                    title: chartType === 'travel_heatmap' ? 'Travel Activities Heatmap' : 'Hobbies & Interests: Affinity Analysis',
-                    xaxis: {{ 
-                        title: 'National Average (%)',
+                Plotly.react(containerId, [trace, trace2], {
+                    title: { text: chartType === 'travel_heatmap' ? 'Travel Activities Heatmap' : 'Hobbies & Interests: Affinity Analysis' },
+                    xaxis: { 
+                        title: { text: 'National Average (%)' },
                         automargin: true
-                    }},
-                    yaxis: {{ 
-                        title: 'Deep Divers (%)',
+                    },
+                    yaxis: { 
+                        title: { text: 'Deep Divers (%)' },
                         automargin: true
-                    }},
+                    },
                     height: 600,
-                    margin: {{ l: 80, r: 50, t: 50, b: 60 }}
-                }});
-            }} else if (chartType === 'gap' && chartData.categories) {{
+                    margin: { l: 80, r: 50, t: 50, b: 60 }
+                });
+            } else if (chartType === 'gap' && chartData.categories) {
                 // Gap comparison chart
-                const trace = {{
+                const trace = {
                     x: chartData.categories,
                     y: chartData.avg_index,
                     type: 'bar',
-                    marker: {{ color: ['#0066CC', '#FF6B6B'] }},
-                    text: chartData.avg_index.map((idx, i) => `Avg: ${{idx.toFixed(0)}}<br>Items: ${{chartData.count[i]}}`),
+                    marker: { color: ['#0066CC', '#FF6B6B'] },
+                    text: chartData.avg_index.map((idx, i) => `Avg: ${idx.toFixed(0)}<br>Items: ${chartData.count[i]}`),
                     textposition: 'outside'
-                }};
+                };
                 
-                Plotly.newPlot(containerId, [trace], {{
-                    title: 'Cultural Gap: High Affinity vs Under-indexing',
-                    yaxis: {{ 
-                        title: 'Average Index',
+                Plotly.react(containerId, [trace], {
+                    title: { text: 'Cultural Gap: High Affinity vs Under-indexing' },
+                    yaxis: { 
+                        title: { text: 'Average Index' },
                         automargin: true
-                    }},
-                    xaxis: {{ 
-                        title: '',
+                    },
+                    xaxis: { 
+                        title: { text: '' },
                         automargin: true
-                    }},
+                    },
                     height: 500,
-                    margin: {{ l: 80, r: 50, t: 50, b: 80 }},
-                    shapes: [{{
+                    margin: { l: 80, r: 50, t: 50, b: 80 },
+                    shapes: [{
                         type: 'line',
                         x0: -0.5,
                         y0: 100,
                         x1: chartData.categories.length - 0.5,
                         y1: 100,
-                        line: {{ color: 'red', dash: 'dash' }},
-                        annotation: {{ text: 'Baseline (100)', x: chartData.categories.length - 0.5, y: 100 }}
-                    }}]
-                }});
-            }} else if (chartType === 'pattern_heatmap' && typeof chartData === 'object' && !Array.isArray(chartData)) {{
+                        line: { color: 'red', dash: 'dash' },
+                        annotation: { text: 'Baseline (100)', x: chartData.categories.length - 0.5, y: 100 }
+                    }]
+                });
+            } else if (chartType === 'pattern_heatmap' && typeof chartData === 'object' && !Array.isArray(chartData)) {
                 // Category patterns
                 const categories = Object.keys(chartData);
                 const avgIndexes = categories.map(cat => chartData[cat]['Avg Index']);
                 
-                const trace = {{
+                const trace = {
                     x: categories,
                     y: avgIndexes,
                     type: 'bar',
-                    marker: {{ color: '#0066CC' }},
+                    marker: { color: '#0066CC' },
                     text: avgIndexes.map(idx => idx.toFixed(0)),
                     textposition: 'outside'
-                }};
+                };
                 
-                Plotly.newPlot(containerId, [trace], {{
-                    title: 'Cultural Patterns: Average Affinity by Category',
-                    xaxis: {{ 
-                        title: 'Category',
+                Plotly.react(containerId, [trace], {
+                    title: { text: 'Cultural Patterns: Average Affinity by Category' },
+                    xaxis: { 
+                        title: { text: 'Category' },
                         automargin: true,
                         tickangle: -45
-                    }},
-                    yaxis: {{ 
-                        title: 'Average Index',
+                    },
+                    yaxis: { 
+                        title: { text: 'Average Index' },
                         automargin: true
-                    }},
+                    },
                     height: 400,
-                    margin: {{ l: 80, r: 50, t: 50, b: 100 }}
-                }});
-            }} else if (chartType === 'spring_comparison' || chartType === 'beliefs_comparison' || chartType === 'rejections_bar') {{
+                    margin: { l: 80, r: 50, t: 50, b: 100 }
+                });
+            } else if (chartType === 'spring_comparison' || chartType === 'beliefs_comparison' || chartType === 'rejections_bar') {
                 // Comparison bar chart
                 const items = Array.isArray(chartData) ? chartData : [];
                 const labels = items.map(i => i.item || i.label);
                 const targetData = items.map(i => i.target_pct);
                 const controlData = items.map(i => i.control_pct);
                 
-                const trace1 = {{
+                const trace1 = {
                     y: labels,
                     x: targetData,
                     name: 'Deep Divers',
                     type: 'bar',
                     orientation: 'h',
-                    marker: {{ color: '#0066CC' }},
-                    text: targetData.map(x => `${{x.toFixed(1)}}%`),
+                    marker: { color: '#0066CC' },
+                    text: targetData.map(x => `${x.toFixed(1)}%`),
                     textposition: 'outside'
-                }};
+                };
                 
-                const trace2 = {{
+                const trace2 = {
                     y: labels,
                     x: controlData,
                     name: 'National Avg',
                     type: 'bar',
                     orientation: 'h',
-                    marker: {{ color: '#CCCCCC' }},
-                    text: controlData.map(x => `${{x.toFixed(1)}}%`),
+                    marker: { color: '#CCCCCC' },
+                    text: controlData.map(x => `${x.toFixed(1)}%`),
                     textposition: 'outside'
-                }};
+                };
                 
-                Plotly.newPlot(containerId, [trace1, trace2], {{
-                    title: 'Comparison: Target vs Control',
-                    xaxis: {{ 
-                        title: 'Percentage (%)',
+                Plotly.react(containerId, [trace1, trace2], {
+                    title: { text: 'Comparison: Target vs Control' },
+                    xaxis: { 
+                        title: { text: 'Percentage (%)' },
                         automargin: true
-                    }},
-                    yaxis: {{ 
-                        title: '',
+                    },
+                    yaxis: { 
+                        title: { text: '' },
                         automargin: true,
                         tickangle: 0
-                    }},
+                    },
                     barmode: 'group',
                     height: Math.max(500, items.length * 50),
-                    margin: {{ l: 200, r: 50, t: 50, b: 50 }},
+                    margin: { l: 200, r: 50, t: 50, b: 50 },
                     showlegend: true
-                }});
-            }} else if (chartType === 'sports_categories' || chartType === 'music_events' || chartType === 'brands_multi') {{
+                });
+            } else if (chartType === 'sports_categories' || chartType === 'music_events' || chartType === 'brands_multi') {
                 // Colored bar chart
                 const items = Array.isArray(chartData) ? chartData : [];
                 const labels = items.map(i => i.item || i.label);
                 const indexData = items.map(i => i.index);
                 const colors = indexData.map(idx => idx >= 120 ? '#0066CC' : idx >= 100 ? '#66B2FF' : '#CCE5FF');
                 
-                const trace = {{
+                const trace = {
                     y: labels,
                     x: indexData,
                     type: 'bar',
                     orientation: 'h',
-                    marker: {{ color: colors }},
-                    text: indexData.map(idx => `Index: ${{idx.toFixed(0)}}`),
+                    marker: { color: colors },
+                    text: indexData.map(idx => `Index: ${idx.toFixed(0)}`),
                     textposition: 'outside'
-                }};
+                };
                 
-                Plotly.newPlot(containerId, [trace], {{
-                    title: 'Top Items by Index',
-                    xaxis: {{ 
-                        title: 'Index (100 = National Average)',
+                Plotly.react(containerId, [trace], {
+                    title: { text: 'Top Items by Index' },
+                    xaxis: { 
+                        title: { text: 'Index (100 = National Average)' },
                         automargin: true
-                    }},
-                    yaxis: {{ 
-                        title: '',
+                    },
+                    yaxis: { 
+                        title: { text: '' },
                         automargin: true,
                         tickangle: 0
-                    }},
+                    },
                     height: Math.max(500, items.length * 45),
-                    margin: {{ l: 200, r: 100, t: 50, b: 50 }},
-                    shapes: [{{
+                    margin: { l: 200, r: 100, t: 50, b: 50 },
+                    shapes: [{
                         type: 'line',
                         x0: 120,
                         x1: 120,
                         y0: -0.5,
                         y1: items.length - 0.5,
-                        line: {{ color: 'green', dash: 'dash' }},
-                        annotation: {{ text: 'Strong Affinity (120)', x: 120, y: items.length }}
-                    }}]
-                }});
-            }} else {{
+                        line: { color: 'green', dash: 'dash' },
+                        annotation: { text: 'Strong Affinity (120)', x: 120, y: items.length }
+                    }]
+                });
+            } else {
                 // Default bar chart
                 renderInsightChart(containerId, chartData, chartType);
-            }}
-        }}
+            }
+        }
+        
+        // Search: same normalisation and scoring as search_index.py
+        function normalizeText(text) {
+            return String(text).normalize('NFKD').replace(/\\p{M}/gu, '').toLowerCase().replace(/[^a-z0-9]+/g, ' ').trim();
+        }
+        
+        function tokenizeText(text) {
+            const normalized = normalizeText(text);
+            return normalized ? normalized.split(' ') : [];
+        }
+        
+        function wordGrams(word) {
+            const padded = `^${word}$`;
+            const grams = new Set();
+            for (let i = 0; i + 3 <= padded.length; i++) grams.add(padded.slice(i, i + 3));
+            return Array.from(grams);
+        }
+        
+        function termMatches(term) {
+            const words = searchData.words;
+            const matches = new Map();
+            let lo = 0, hi = words.length;
+            while (lo < hi) {
+                const mid = (lo + hi) >> 1;
+                if (words[mid] < term) lo = mid + 1; else hi = mid;
+            }
+            for (let w = lo; w < words.length && words[w].startsWith(term); w++) {
+                matches.set(w, words[w] === term ? 1.0 : searchData.prefix_score);
+            }
+            if (term.length >= searchData.min_fuzzy_length) {
+                const queryGrams = wordGrams(term);
+                const shared = new Map();
+                queryGrams.forEach(gram => {
+                    (searchData.grams[gram] || []).forEach(w => shared.set(w, (shared.get(w) || 0) + 1));
+                });
+                shared.forEach((count, w) => {
+                    const dice = 2 * count / (queryGrams.length + searchData.word_gram_counts[w]);
+                    if (dice >= searchData.fuzzy_min) {
+                        matches.set(w, Math.max(matches.get(w) || 0, searchData.fuzzy_weight * dice));
+                    }
+                });
+            }
+            return matches;
+        }
+        
+        function searchDocs(query, limit) {
+            const terms = Array.from(new Set(tokenizeText(query)));
+            const docs = searchData.docs;
+            if (!terms.length || !docs.text.length) return [];
+            let totals = null;
+            for (const term of terms) {
+                const matches = termMatches(term);
+                if (!matches.size) return [];
+                const termScores = new Map();
+                matches.forEach((similarity, w) => {
+                    for (let p = searchData.word_indptr[w]; p < searchData.word_indptr[w + 1]; p++) {
+                        const doc = searchData.word_docs[p];
+                        if (!(termScores.get(doc) >= similarity)) termScores.set(doc, similarity);
+                    }
+                });
+                // Keep only documents every term has matched so far
+                const next = new Map();
+                termScores.forEach((score, doc) => {
+                    if (totals === null) next.set(doc, score);
+                    else if (totals.has(doc)) next.set(doc, totals.get(doc) + score);
+                });
+                totals = next;
+            }
+            const hits = Array.from(totals, ([doc, total]) => ({
+                doc: doc,
+                score: total / terms.length * searchData.kind_weights[docs.kind[doc]]
+            }));
+            hits.sort((a, b) => (b.score - a.score) || (docs.text[a.doc].length - docs.text[b.doc].length) || (a.doc - b.doc));
+            return hits.slice(0, limit).map(hit => ({
+                kind: searchData.kinds[docs.kind[hit.doc]],
+                text: docs.text[hit.doc],
+                section: searchData.sections[docs.section[hit.doc]],
+                index: docs.index[hit.doc],
+                score: hit.score
+            }));
+        }
+        
+        function escapeHtml(text) {
+            return String(text).replace(/[&<>"']/g, ch => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'})[ch]);
+        }
+        
+        function renderSearchResults() {
+            const container = document.getElementById('searchResults');
+            const query = document.getElementById('searchInput').value;
+            if (!query.trim()) {
+                container.innerHTML = '';
+                return;
+            }
+            if (!searchData) {
+                ensurePage('search').then(data => {
+                    if (data) {
+                        searchData = data;
+                        renderSearchResults();
+                    }
+                }, () => {
+                    container.innerHTML = '<div class="search-result"><small>Search is unavailable.</small></div>';
+                });
+                return;
+            }
+            const hits = searchDocs(query, 12);
+            if (!hits.length) {
+                container.innerHTML = '<div class="search-result"><small>No matches.</small></div>';
+                return;
+            }
+            const icons = { label: '🏷️', section: '📂', question: '❓' };
+            container.innerHTML = hits.map((hit, i) => {
+                const detail = hit.index !== null ? ` · Index ${hit.index.toFixed(0)}` : '';
+                const where = hit.kind === 'section' ? '' : `<br><small>${escapeHtml(hit.section)}${detail}</small>`;
+                return `<div class="search-result" data-hit="${i}">${icons[hit.kind]} ${escapeHtml(hit.text)}${where}</div>`;
+            }).join('');
+            container.querySelectorAll('[data-hit]').forEach(el => {
+                el.addEventListener('click', () => jumpToSection(hits[Number(el.dataset.hit)].section));
+            });
+        }
+        
+        function jumpToSection(sectionName) {
+            const section = dashboardData.sections[sectionName];
+            if (!section) return;
+            const categorySelect = document.getElementById('categoryFilter');
+            categorySelect.value = Array.from(categorySelect.options).some(opt => opt.value === section.category) ? section.category : 'all';
+            updateSectionFilter();
+            document.getElementById('sectionFilter').value = sectionName;
+            document.getElementById('searchResults').innerHTML = '';
+            showView('dashboard');
+            loadSection(sectionName);
+        }
         
         // Initialize dashboard
-        function initDashboard() {{
+        function initDashboard() {
             populateFilters();
+            const searchInput = document.getElementById('searchInput');
+            searchInput.addEventListener('input', renderSearchResults);
+            searchInput.addEventListener('focus', () => ensurePage('search').catch(() => {}));
+            window.addEventListener('hashchange', () => applyHash());
+            const linkedHash = location.hash;
+            if (new URLSearchParams(linkedHash.slice(1)).has('section') && applyHash(linkedHash)) return;
             
             // Set default category to "Travel & Hospitality"
             const categorySelect = document.getElementById('categoryFilter');
             const defaultCategory = 'Travel & Hospitality';
-            if (Array.from(categorySelect.options).some(opt => opt.value === defaultCategory)) {{
+            if (Array.from(categorySelect.options).some(opt => opt.value === defaultCategory)) {
                 categorySelect.value = defaultCategory;
                 updateSectionFilter();
-            }}
+            }
             
             // Set default section to "Leisure trips - most preferred"
             const sectionSelect = document.getElementById('sectionFilter');
@@ -1173,264 +2005,318 @@ def generate_html_dashboard(data_json, ai_insights_data, cultural_insights_data,
             
             // Find matching section
             let defaultSection = null;
-            Array.from(sectionSelect.options).forEach(opt => {{
-                if (opt.value && opt.value.toLowerCase().includes('leisure trips') && opt.value.toLowerCase().includes('most preferred')) {{
+            Array.from(sectionSelect.options).forEach(opt => {
+                if (opt.value && opt.value.toLowerCase().includes('leisure trips') && opt.value.toLowerCase().includes('most preferred')) {
                     defaultSection = opt.value;
-                }}
-            }});
+                }
+            });
             
             // If exact match not found, try partial match
-            if (!defaultSection) {{
-                Array.from(sectionSelect.options).forEach(opt => {{
-                    if (opt.value && opt.value.toLowerCase().includes('leisure trips')) {{
+            if (!defaultSection) {
+                Array.from(sectionSelect.options).forEach(opt => {
+                    if (opt.value && opt.value.toLowerCase().includes('leisure trips')) {
                         defaultSection = opt.value;
-                    }}
-                }});
-            }}
+                    }
+                });
+            }
             
             // If still not found, use first available section
-            if (!defaultSection && sectionSelect.options.length > 1) {{
+            if (!defaultSection && sectionSelect.options.length > 1) {
                 defaultSection = sectionSelect.options[1].value; // Skip the "Select a section" option
-            }}
+            }
             
-            if (defaultSection) {{
+            if (defaultSection) {
                 sectionSelect.value = defaultSection;
                 loadSection(defaultSection);
-            }}
-        }}
+            }
+            
+            // A linked page opens over the default section
+            applyHash(linkedHash);
+        }
         
-        function populateFilters() {{
+        function populateFilters() {
             // Populate categories
             const categorySelect = document.getElementById('categoryFilter');
             const categories = Object.keys(dashboardData.categories);
-            categories.forEach(cat => {{
+            categories.forEach(cat => {
                 const option = document.createElement('option');
                 option.value = cat;
                 option.textContent = cat;
                 categorySelect.appendChild(option);
-            }});
+            });
             
             // Populate sections
             updateSectionFilter();
             
             // Event listeners
             categorySelect.addEventListener('change', updateSectionFilter);
-            document.getElementById('sectionFilter').addEventListener('change', (e) => {{
+            document.getElementById('sectionFilter').addEventListener('change', (e) => {
                 if (e.target.value) loadSection(e.target.value);
-            }});
-            document.getElementById('sortBy').addEventListener('change', () => {{
+            });
+            document.getElementById('sortBy').addEventListener('change', () => {
                 const section = document.getElementById('sectionFilter').value;
                 if (section) loadSection(section);
-            }});
-            document.getElementById('topN').addEventListener('change', () => {{
+            });
+            document.getElementById('topN').addEventListener('change', () => {
                 const section = document.getElementById('sectionFilter').value;
                 if (section) loadSection(section);
-            }});
-            document.getElementById('minIndex').addEventListener('change', () => {{
+            });
+            document.getElementById('minIndex').addEventListener('change', () => {
                 const section = document.getElementById('sectionFilter').value;
                 if (section) loadSection(section);
-            }});
-        }}
+            });
+        }
         
-        function updateSectionFilter() {{
+        function updateSectionFilter() {
             const category = document.getElementById('categoryFilter').value;
             const sectionSelect = document.getElementById('sectionFilter');
             sectionSelect.innerHTML = '<option value="">Select a section</option>';
             
-            Object.keys(dashboardData.sections).forEach(sectionName => {{
-                const section = dashboardData.sections[sectionName];
-                if (category === 'all' || section.category === category) {{
+            manifest.sections.forEach(entry => {
+                const sectionName = entry.name;
+                if (category === 'all' || entry.category === category) {
                     const option = document.createElement('option');
                     option.value = sectionName;
                     option.textContent = sectionName;
                     sectionSelect.appendChild(option);
-                }}
-            }});
-        }}
+                }
+            });
+        }
         
-        function loadSection(sectionName) {{
+        function loadSection(sectionName) {
             const section = dashboardData.sections[sectionName];
             if (!section) return;
+            if (currentView === 'dashboard') setHash('section', sectionName);
             
             const sortBy = document.getElementById('sortBy').value;
             const topN = parseInt(document.getElementById('topN').value);
             const minIndex = parseFloat(document.getElementById('minIndex').value);
             
-            // Filter and sort data
-            let items = section.items.filter(item => item.index >= minIndex);
-            
-            if (sortBy === 'index') {{
-                items.sort((a, b) => b.index - a.index);
-            }} else if (sortBy === 'target') {{
-                items.sort((a, b) => b.target_pct - a.target_pct);
-            }} else {{
-                items.sort((a, b) => b.diff - a.diff);
-            }}
-            
-            items = items.slice(0, topN);
-            
-            // Render section
-            renderSection(sectionName, section, items);
-        }}
+            // Filter and sort in the worker; only the latest request is rendered
+            const token = ++sectionQuery;
+            const request = querySection(sectionName, { sortBy: sortBy, minIndex: minIndex, limit: topN });
+            const render = result => {
+                if (token !== sectionQuery) return;
+                renderSection(sectionName, section, result.items, { sortBy: sortBy, minIndex: minIndex });
+                prefetchNeighbours(sectionName);
+            };
+            if (section.loaded) {
+                request.then(render, err => {
+                    if (token === sectionQuery) replaceContent(document.getElementById('dashboardContent'), `<div class="no-data">Could not load data (${escapeHtml(err.message)}).</div>`);
+                });
+            } else {
+                showLoading('dashboardContent', request, render);
+            }
+        }
         
-        function renderSection(sectionName, section, items) {{
+        function renderSection(sectionName, section, items, filters) {
             const content = document.getElementById('dashboardContent');
             
-            if (items.length === 0) {{
-                content.innerHTML = '<div class="no-data">No data available with the selected filters.</div>';
+            if (items.length === 0) {
+                sectionView = null;
+                replaceContent(content, '<div class="no-data">No data available with the selected filters.</div>');
                 return;
-            }}
+            }
+            
+            // A filter change on the same section keeps its card (and chosen tab) and only redraws
+            const reuse = sectionView && sectionView.name === sectionName && document.getElementById(`chart-${sectionName}`);
+            sectionView = { name: sectionName, section: section, items: items, filters: filters, tab: reuse ? sectionView.tab : 'comparison' };
+            if (reuse) {
+                document.getElementById(`insights-${sectionName}`).innerHTML = generateChartInsights(items);
+                drawSectionTab();
+                return;
+            }
             
             let html = `
                 <div class="section-card">
                     <div class="section-header">
-                        <h2>${{sectionName}}</h2>
-                        ${{section.question && section.question.trim() && !section.question.match(/^\\d+\\.?\\d*%/) ? `<p class="question"><strong>Question:</strong> ${{section.question}}</p>` : ''}}
+                        <h2>${sectionName}</h2>
+                        ${section.question && section.question.trim() && !section.question.match(/^\\d+\\.?\\d*%/) ? `<p class="question"><strong>Question:</strong> ${section.question}</p>` : ''}
                     </div>
                     
                     <div class="tabs">
-                        <button class="tab active" onclick="switchTab('comparison', '${{sectionName}}')">📊 Comparison</button>
-                        <button class="tab" onclick="switchTab('index', '${{sectionName}}')">📈 Index Analysis</button>
-                        <button class="tab" onclick="switchTab('scatter', '${{sectionName}}')">🎯 Scatter Plot</button>
-                        <button class="tab" onclick="switchTab('table', '${{sectionName}}')">📋 Data Table</button>
+                        <button class="tab" data-tab="comparison" onclick="switchTab('comparison', '${sectionName}')">📊 Comparison</button>
+                        <button class="tab" data-tab="index" onclick="switchTab('index', '${sectionName}')">📈 Index Analysis</button>
+                        <button class="tab" data-tab="scatter" onclick="switchTab('scatter', '${sectionName}')">🎯 Scatter Plot</button>
+                        <button class="tab" data-tab="table" onclick="switchTab('table', '${sectionName}')">📋 Data Table</button>
                     </div>
                     
-                    <div id="chart-${{sectionName}}" class="chart-container"></div>
-                    <div id="table-${{sectionName}}" class="table-container" style="display: none;"></div>
+                    <div id="chart-${sectionName}" class="chart-container"></div>
+                    <div id="table-${sectionName}" class="table-container" style="display: none;"></div>
                     
                     <div class="insights">
                         <h3>💡 Chart Insights</h3>
-                        <ul>
-                            ${{generateChartInsights(items)}}
+                        <ul id="insights-${sectionName}">
+                            ${generateChartInsights(items)}
                         </ul>
                     </div>
                 </div>
             `;
             
-            content.innerHTML = html;
-            
-            // Render default chart
-            renderComparisonChart(sectionName, items);
-        }}
+            replaceContent(content, html);
+            drawSectionTab();
+        }
         
-        function generateChartInsights(items) {{
+        function generateChartInsights(items) {
             if (!items || items.length === 0) return '<li>No insights available</li>';
             
             let html = '';
             
             // Top performer
             const top = items.reduce((max, item) => item.index > max.index ? item : max, items[0]);
-            html += `<li><strong>Top Performer:</strong> ${{top.label}} leads with an Index of ${{top.index.toFixed(0)}}, showing ${{top.target_pct.toFixed(1)}}% adoption among Hilton Deep Divers vs ${{top.control_pct.toFixed(1)}}% nationally - a ${{top.index.toFixed(0)}}% higher likelihood than the average consumer.</li>`;
+            html += `<li><strong>Top Performer:</strong> ${top.label} leads with an Index of ${top.index.toFixed(0)}, showing ${top.target_pct.toFixed(1)}% adoption among Hilton Deep Divers vs ${top.control_pct.toFixed(1)}% nationally - a ${top.index.toFixed(0)}% higher likelihood than the average consumer.</li>`;
             
             // Largest gap
             const largestGap = items.reduce((max, item) => item.diff > max.diff ? item : max, items[0]);
-            if (largestGap.diff > 0) {{
-                html += `<li><strong>Biggest Opportunity:</strong> ${{largestGap.label}} shows the largest gap with ${{largestGap.diff.toFixed(1)}} percentage points difference (${{largestGap.target_pct.toFixed(1)}}% vs ${{largestGap.control_pct.toFixed(1)}}%), indicating strong alignment with this segment's preferences.</li>`;
-            }}
+            if (largestGap.diff > 0) {
+                html += `<li><strong>Biggest Opportunity:</strong> ${largestGap.label} shows the largest gap with ${largestGap.diff.toFixed(1)} percentage points difference (${largestGap.target_pct.toFixed(1)}% vs ${largestGap.control_pct.toFixed(1)}%), indicating strong alignment with this segment's preferences.</li>`;
+            }
             
             // High affinity count
             const highAffinity = items.filter(i => i.index >= 120);
-            if (highAffinity.length > 0) {{
+            if (highAffinity.length > 0) {
                 const avgHighIndex = highAffinity.reduce((sum, i) => sum + i.index, 0) / highAffinity.length;
-                html += `<li><strong>Strong Affinity Cluster:</strong> ${{highAffinity.length}} item(s) in this view show Index ≥120 (good affinity). The average Index for these high-affinity items is ${{avgHighIndex.toFixed(0)}}, demonstrating clear differentiation from the national average in this category.</li>`;
-            }} else if (items.length > 0) {{
+                html += `<li><strong>Strong Affinity Cluster:</strong> ${highAffinity.length} item(s) in this view show Index ≥120 (good affinity). The average Index for these high-affinity items is ${avgHighIndex.toFixed(0)}, demonstrating clear differentiation from the national average in this category.</li>`;
+            } else if (items.length > 0) {
                 const avgIndex = items.reduce((sum, i) => sum + i.index, 0) / items.length;
-                html += `<li><strong>Overall Affinity:</strong> Average Index of ${{avgIndex.toFixed(0)}} indicates this category shows ${{avgIndex > 100 ? 'above' : 'below'}} average affinity with the Hilton Deep Divers segment.</li>`;
-            }}
+                html += `<li><strong>Overall Affinity:</strong> Average Index of ${avgIndex.toFixed(0)} indicates this category shows ${avgIndex > 100 ? 'above' : 'below'} average affinity with the Hilton Deep Divers segment.</li>`;
+            }
             
             return html;
-        }}
+        }
         
-        function generateInsights(items) {{
+        function generateInsights(items) {
             return generateChartInsights(items);
-        }}
+        }
         
-        function switchTab(tabType, sectionName) {{
-            // Update tab buttons
-            document.querySelectorAll(`.tab`).forEach(tab => tab.classList.remove('active'));
-            event.target.classList.add('active');
-            
-            const section = dashboardData.sections[sectionName];
-            const sortBy = document.getElementById('sortBy').value;
-            const topN = parseInt(document.getElementById('topN').value);
-            const minIndex = parseFloat(document.getElementById('minIndex').value);
-            
-            let items = section.items.filter(item => item.index >= minIndex);
-            
-            if (sortBy === 'index') {{
-                items.sort((a, b) => b.index - a.index);
-            }} else if (sortBy === 'target') {{
-                items.sort((a, b) => b.target_pct - a.target_pct);
-            }} else {{
-                items.sort((a, b) => b.diff - a.diff);
-            }}
-            
-            items = items.slice(0, topN);
-            
-            if (tabType === 'comparison') {{
-                document.getElementById(`chart-${{sectionName}}`).style.display = 'block';
-                document.getElementById(`table-${{sectionName}}`).style.display = 'none';
-                renderComparisonChart(sectionName, items);
-            }} else if (tabType === 'index') {{
-                document.getElementById(`chart-${{sectionName}}`).style.display = 'block';
-                document.getElementById(`table-${{sectionName}}`).style.display = 'none';
-                renderIndexChart(sectionName, items);
-            }} else if (tabType === 'scatter') {{
-                document.getElementById(`chart-${{sectionName}}`).style.display = 'block';
-                document.getElementById(`table-${{sectionName}}`).style.display = 'none';
-                renderScatterChart(sectionName, items);
-            }} else if (tabType === 'table') {{
-                document.getElementById(`chart-${{sectionName}}`).style.display = 'none';
-                document.getElementById(`table-${{sectionName}}`).style.display = 'block';
-                renderDataTable(sectionName, section, items);
-            }}
-        }}
-        
-        function renderDataTable(sectionName, section, items) {{
-            const tableContainer = document.getElementById(`table-${{sectionName}}`);
-            
-            // Get all items for the table (not just filtered top N)
-            const sectionData = dashboardData.sections[sectionName];
-            const sortBy = document.getElementById('sortBy').value;
-            const minIndex = parseFloat(document.getElementById('minIndex').value);
-            
-            let allItems = sectionData.items.filter(item => item.index >= minIndex);
-            
-            if (sortBy === 'index') {{
-                allItems.sort((a, b) => b.index - a.index);
-            }} else if (sortBy === 'target') {{
-                allItems.sort((a, b) => b.target_pct - a.target_pct);
-            }} else {{
-                allItems.sort((a, b) => b.diff - a.diff);
-            }}
-            
-            let tableHtml = '<div class="table-wrapper"><h3 style="margin-bottom: 1rem;">Detailed Data Table</h3><table class="data-table"><thead><tr>';
-            tableHtml += '<th>Response Label</th><th>Target %</th><th>Control %</th><th>Index</th><th>Difference</th>';
-            tableHtml += '</tr></thead><tbody>';
-            
-            allItems.forEach(item => {{
-                tableHtml += `<tr>
-                    <td>${{item.label}}</td>
-                    <td>${{item.target_pct.toFixed(2)}}%</td>
-                    <td>${{item.control_pct.toFixed(2)}}%</td>
-                    <td>${{item.index.toFixed(0)}}</td>
-                    <td>${{item.diff.toFixed(2)}}%</td>
-                </tr>`;
-            }});
+        function switchTab(tabType, sectionName) {
+            if (!sectionView || sectionView.name !== sectionName) return;
+            sectionView.tab = tabType;
+            drawSectionTab();
+        }
+        
+        // Draw the current section's active tab from the items loadSection already filtered
+        function drawSectionTab() {
+            const { name, section, items, tab } = sectionView;
+            document.getElementById('dashboardContent').querySelectorAll('.tab').forEach(button => {
+                button.classList.toggle('active', button.dataset.tab === tab);
+            });
+            document.getElementById(`chart-${name}`).style.display = tab === 'table' ? 'none' : 'block';
+            document.getElementById(`table-${name}`).style.display = tab === 'table' ? 'block' : 'none';
             
-            tableHtml += '</tbody></table></div>';
+            if (tab === 'comparison') {
+                renderComparisonChart(name, items);
+            } else if (tab === 'index') {
+                renderIndexChart(name, items);
+            } else if (tab === 'scatter') {
+                renderScatterChart(name, items);
+            } else if (tab === 'table') {
+                renderDataTable(name, sectionView.filters);
+            }
+        }
+        
+        // The data table draws only the rows in and just around its viewport, fetched from the worker in the
+        // table's order; headers re-sort through the worker's permutations
+        const TABLE_ROW_HEIGHT = 44;
+        const TABLE_OVERSCAN = 10;
+        const TABLE_COLUMNS = [
+            { key: 'label', title: 'Response Label', ascending: true, cell: item => escapeHtml(item.label) },
+            { key: 'target', title: 'Target %', cell: item => `${item.target_pct.toFixed(2)}%` },
+            { key: 'control', title: 'Control %', cell: item => `${item.control_pct.toFixed(2)}%` },
+            { key: 'index', title: 'Index', cell: item => item.index.toFixed(0) },
+            { key: 'diff', title: 'Difference', cell: item => `${item.diff.toFixed(2)}%` }
+        ];
+        
+        function renderDataTable(sectionName, filters) {
+            const tableContainer = document.getElementById(`table-${sectionName}`);
+            let tableHtml = `<div class="table-wrapper"><h3 style="margin-bottom: 1rem;">Detailed Data Table <small id="table-count-${sectionName}"></small></h3>`;
+            tableHtml += `<div id="table-scroll-${sectionName}" class="data-table" role="table"><div class="table-row table-head" role="row">`;
+            TABLE_COLUMNS.forEach(column => {
+                tableHtml += `<div role="columnheader" data-sort="${column.key}" onclick="sortDataTable('${column.key}')">${column.title}</div>`;
+            });
+            tableHtml += `</div><div id="table-body-${sectionName}" class="table-body" role="rowgroup"></div></div></div>`;
             
-            // Add download button
-            const csvRows = allItems.map(item => `"${{item.label.replace(/"/g, '""')}}",${{item.target_pct.toFixed(2)}},${{item.control_pct.toFixed(2)}},${{item.index.toFixed(0)}},${{item.diff.toFixed(2)}}`);
-            const csvContent = 'Response Label,Target %,Control %,Index,Difference\\n' + csvRows.join('\\n');
+            // The CSV is built by the worker when the button is pressed
+            tableHtml += `<div style="margin-top: 1rem;"><button onclick="downloadSectionCSV('${sectionName}')" class="download-btn">📥 Download filtered data as CSV</button></div>`;
+            tableContainer.innerHTML = tableHtml;
             
-            tableHtml += `<div style="margin-top: 1rem;"><button onclick="downloadCSV('${{sectionName.replace(/ /g, '_')}}_data.csv', ${{JSON.stringify(csvContent)}})" class="download-btn">📥 Download filtered data as CSV</button></div>`;
+            const table = {
+                name: sectionName,
+                minIndex: filters.minIndex,
+                sortBy: filters.sortBy,
+                reversed: false,
+                viewport: document.getElementById(`table-scroll-${sectionName}`),
+                body: document.getElementById(`table-body-${sectionName}`),
+                start: 0,
+                end: 0,
+                count: null,
+                request: 0,
+                frame: 0
+            };
+            sectionView.table = table;
+            const frame = window.requestAnimationFrame || (fn => setTimeout(fn, 16));
+            table.viewport.addEventListener('scroll', () => {
+                if (!table.frame) table.frame = frame(() => {
+                    table.frame = 0;
+                    drawTableRows(table, false);
+                });
+            }, { passive: true });
+            markTableSort(table);
+            drawTableRows(table, true);
+        }
+        
+        function drawTableRows(table, force) {
+            if (!sectionView || sectionView.table !== table) return;
+            const top = Math.floor((table.viewport.scrollTop || 0) / TABLE_ROW_HEIGHT);
+            const bottom = Math.ceil(((table.viewport.scrollTop || 0) + (table.viewport.clientHeight || 0)) / TABLE_ROW_HEIGHT);
+            if (!force && table.start <= top && (bottom <= table.end || table.end === table.count)) return;
             
-            tableContainer.innerHTML = tableHtml;
-        }}
+            const start = Math.max(0, top - TABLE_OVERSCAN);
+            const request = ++table.request;
+            querySection(table.name, { sortBy: table.sortBy, reversed: table.reversed, minIndex: table.minIndex,
+                                       start: start, limit: bottom - start + TABLE_OVERSCAN }).then(result => {
+                if (request !== table.request) return;
+                table.start = start;
+                table.end = start + result.items.length;
+                table.count = result.count;
+                table.body.style.height = `${result.count * TABLE_ROW_HEIGHT}px`;
+                table.body.innerHTML = result.items.map((item, k) => {
+                    const row = start + k;
+                    const cells = TABLE_COLUMNS.map(column => `<div role="cell">${column.cell(item)}</div>`).join('');
+                    return `<div class="table-row${row % 2 ? ' odd' : ''}" role="row" style="top: ${row * TABLE_ROW_HEIGHT}px" title="${escapeHtml(item.label)}">${cells}</div>`;
+                }).join('');
+                document.getElementById(`table-count-${table.name}`).textContent = `(${result.count.toLocaleString()} rows)`;
+            });
+        }
         
-        function downloadCSV(filename, content) {{
-            const blob = new Blob([content], {{ type: 'text/csv' }});
+        function sortDataTable(key) {
+            const table = sectionView && sectionView.table;
+            if (!table) return;
+            table.reversed = table.sortBy === key ? !table.reversed : false;
+            table.sortBy = key;
+            table.viewport.scrollTop = 0;
+            markTableSort(table);
+            drawTableRows(table, true);
+        }
+        
+        function markTableSort(table) {
+            table.viewport.querySelectorAll('[data-sort]').forEach(header => {
+                const column = TABLE_COLUMNS.find(c => c.key === header.dataset.sort);
+                const ascending = Boolean(column.ascending) !== table.reversed;
+                header.setAttribute('aria-sort', column.key === table.sortBy ? (ascending ? 'ascending' : 'descending') : 'none');
+            });
+        }
+        
+        function downloadSectionCSV(sectionName) {
+            if (!sectionView || sectionView.name !== sectionName) return;
+            const filters = sectionView.filters;
+            const table = sectionView.table || { sortBy: filters.sortBy, reversed: false };
+            askWorker({ type: 'csv', name: sectionName, sortBy: table.sortBy, reversed: table.reversed, minIndex: filters.minIndex }).then(blob => {
+                downloadCSV(`${sectionName.replace(/ /g, '_')}_data.csv`, blob);
+            });
+        }
+        
+        function downloadCSV(filename, blob) {
             const url = window.URL.createObjectURL(blob);
             const a = document.createElement('a');
             a.href = url;
@@ -1439,195 +2325,673 @@ def generate_html_dashboard(data_json, ai_insights_data, cultural_insights_data,
             a.click();
             document.body.removeChild(a);
             window.URL.revokeObjectURL(url);
-        }}
+        }
         
-        function renderComparisonChart(sectionName, items) {{
+        function renderComparisonChart(sectionName, items) {
             const labels = items.map(i => i.label);
             const targetData = items.map(i => i.target_pct);
             const controlData = items.map(i => i.control_pct);
             
-            const trace1 = {{
+            const trace1 = {
                 x: targetData,
                 y: labels,
                 name: 'Hilton Deep Divers',
                 type: 'bar',
                 orientation: 'h',
-                marker: {{ color: '#0066CC' }}
-            }};
+                marker: { color: '#0066CC' }
+            };
             
-            const trace2 = {{
+            const trace2 = {
                 x: controlData,
                 y: labels,
                 name: 'National Average',
                 type: 'bar',
                 orientation: 'h',
-                marker: {{ color: '#CCCCCC' }},
-                text: controlData.map(x => `${{x.toFixed(1)}}%`),
+                marker: { color: '#CCCCCC' },
+                text: controlData.map(x => `${x.toFixed(1)}%`),
                 textposition: 'outside'
-            }};
+            };
             
-            trace1.text = targetData.map(x => `${{x.toFixed(1)}}%`);
+            trace1.text = targetData.map(x => `${x.toFixed(1)}%`);
             trace1.textposition = 'outside';
             
-            const layout = {{
-                title: 'Comparison: Target vs Control',
-                xaxis: {{ 
-                    title: 'Percentage (%)',
+            const layout = {
+                title: { text: 'Comparison: Target vs Control' },
+                xaxis: { 
+                    title: { text: 'Percentage (%)' },
                     automargin: true
-                }},
-                yaxis: {{ 
-                    title: '',
+                },
+                yaxis: { 
+                    title: { text: '' },
                     automargin: true,
                     tickangle: 0
-                }},
+                },
                 barmode: 'group',
                 height: Math.max(400, items.length * 50),
-                margin: {{ l: 200, r: 50, t: 50, b: 50 }},
+                margin: { l: 200, r: 50, t: 50, b: 50 },
                 showlegend: true
-            }};
+            };
             
-            Plotly.newPlot(`chart-${{sectionName}}`, [trace1, trace2], layout);
-        }}
+            Plotly.react(`chart-${sectionName}`, [trace1, trace2], layout);
+        }
         
-        function renderIndexChart(sectionName, items) {{
+        function renderIndexChart(sectionName, items) {
             const labels = items.map(i => i.label);
             const indexData = items.map(i => i.index);
             const colors = indexData.map(idx => idx >= 120 ? '#0066CC' : idx >= 100 ? '#66B2FF' : '#CCE5FF');
             
-            const trace = {{
+            const trace = {
                 x: indexData,
                 y: labels,
                 type: 'bar',
                 orientation: 'h',
-                marker: {{ color: colors }},
-                text: indexData.map(idx => `Index: ${{idx.toFixed(0)}}`),
+                marker: { color: colors },
+                text: indexData.map(idx => `Index: ${idx.toFixed(0)}`),
                 textposition: 'outside'
-            }};
+            };
             
-            const layout = {{
-                title: 'Index Analysis',
-                xaxis: {{ 
-                    title: 'Index (100 = National Average)',
+            const layout = {
+                title: { text: 'Index Analysis' },
+                xaxis: { 
+                    title: { text: 'Index (100 = National Average)' },
                     automargin: true
-                }},
-                yaxis: {{ 
-                    title: '',
+                },
+                yaxis: { 
+                    title: { text: '' },
                     automargin: true,
                     tickangle: 0
-                }},
+                },
                 height: Math.max(500, items.length * 45),
-                margin: {{ l: 200, r: 100, t: 50, b: 50 }},
-                shapes: [{{
+                margin: { l: 200, r: 100, t: 50, b: 50 },
+                shapes: [{
                     type: 'line',
                     x0: 120,
                     x1: 120,
                     y0: -0.5,
                     y1: items.length - 0.5,
-                    line: {{ color: 'green', dash: 'dash' }},
-                    annotation: {{ text: 'Strong Affinity (120)', x: 120, y: items.length }}
-                }}, {{
+                    line: { color: 'green', dash: 'dash' },
+                    annotation: { text: 'Strong Affinity (120)', x: 120, y: items.length }
+                }, {
                     type: 'line',
                     x0: 100,
                     x1: 100,
                     y0: -0.5,
                     y1: items.length - 0.5,
-                    line: {{ color: 'red', dash: 'dash' }},
-                    annotation: {{ text: 'Baseline (100)', x: 100, y: 0 }}
-                }}]
-            }};
+                    line: { color: 'red', dash: 'dash' },
+                    annotation: { text: 'Baseline (100)', x: 100, y: 0 }
+                }]
+            };
             
-            Plotly.newPlot(`chart-${{sectionName}}`, [trace], layout);
-        }}
+            Plotly.react(`chart-${sectionName}`, [trace], layout);
+        }
         
-        function renderScatterChart(sectionName, items) {{
-            const trace = {{
+        function renderScatterChart(sectionName, items) {
+            const trace = {
                 x: items.map(i => i.control_pct),
                 y: items.map(i => i.target_pct),
                 mode: 'markers+text',
                 type: 'scatter',
                 text: items.map(i => i.label),
                 textposition: 'top center',
-                marker: {{
+                marker: {
                     size: items.map(i => Math.min(i.index / 5, 30)),
                     color: items.map(i => i.index),
                     colorscale: 'Blues',
                     showscale: true,
-                    colorbar: {{ title: 'Index' }}
-                }},
+                    colorbar: { title: { text: 'Index' } }
+                },
                 customdata: items.map(i => i.index),
-                hovertemplate: '<b>%{{text}}</b><br>Target: %{{y:.1f}}%<br>Control: %{{x:.1f}}%<br>Index: %{{customdata:.0f}}<extra></extra>'
-            }};
+                hovertemplate: '<b>%{text}</b><br>Target: %{y:.1f}%<br>Control: %{x:.1f}%<br>Index: %{customdata:.0f}<extra></extra>'
+            };
             
             const maxVal = Math.max(...items.map(i => Math.max(i.target_pct, i.control_pct)));
             
-            const layout = {{
-                title: 'Scatter Plot: Target vs Control',
-                xaxis: {{ 
-                    title: 'National Average (%)',
+            const layout = {
+                title: { text: 'Scatter Plot: Target vs Control' },
+                xaxis: { 
+                    title: { text: 'National Average (%)' },
                     automargin: true
-                }},
-                yaxis: {{ 
-                    title: 'Hilton Deep Divers (%)',
+                },
+                yaxis: { 
+                    title: { text: 'Hilton Deep Divers (%)' },
                     automargin: true
-                }},
+                },
                 height: 600,
-                margin: {{ l: 80, r: 50, t: 50, b: 60 }},
-                shapes: [{{
+                margin: { l: 80, r: 50, t: 50, b: 60 },
+                shapes: [{
                     type: 'line',
                     x0: 0,
                     y0: 0,
                     x1: maxVal,
                     y1: maxVal,
-                    line: {{ color: 'red', dash: 'dash' }},
-                    annotation: {{ text: 'Parity Line' }}
-                }}]
-            }};
+                    line: { color: 'red', dash: 'dash' },
+                    annotation: { text: 'Parity Line' }
+                }]
+            };
             
-            Plotly.newPlot(`chart-${{sectionName}}`, [trace], layout);
-        }}
+            Plotly.react(`chart-${sectionName}`, [trace], layout);
+        }
         
         // Initialize on page load
         document.addEventListener('DOMContentLoaded', initDashboard);
+        
+        // Repeat visits load from the service worker's cache (sw.js beside this page), which refreshes in the background
+        if (window.navigator && 'serviceWorker' in navigator && location.protocol !== 'file:') {
+            navigator.serviceWorker.register('sw.js').catch(() => {});
+        }
     </script>
 </body>
 </html>
 """
+
+# Offline bundle (--bundle DIR): Plotly is vendored instead of loaded from the CDN, the
+# page's CSS and script move into minified files under assets/ named by content hash,
+# and only the manifest stays inline. The default Plotly is the partial build in
+# vendor/: the CDN's plotly.js release with only TRACE_TYPES registered (see
+# vendor/README.md). --plotly swaps in any other build that registers TRACE_TYPES.
+ASSETS_DIR = 'assets'
+TRACE_TYPES = ('bar', 'heatmap', 'scatter')
+CDN_URL = 'https://cdn.plot.ly/plotly-2.26.0.min.js'
+CDN_SCRIPT = f'<script src="{CDN_URL}"></script>'
+JS_WORD = re.compile(r'[\w$]')
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^') | {''}
+REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw', 'yield',
+                  'await'}
+
+PLOTLY_VENDOR_BUNDLE = os.path.join('vendor', 'plotly-dashboard-2.26.0.min.js')
+
+def default_plotly_bundle() -> str:
+    """The vendored partial plotly.js build (bar, heatmap and scatter of the CDN_URL release)"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), PLOTLY_VENDOR_BUNDLE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{PLOTLY_VENDOR_BUNDLE} is missing; pass --plotly with a plotly.js bundle")
+    return path
+
+def bundle_trace_types(source: str) -> set:
+    """Trace types a plotly.js bundle registers"""
+    return set(re.findall(r'moduleType:\s*"trace",\s*name:\s*"(\w+)"', source))
+
+def minify_css(css: str) -> str:
+    """Drop comments and the whitespace CSS ignores; strings are copied as they are"""
+    out = []
+    for token in re.finditer(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/|\s+|[^"\'/\s]+|/', css, re.S):
+        text = token.group()
+        if text.startswith('/*'):
+            continue
+        if text.isspace():
+            if out and out[-1] != ' ':
+                out.append(' ')
+            continue
+        if out and out[-1] == ' ' and (out[-2][-1] in '{};,>:' or text[0] in '{};,>'):
+            out.pop()
+        out.append(text)
+    return ''.join(out).replace(';}', '}').strip()
+
+def minify_js(js: str) -> str:
+    """Drop comments and indentation and collapse whitespace, copying strings, template literals and
+    regular expressions verbatim. Line breaks are kept so automatic semicolon insertion is unaffected."""
+    out, i = [], 0
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html_template)
+    def last_significant():
+        for piece in reversed(out):
+            stripped = piece.rstrip()
+            if stripped:
+                return stripped
+        return ''
     
-    print(f"Dashboard HTML generated: {output_file}")
+    def copy_quoted(i, quote):
+        start = i
+        i += 1
+        while js[i] != quote:
+            i += 2 if js[i] == '\\' else 1
+        out.append(js[start:i + 1])
+        return i + 1
+    
+    def copy_template(i):
+        out.append('`')
+        i += 1
+        start = i
+        while js[i] != '`':
+            if js[i] == '\\':
+                i += 2
+            elif js.startswith('${', i):
+                out.append(js[start:i + 2])
+                i = code(i + 2, nested=True)
+                start = i
+            else:
+                i += 1
+        out.append(js[start:i + 1])
+        return i + 1
+    
+    def copy_regex(i):
+        start, in_class = i, False
+        i += 1
+        while in_class or js[i] != '/':
+            if js[i] == '\\':
+                i += 1
+            elif js[i] == '[':
+                in_class = True
+            elif js[i] == ']':
+                in_class = False
+            i += 1
+        i += 1
+        while i < len(js) and JS_WORD.match(js[i]):
+            i += 1
+        out.append(js[start:i])
+        return i
+    
+    def code(i, nested=False):
+        depth = 0
+        while i < len(js):
+            ch = js[i]
+            if nested and ch == '}' and depth == 0:
+                out.append('}')
+                return i + 1
+            if ch in '\'"':
+                i = copy_quoted(i, ch)
+            elif ch == '`':
+                i = copy_template(i)
+            elif js.startswith('//', i):
+                i = js.find('\n', i) if '\n' in js[i:] else len(js)
+            elif js.startswith('/*', i):
+                end = js.index('*/', i) + 2
+                out.append('\n' if '\n' in js[i:end] else ' ')
+                i = end
+            elif ch == '/' and (last_significant()[-1:] in REGEX_PRECEDERS
+                                or re.search(r'\b(\w+)$', last_significant()) and
+                                re.search(r'\b(\w+)$', last_significant()).group(1) in REGEX_KEYWORDS):
+                i = copy_regex(i)
+            elif ch.isspace():
+                end = i
+                while end < len(js) and js[end].isspace():
+                    end += 1
+                if '\n' in js[i:end] and out and out[-1] == ' ':
+                    out.pop()
+                before, after = (out[-1][-1:] if out else ''), js[end:end + 1]
+                if '\n' in js[i:end]:
+                    if before and before != '\n':
+                        out.append('\n')
+                elif (JS_WORD.match(before) and JS_WORD.match(after)) or (before + after in ('++', '--')):
+                    out.append(' ')
+                i = end
+            else:
+                if ch == '{':
+                    depth += 1
+                elif ch == '}':
+                    depth -= 1
+                out.append(ch)
+                i += 1
+        return i
+    
+    code(0)
+    return ''.join(out).strip() + '\n'
 
-if __name__ == '__main__':
-    print("Generating complete static HTML dashboard...")
+def split_page() -> dict:
+    """The template's pieces: markup before the styles, CSS, markup before the script, and the script"""
+    head, css_and_rest = PAGE_HEAD.split('    <style>\n', 1)
+    css, markup = css_and_rest.split('    </style>\n', 1)
+    markup, _ = markup.rsplit('    <script>\n', 1)
+    script, foot = PAGE_TAIL.split('    </script>\n', 1)
+    assert script.startswith(';\n') and CDN_SCRIPT in head
+    return {'head': head, 'css': css, 'markup': markup, 'script': script[2:], 'foot': foot}
+
+def write_asset(output_dir: str, name: str, ext: str, content: bytes, compress=()) -> str:
+    """Write assets/<name>-<hash>.<ext> (and compressed copies) unless it is already there; returns its path"""
+    path = f"{ASSETS_DIR}/{name}-{hashlib.sha256(content).hexdigest()[:10]}.{ext}"
+    full_path = os.path.join(output_dir, path)
+    if not site_files_exist(full_path, compress):
+        with SiteFile(os.path.dirname(full_path), compress) as out:
+            out.write(content)
+            out.commit(full_path)
+    return path
+
+def write_offline_assets(output_dir: str, plotly_bundle: str, compress=()) -> dict:
+    """Vendored Plotly plus minified CSS and script under output_dir/assets; returns {'plotly', 'css', 'js'} paths"""
+    with open(plotly_bundle, 'rb') as f:
+        plotly_js = f.read()
+    missing = set(TRACE_TYPES) - bundle_trace_types(plotly_js.decode('utf-8', 'replace'))
+    if missing:
+        raise ValueError(f"{plotly_bundle} does not include the trace types {', '.join(sorted(missing))}")
+    parts = split_page()
+    assets = {
+        'plotly': write_asset(output_dir, 'plotly', 'js', plotly_js, compress),
+        'css': write_asset(output_dir, 'dashboard', 'css', minify_css(parts['css']).encode('utf-8'), compress),
+        'js': write_asset(output_dir, 'dashboard', 'js', minify_js(parts['script']).encode('utf-8'), compress),
+    }
+    return assets
+
+def remove_stale_assets(output_dir: str, assets: dict, compress=()):
+    """Delete generated files under assets/ other than `assets` (and the compressed copies asked for)"""
+    keep = {path + suffix for path in assets.values() for suffix in ['', *(COMPRESSION_SUFFIXES[m] for m in compress)]}
+    assets_dir = os.path.join(output_dir, ASSETS_DIR)
+    if os.path.isdir(assets_dir):
+        for file_name in os.listdir(assets_dir):
+            if (f"{ASSETS_DIR}/{file_name}" not in keep
+                    and re.fullmatch(r'(plotly|dashboard)-[0-9a-f]{10}\.(js|css)(\.gz|\.br)?|\..*\.tmp', file_name)):
+                os.remove(os.path.join(assets_dir, file_name))
+
+def offline_page(assets: dict) -> tuple:
+    """(text before, text after) the manifest JSON for a page that loads its assets from assets/"""
+    parts = split_page()
+    head = (parts['head'].replace(CDN_SCRIPT, f'<script src="{assets["plotly"]}"></script>')
+            + f'    <link rel="stylesheet" href="{assets["css"]}">\n' + parts['markup'] + '    <script>const manifest = ')
+    return head, f';</script>\n    <script src="{assets["js"]}"></script>\n{parts["foot"]}'
+
+# Service worker: sw.js beside the page precaches the page and every file the site
+# references. Chunks and assets carry a content hash in their name (and the CDN URL a
+# version), so they are served from the cache without revalidation; the page itself is
+# served stale-while-revalidate. sw.js embeds the page's hash and the chunk names, so it
+# changes - and browsers install the new worker in the background - exactly when the
+# site does, and the new worker downloads only the files it has not cached before.
+SERVICE_WORKER = 'sw.js'
+SERVICE_WORKER_SCRIPT = r"""
+const SHELL_CACHE = 'dashboard-shell';
+const FILE_CACHE = 'dashboard-files';
+const HASHED = /\/(data\/(sections|pages)|assets)\/[^/]+-[0-9a-f]{10}\.\w+$/;
+
+function absolute(url) {
+    return new URL(url, self.registration.scope).href;
+}
+
+function isImmutable(url) {
+    return HASHED.test(new URL(url).pathname) || BUILD.immutable.some(path => absolute(path) === url);
+}
+
+function fetchForCache(url) {
+    const crossOrigin = new URL(url).origin !== self.location.origin;
+    return fetch(new Request(url, { mode: crossOrigin ? 'no-cors' : 'same-origin' })).then(response => {
+        if (!response.ok && response.type !== 'opaque') throw new Error(`${url}: HTTP ${response.status}`);
+        return response;
+    });
+}
+
+self.addEventListener('install', event => {
+    event.waitUntil(Promise.all([
+        // A new worker means a new page: fetch the shell past the HTTP cache
+        caches.open(SHELL_CACHE).then(cache => cache.addAll(BUILD.shell.map(url => new Request(url, { cache: 'reload' })))),
+        // Hashed files an earlier build already cached are kept as they are
+        caches.open(FILE_CACHE).then(cache => Promise.all(BUILD.immutable.map(absolute).map(url =>
+            cache.match(url).then(hit => hit || fetchForCache(url).then(response => cache.put(url, response)))
+        )))
+    ]));
+});
+
+self.addEventListener('activate', event => {
+    // Pages of the previous build are closed by now (no skipWaiting), so its files can go
+    const keep = new Set(BUILD.immutable.map(absolute));
+    event.waitUntil(caches.open(FILE_CACHE).then(cache => cache.keys().then(requests => Promise.all(
+        requests.filter(request => !keep.has(request.url)).map(request => cache.delete(request))
+    ))).then(() => self.clients.claim()));
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+    if (isImmutable(request.url)) {
+        event.respondWith(caches.open(FILE_CACHE).then(cache => cache.match(request.url).then(hit =>
+            hit || fetchForCache(request.url).then(response => {
+                cache.put(request.url, response.clone());
+                return response;
+            })
+        )));
+    } else if (new URL(request.url).origin === self.location.origin) {
+        // Stale-while-revalidate: answer from the cache, refresh it from the network for next time
+        event.respondWith(caches.open(SHELL_CACHE).then(cache => cache.match(request, { ignoreSearch: true }).then(hit => {
+            const update = fetch(request).then(response => {
+                if (response.ok) cache.put(request, response.clone());
+                return response;
+            });
+            event.waitUntil(update.catch(() => {}));
+            return hit || update;
+        })));
+    }
+});
+"""
+
+def write_service_worker(output_file: str, site: dict, assets=None, compress=()) -> bool:
+    """Write sw.js beside the page for this build of the site; False if it was already up to date"""
+    build = {
+        'version': file_hash(output_file)[:16],
+        'shell': ['./', os.path.basename(output_file)],
+        'immutable': ([entry['chunk'] for entry in site['sections']] + list(site['pages'].values())
+                      + (list(assets.values()) if assets else [CDN_URL])),
+    }
     
-    # Load data
-    datasets = parse_csv_file('Various_HIlton - Deep DiversvsNationally representative.csv')
-    if not datasets:
-        print("Error: Could not load CSV file")
-        exit(1)
+    def write(out):
+        out.write(b'// Generated by generate_static_dashboard.py\nconst BUILD = ')
+        out.write_json(build)
+        out.write(f";\n{SERVICE_WORKER_SCRIPT}".encode('utf-8'))
+    return write_if_changed(os.path.join(os.path.dirname(os.path.abspath(output_file)), SERVICE_WORKER), write,
+                            compress)
+
+# Incremental builds: the build manifest beside index.html records a content hash of
+# every input, the page manifest and a fingerprint per section. A run redoes only
+# the stages whose inputs changed (and only the sections whose data changed).
+BUILD_MANIFEST = '.static_build.json'
+DATA_FILE = 'Various_HIlton - Deep DiversvsNationally representative.csv'
+PAGES = ['ai-summary', 'cultural-insights', 'affinity-heatmap', 'search']
+STAGE_INPUTS = {
+    'sections': ('csv', 'parser', 'categories', 'sections'),
+    'pages': ('csv', 'parser', 'categories', 'sections', 'pages'),
+    'insights': ('csv', 'parser', 'insights'),
+    'html': ('template', 'compress', 'plotly'),
+}
+WATCH_INTERVAL = 0.2
+
+def source_hash(*parts) -> str:
+    """Hash of the source code of functions/modules (strings are hashed as they are)"""
+    import inspect
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update((part if isinstance(part, str) else inspect.getsource(part)).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+def build_inputs(csv_path: str, compress=(), plotly_bundle=None) -> dict:
+    """Content hashes of everything a build reads, by input name"""
+    import data_parser
+    import search_index
+    return {
+        'csv': file_hash(csv_path),
+        'parser': source_hash(data_parser, search_index),
+        'categories': source_hash(json.dumps([get_category_mapping(), METADATA])),
+        'sections': source_hash(section_columns, prepare_data_for_html, get_section_category, encode_section,
+                                section_entry, chunk_path, repr((SCALE, SORT_KEYS))),
+        'pages': source_hash(prepare_affinity_data, prepare_search_data),
+        'insights': source_hash(analyze_all_data_for_ai_summary, get_item_category, filter_reliable_data,
+                                generate_ai_insights_data, generate_cultural_insights_data),
+        'template': source_hash(PAGE_HEAD, PAGE_TAIL, SERVICE_WORKER_SCRIPT, write_service_worker),
+        'compress': ','.join(sorted(compress)),
+        'plotly': file_hash(plotly_bundle) if plotly_bundle else '',
+    }
+
+def read_build_manifest(path: str) -> dict:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def build_static_site(csv_path: str = DATA_FILE, output_file: str = 'index.html', force: bool = False,
+                      compress=(), plotly_bundle=None) -> dict:
+    """Bring index.html and its data chunks up to date with the CSV and this generator.
+
+    With `plotly_bundle` (a plotly.js file) the site is the offline bundle described above.
+    Returns what each stage did: 'cached', 'built', or for sections how many were re-encoded.
+    """
+    output_dir = os.path.dirname(os.path.abspath(output_file))
+    state_path = os.path.join(output_dir, BUILD_MANIFEST)
+    state = {} if force else read_build_manifest(state_path)
+    inputs, previous, site = build_inputs(csv_path, compress, plotly_bundle), state.get('inputs', {}), state.get('site')
+    if site is not None and site_files_exist(output_file, compress) and all(
+            site_files_exist(os.path.join(output_dir, path), compress)
+            for path in [entry['chunk'] for entry in site['sections']] + list(site['pages'].values())
+            + list(state.get('assets', {}).values()) + [SERVICE_WORKER]):
+        stale = {stage for stage, keys in STAGE_INPUTS.items() if any(inputs[key] != previous.get(key) for key in keys)}
+    else:
+        # First build, or part of the output was deleted: rebuild everything from scratch
+        site, previous, stale = None, {}, set(STAGE_INPUTS)
+    report = {stage: 'built' if stage in stale else 'cached' for stage in STAGE_INPUTS}
+    if not stale:
+        return report
     
-    # Prepare main dashboard data
-    print("Processing main dashboard data...")
-    dashboard_data = prepare_data_for_html(datasets)
+    chunks, records = ChunkWriter(output_dir, compress), state.get('sections', {})
+    sections, pages = (site['sections'], dict(site['pages'])) if site else ([], {})
+    if stale & {'sections', 'pages', 'insights'}:
+        datasets = parse_csv_file(csv_path)
+        if not datasets:
+            raise ValueError(f"No sections found in {csv_path}")
+        processed = process_datasets(datasets)
     
-    # Generate AI insights
-    print("Generating AI Strategic Analysis insights...")
-    df_all = analyze_all_data_for_ai_summary(datasets)
-    ai_insights_data = generate_ai_insights_data(df_all)
+    if 'sections' in stale:
+        # Only the CSV changed: sections whose data has the same fingerprint keep their chunk
+        if any(inputs[key] != previous.get(key) for key in ('parser', 'categories', 'sections')):
+            records = {}
+        fingerprints = {name: section_fingerprint(section) for name, section in datasets.items()}
+        changed = [name for name in datasets if records.get(name, {}).get('fingerprint') != fingerprints[name]]
+        dashboard_data = prepare_data_for_html(datasets, {name: processed[name] for name in changed})
+        records = {
+            name: records[name] if name not in changed else {
+                'fingerprint': fingerprints[name],
+                'entry': section_entry(name, dashboard_data['sections'][name], chunks)
+                         if name in dashboard_data['sections'] else None}
+            for name in datasets
+        }
+        sections = [record['entry'] for record in records.values() if record['entry']]
+        report['sections'] = f"{len(changed)}/{len(datasets)} re-encoded"
     
-    # Generate Cultural insights
-    print("Generating Deep Cultural Insights...")
-    cultural_insights_data = generate_cultural_insights_data(df_all)
+    if 'insights' in stale:
+        df_all = analyze_all_data_for_ai_summary(datasets)
+        pages.update(page_chunks({'ai-summary': generate_ai_insights_data(df_all),
+                                  'cultural-insights': generate_cultural_insights_data(df_all)}, chunks))
+    if 'pages' in stale:
+        on_page = {'sections': {entry['name']: entry for entry in sections}}
+        pages.update(page_chunks({'affinity-heatmap': prepare_affinity_data(datasets, processed),
+                                  'search': prepare_search_data(datasets, on_page, processed)}, chunks))
     
-    # Generate HTML
-    print("Generating HTML...")
-    generate_html_dashboard(dashboard_data, ai_insights_data, cultural_insights_data, 'index.html')
+    site = {
+        'categories': get_category_mapping(),
+        'metadata': METADATA,
+        'scale': SCALE,
+        'sections': sections,
+        'pages': {page: pages[page] for page in PAGES if page in pages},
+    }
+    assets = write_offline_assets(output_dir, plotly_bundle, compress) if plotly_bundle else {}
+    remove_stale_assets(output_dir, assets, compress)
+    page_changed = write_page(output_file, site, compress, assets)
+    worker_changed = write_service_worker(output_file, site, assets, compress)
+    report['html'] = 'built' if page_changed or worker_changed else 'cached'
+    remove_stale_chunks(output_dir, site, compress)
+    
+    temporary = f"{state_path}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump({'inputs': inputs, 'site': site, 'sections': records, 'assets': assets}, f, ensure_ascii=False,
+                  indent=1)
+    os.replace(temporary, state_path)
+    return report
+
+def watch(csv_path: str = DATA_FILE, output_file: str = 'index.html', interval: float = WATCH_INTERVAL, stop=None,
+          compress=(), plotly_bundle=None):
+    """Rebuild whenever the CSV or the generator's sources are saved; edited code is reloaded first"""
+    import importlib
+    import threading
+    import time
+    import data_parser
+    import search_index
+    import generate_static_dashboard as module
+    stop = stop or threading.Event()
+    
+    def signatures():
+        return [file_signature(path) for path in (csv_path, data_parser.__file__, search_index.__file__,
+                                                   module.__file__)]
+    
+    seen = None
+    while not stop.is_set():
+        current = signatures()
+        if current != seen:
+            start = time.perf_counter()
+            try:
+                if seen is not None and current[1:] != seen[1:]:
+                    for dependency in (data_parser, search_index):
+                        importlib.reload(dependency)
+                    module = importlib.reload(module)
+                report = module.build_static_site(csv_path, output_file, compress=compress,
+                                                  plotly_bundle=plotly_bundle)
+                print(f"[{time.strftime('%H:%M:%S')}] {time.perf_counter() - start:.2f} s: "
+                      + ', '.join(f"{stage} {status}" for stage, status in report.items()), flush=True)
+            except Exception as exc:  # e.g. a half-saved file; the next save triggers another build
+                print(f"[{time.strftime('%H:%M:%S')}] build failed: {type(exc).__name__}: {exc}", flush=True)
+            seen = current
+        stop.wait(interval)
+
+def main(argv=None):
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Generate the static dashboard (index.html and data/)")
+    parser.add_argument('--csv', default=DATA_FILE, help="Profiles+ export to build from")
+    parser.add_argument('--output', default='index.html')
+    parser.add_argument('--force', action='store_true', help="ignore the build manifest and rebuild everything")
+    parser.add_argument('--watch', action='store_true', help="rebuild whenever the CSV or the generator changes")
+    parser.add_argument('--compress', action='append', choices=sorted(COMPRESSION_SUFFIXES), default=[],
+                        help="also write pre-compressed .gz/.br copies of the page and chunks (repeatable)")
+    parser.add_argument('--bundle', metavar='DIR',
+                        help="write a self-contained offline site to DIR: vendored Plotly, minified CSS/JS under "
+                             "assets/, and .gz (plus .br when brotli is installed) copies")
+    parser.add_argument('--plotly', metavar='FILE',
+                        help=f"plotly.js build to vendor with --bundle (default: {PLOTLY_VENDOR_BUNDLE}, "
+                             f"plotly.js 2.26.0 with only {', '.join(TRACE_TYPES)})")
+    args = parser.parse_args(argv)
+    import importlib.util
+    has_brotli = importlib.util.find_spec('brotli') is not None
+    if 'brotli' in args.compress and not has_brotli:
+        parser.error("--compress brotli needs the 'brotli' package (pip install brotli)")
+    plotly_bundle = None
+    if args.bundle:
+        os.makedirs(args.bundle, exist_ok=True)
+        args.output = os.path.join(args.bundle, 'index.html')
+        try:
+            plotly_bundle = args.plotly or default_plotly_bundle()
+        except FileNotFoundError as exc:
+            parser.error(str(exc))
+        args.compress = args.compress or ['gzip', *(['brotli'] if has_brotli else [])]
+    elif args.plotly:
+        parser.error("--plotly is only used with --bundle")
+    
+    if args.watch:
+        print(f"Watching {args.csv} and the generator sources (Ctrl+C to stop)...")
+        try:
+            watch(args.csv, args.output, compress=args.compress, plotly_bundle=plotly_bundle)
+        except KeyboardInterrupt:
+            pass
+        return 0
     
-    print(f"\nDashboard generated successfully!")
-    print(f"File: index.html")
-    print(f"Sections processed: {len(dashboard_data['sections'])}")
-    print(f"AI Insights: {len(ai_insights_data)}")
-    print(f"Cultural Insights: {len(cultural_insights_data)}")
-    print(f"\nNext step: Upload index.html to GitHub Pages")
+    print("Generating complete static HTML dashboard...")
+    start = time.perf_counter()
+    try:
+        report = build_static_site(args.csv, args.output, force=args.force, compress=args.compress,
+                                   plotly_bundle=plotly_bundle)
+    except (OSError, ValueError) as exc:
+        print(f"Error: Could not build from {args.csv}: {exc}")
+        return 1
+    for stage, status in report.items():
+        print(f"  {stage:<9} {status}")
+    output_dir = os.path.dirname(os.path.abspath(args.output))
+    state = read_build_manifest(os.path.join(output_dir, BUILD_MANIFEST))
+    print(f"\nDashboard generated successfully in {time.perf_counter() - start:.2f} s!")
+    print(f"File: {args.output}")
+    print(f"Sections: {len(state['site']['sections'])}, page chunks: {', '.join(state['site']['pages'])}")
+    if args.bundle:
+        print("First load (before any data chunk):")
+        for path in ['index.html', *state['assets'].values()]:
+            full_path = os.path.join(output_dir, path)
+            sizes = [f"{os.path.getsize(full_path) / 1024:,.0f} KB"]
+            sizes += [f"{os.path.getsize(full_path + suffix) / 1024:,.0f} KB {suffix}"
+                      for suffix in COMPRESSION_SUFFIXES.values() if os.path.exists(full_path + suffix)]
+            print(f"  {path:<36} {', '.join(sizes)}")
+        print(f"\nServe it without network access: python -m http.server -d {args.bundle}")
+    else:
+        print(f"\nNext step: Upload {args.output}, {SERVICE_WORKER} and the {DATA_DIR}/ folder to GitHub Pages")
+    return 0
 
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
@@ -3,14 +3,19 @@ Generate complete static HTML dashboard with all features from Streamlit version
 Includes: Main Dashboard, AI Strategic Analysis, and Deep Cultural Insights
 All text in English
 """
+from __future__ import annotations
+
 import json
 from data_parser import parse_csv_file, process_datasets, get_category_mapping
-import pandas as pd
-from typing import Dict
+from typing import Dict, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd  # imported on first use
 
 # Import analysis functions from app.py logic
 def analyze_all_data_for_ai_summary(datasets: Dict) -> pd.DataFrame:
     """Analyze all data to extract key insights"""
+    import pandas as pd
     all_items = []
     
     for section_name, section_data in datasets.items():
@@ -52,6 +57,7 @@ def filter_reliable_data(df_all: pd.DataFrame, max_index: float = 500) -> pd.Dat
 
 def prepare_data_for_html(datasets):
     """Prepare data in format suitable for JavaScript/HTML"""
+    import pandas as pd
     processed = process_datasets(datasets)
     category_mapping = get_category_mapping()
     
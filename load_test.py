@@ -0,0 +1,267 @@
+"""
+Concurrent-session load test for the Streamlit dashboard
+
+Simulates N analysts at once, each a headless AppTest session (Streamlit's
+testing harness) running a random but seeded click path: category and section
+changes, metric and slider moves, and trips to the AI Summary and Cultural
+Insights pages. Sessions run as threads in this process, just like the
+Streamlit server runs them, so they share the st.cache_resource caches.
+
+For every session count it reports rerun latency percentiles, throughput,
+peak RSS and CPU time. Runs offline on Linux (RSS is read from /proc).
+
+Usage: python load_test.py [--sessions 1,5,10] [--steps 12] [--seed 0] [--json results.json]
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import local_script_runner
+from streamlit.testing.v1.util import patch_config_options
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process right now (falls back to the peak so far)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+class RssSampler:
+    """Samples RSS from a background thread and keeps the peak"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak = current_rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="load-test-rss", daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, current_rss_bytes())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss_bytes())
+
+@contextmanager
+def shared_runtime():
+    """Keep AppTest's process-wide state in place for every concurrent session.
+
+    Each AppTest run installs its own mock Runtime singleton and switches the
+    global.appTest option on, then clears both when it finishes, so a session
+    finishing mid-rerun of another pulls them out from under it ("Runtime
+    hasn't been created!", widgets missing from the test session state). A real
+    server has one runtime for all sessions; while this is active, Runtime
+    falls back to the most recently installed one and global.appTest stays on.
+
+    Every AppTest run also compiles the script afresh, and concurrent AST
+    compilation can fail spuriously on CPython 3.11 ("AST constructor recursion
+    depth mismatch"), which AppTest reports as an empty page; compiles are
+    serialised. The server compiles each script once per session anyway.
+    """
+    runner_class = local_script_runner.LocalScriptRunner
+    original_init, original_instance, original_exists = (
+        runner_class.__init__, Runtime.__dict__['instance'], Runtime.__dict__['exists'])
+    original_get_bytecode = ScriptCache.get_bytecode
+    compile_lock = threading.Lock()
+    shared = {}
+
+    def get_bytecode(self, script_path):
+        with compile_lock:
+            return original_get_bytecode(self, script_path)
+
+    def init(self, *args, **kwargs):
+        if Runtime._instance is not None:
+            shared['runtime'] = Runtime._instance
+        original_init(self, *args, **kwargs)
+
+    def instance(cls):
+        runtime = cls._instance or shared.get('runtime')
+        if runtime is None:
+            raise RuntimeError("Runtime hasn't been created!")
+        return runtime
+
+    def exists(cls):
+        return cls._instance is not None or 'runtime' in shared
+
+    runner_class.__init__ = init
+    ScriptCache.get_bytecode = get_bytecode
+    Runtime.instance, Runtime.exists = classmethod(instance), classmethod(exists)
+    try:
+        with patch_config_options({"global.appTest": True}):
+            yield
+    finally:
+        runner_class.__init__ = original_init
+        ScriptCache.get_bytecode = original_get_bytecode
+        Runtime.instance, Runtime.exists = original_instance, original_exists
+
+def find_button(elements, label_prefix: str):
+    for button in elements:
+        if button.label.startswith(label_prefix):
+            return button
+    return None
+
+class Session:
+    """One simulated analyst driving the app through AppTest"""
+
+    ACTIONS = ['category', 'section', 'metric', 'top_n', 'min_index', 'ai_summary', 'cultural_insights']
+    WEIGHTS = [2, 4, 2, 2, 2, 1, 1]
+
+    def __init__(self, session_id: int, steps: int, seed: int, timeout: float):
+        self.session_id = session_id
+        self.steps = steps
+        self.rng = random.Random(seed * 1000 + session_id)
+        self.timeout = timeout
+        self.latencies = []
+        self.errors = []
+        self.at = None
+
+    def rerun(self, action: str, element=None):
+        """Run one script rerun (with a pending widget change, if any) and time it"""
+        start = time.perf_counter()
+        try:
+            if element is None:
+                self.at.run(timeout=self.timeout)
+            else:
+                element.run(timeout=self.timeout)
+        except Exception as exc:
+            self.errors.append(f"{action}: {type(exc).__name__}: {exc}")
+            return
+        self.latencies.append((action, (time.perf_counter() - start) * 1000))
+        for exception in self.at.exception:
+            self.errors.append(f"{action}: {exception.value}")
+        if not self.at.main.children and not self.at.sidebar.children:
+            self.errors.append(f"{action}: the page rendered nothing")
+
+    def step(self):
+        action = self.rng.choices(self.ACTIONS, self.WEIGHTS)[0]
+        sidebar = self.at.sidebar
+        if action in ('ai_summary', 'cultural_insights'):
+            label = "🤖 View AI Summary" if action == 'ai_summary' else "🔍 Deep Cultural Insights"
+            button = find_button(sidebar.button, label)
+            if button is None:
+                return
+            self.rerun(action, button.click())  # the click reruns twice: set view, st.rerun()
+            back = find_button(self.at.button, "← Back to Dashboard")
+            if back is not None:
+                self.rerun('back to dashboard', back.click())
+        elif action == 'category':
+            box = sidebar.selectbox[0]
+            self.rerun(action, box.set_value(self.rng.choice(box.options)))
+        elif action == 'section':
+            box = sidebar.selectbox[1]
+            self.rerun(action, box.set_value(self.rng.choice(box.options)))
+        elif action == 'metric':
+            radio = sidebar.radio[0]
+            self.rerun(action, radio.set_value(self.rng.choice(radio.options)))
+        elif action == 'top_n':
+            self.rerun(action, sidebar.slider[0].set_value(self.rng.randint(5, 25)))
+        else:
+            self.rerun(action, sidebar.slider[1].set_value(self.rng.choice([0, 50, 100, 120, 150, 200])))
+
+    def run(self, start_barrier: threading.Barrier):
+        self.at = AppTest.from_file(APP_FILE, default_timeout=self.timeout)
+        start_barrier.wait()
+        self.rerun('initial load')
+        for _ in range(self.steps):
+            if not self.at.sidebar.selectbox:
+                break  # the dashboard did not render; the error was recorded
+            self.step()
+
+def run_load(sessions: int, steps: int = 12, seed: int = 0, timeout: float = 120) -> dict:
+    """Run `sessions` concurrent click paths and summarise latency, memory and CPU"""
+    workers = [Session(i, steps, seed, timeout) for i in range(sessions)]
+    barrier = threading.Barrier(sessions)
+    threads = [threading.Thread(target=worker.run, args=(barrier,), name=f"load-test-session-{i}")
+               for i, worker in enumerate(workers)]
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.perf_counter()
+    with shared_runtime(), RssSampler() as rss:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    wall = time.perf_counter() - start
+    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+    cpu = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+
+    latencies = np.array([ms for worker in workers for _, ms in worker.latencies]) if any(
+        worker.latencies for worker in workers) else np.zeros(1)
+    by_action = {}
+    for worker in workers:
+        for action, ms in worker.latencies:
+            by_action.setdefault(action, []).append(ms)
+    errors = [f"session {worker.session_id}: {error}" for worker in workers for error in worker.errors]
+    reruns = sum(len(worker.latencies) for worker in workers)
+    return {
+        'sessions': sessions,
+        'reruns': reruns,
+        'errors': errors,
+        'wall_s': round(wall, 3),
+        'reruns_per_s': round(reruns / wall, 2) if wall else 0.0,
+        'p50_ms': round(float(np.percentile(latencies, 50)), 1),
+        'p95_ms': round(float(np.percentile(latencies, 95)), 1),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 1),
+        'max_ms': round(float(latencies.max()), 1),
+        'peak_rss_mb': round(rss.peak / (1024 * 1024), 1),
+        'cpu_s': round(cpu, 2),
+        'cpu_s_per_session': round(cpu / sessions, 2),
+        'cpu_util': round(cpu / wall, 2) if wall else 0.0,
+        'p95_ms_by_action': {action: round(float(np.percentile(values, 95)), 1)
+                             for action, values in sorted(by_action.items())},
+    }
+
+def print_report(results: list):
+    print(f"{'sessions':>8} {'reruns':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+          f"{'rerun/s':>8} {'peak RSS MB':>12} {'CPU s/sess':>11} {'CPU util':>9} {'errors':>7}")
+    for r in results:
+        print(f"{r['sessions']:>8} {r['reruns']:>7} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+              f"{r['max_ms']:>8.1f} {r['reruns_per_s']:>8.2f} {r['peak_rss_mb']:>12.1f} "
+              f"{r['cpu_s_per_session']:>11.2f} {r['cpu_util']:>9.2f} {len(r['errors']):>7}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', default='1,5,10', help="comma-separated concurrent session counts")
+    parser.add_argument('--steps', type=int, default=12, help="clicks per session after the initial load")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=120, help="seconds allowed per rerun")
+    parser.add_argument('--cold', action='store_true', help="skip the warm-up session before measuring")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    if not args.cold:
+        run_load(1, steps=0, seed=args.seed, timeout=args.timeout)  # build shared caches first
+    results = []
+    for count in [int(n) for n in args.sessions.split(',') if n.strip()]:
+        results.append(run_load(count, steps=args.steps, seed=args.seed, timeout=args.timeout))
+    print_report(results)
+    for r in results:
+        for error in r['errors'][:5]:
+            print(f"  [{r['sessions']} sessions] {error}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'app': APP_FILE, 'steps': args.steps, 'seed': args.seed, 'results': results}, f, indent=2)
+    return 1 if any(r['errors'] for r in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
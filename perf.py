@@ -0,0 +1,123 @@
+"""
+Opt-in per-rerun performance instrumentation for the Streamlit dashboard.
+
+Enable it with ``?perf=1`` in the dashboard URL or ``DASHBOARD_PERF=1`` in the
+environment. Each rerun then records how long every phase took plus the size of
+the payloads sent to the browser, shows them in a sidebar panel and appends one
+JSON line per rerun to ``perf_log.jsonl`` (override with ``DASHBOARD_PERF_LOG``).
+
+When ``tracemalloc`` is tracing, each phase also records the net memory it
+allocated and each rerun the peak traced memory (see benchmark_reruns.py).
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Optional
+
+PERF_ENV_VAR = 'DASHBOARD_PERF'
+PERF_LOG_ENV_VAR = 'DASHBOARD_PERF_LOG'
+DEFAULT_LOG_FILE = 'perf_log.jsonl'
+
+# Streamlit runs every session's script in its own thread, so the recorder for
+# the rerun in progress is kept per thread. Code running outside a recorded
+# rerun (e.g. the warm-up thread) sees no recorder and phase() is a no-op.
+_local = threading.local()
+
+def env_enabled() -> bool:
+    """Check whether instrumentation is switched on through the environment"""
+    return os.environ.get(PERF_ENV_VAR, '').strip().lower() not in ('', '0', 'false', 'no', 'off')
+
+def flag_enabled(value) -> bool:
+    """Interpret a ?perf= query parameter value (str, or list of str on old Streamlit)"""
+    if isinstance(value, (list, tuple)):
+        value = value[0] if value else None
+    if value is None:
+        return False
+    return str(value).strip().lower() not in ('0', 'false', 'no', 'off')
+
+class RerunTimings:
+    """Phase timings and payload sizes collected during one script rerun"""
+
+    def __init__(self, view: str):
+        self.view = view
+        self.started = time.perf_counter()
+        self.timestamp = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        self.phases = []
+        self.payloads = []
+        self._depth = 0
+        self.tracing = tracemalloc.is_tracing()
+        if self.tracing:
+            tracemalloc.reset_peak()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block; nested phases are recorded with their depth"""
+        entry = {'phase': name, 'depth': self._depth, 'ms': None}
+        self.phases.append(entry)
+        self._depth += 1
+        allocated = tracemalloc.get_traced_memory()[0] if self.tracing else None
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry['ms'] = round((time.perf_counter() - start) * 1000, 2)
+            if allocated is not None:
+                entry['alloc_kb'] = round((tracemalloc.get_traced_memory()[0] - allocated) / 1024, 1)
+            self._depth -= 1
+
+    def add_payload(self, name: str, size_bytes: int):
+        """Record the serialised size of something sent to the browser"""
+        self.payloads.append({'payload': name, 'bytes': int(size_bytes)})
+
+    def total_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 2)
+
+    def to_record(self) -> dict:
+        record = {
+            'timestamp': self.timestamp,
+            'view': self.view,
+            'total_ms': self.total_ms(),
+            'phases': self.phases,
+            'payloads': self.payloads,
+            'payload_bytes': sum(p['bytes'] for p in self.payloads),
+        }
+        if self.tracing:
+            record['peak_alloc_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        return record
+
+    def append_to_log(self, path: Optional[str] = None) -> str:
+        """Append this rerun as one JSON line and return the log path"""
+        path = path or os.environ.get(PERF_LOG_ENV_VAR) or DEFAULT_LOG_FILE
+        line = json.dumps(self.to_record(), ensure_ascii=False)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+        return path
+
+def begin_rerun(view: str, enabled: bool) -> Optional[RerunTimings]:
+    """Start recording the current thread's rerun (or clear it when disabled)"""
+    _local.current = RerunTimings(view) if enabled else None
+    return _local.current
+
+def current() -> Optional[RerunTimings]:
+    """Recorder for the rerun running on this thread, if instrumentation is on"""
+    return getattr(_local, 'current', None)
+
+@contextmanager
+def phase(name: str):
+    """Time a block against the current rerun; does nothing when not recording"""
+    recorder = current()
+    if recorder is None:
+        yield None
+        return
+    with recorder.phase(name) as entry:
+        yield entry
+
+def add_payload(name: str, size_bytes: int):
+    """Record a payload size against the current rerun, if any"""
+    recorder = current()
+    if recorder is not None:
+        recorder.add_payload(name, size_bytes)
@@ -0,0 +1,171 @@
+"""
+Full-text search over response labels, section names and question texts.
+
+Every document is split into normalised words (lowercase, accents stripped).
+Words are indexed twice: a sorted vocabulary answers prefix queries by binary
+search, and an inverted trigram index (``^lush$`` -> ``^lu``, ``lus``, ``ush``,
+``sh$``) finds misspellings by Dice similarity of their trigram sets. Each word
+then points at the documents containing it (CSR postings), so a query costs a
+few array lookups regardless of how many rows the export has.
+
+A query term scores 1.0 on an exact word, PREFIX_SCORE on a word it starts and
+FUZZY_WEIGHT x Dice on a fuzzy match of at least FUZZY_MIN. A document's score
+is the mean of its best score per term (every term must match), weighted by
+its kind. ``to_payload()`` serialises the index for the static site, whose
+JavaScript search scores the same way.
+"""
+import bisect
+import re
+import unicodedata
+from typing import Dict, List
+
+import numpy as np
+
+KINDS = ('label', 'section', 'question')
+KIND_WEIGHTS = {'label': 1.0, 'section': 0.95, 'question': 0.8}
+PREFIX_SCORE = 0.9
+FUZZY_WEIGHT = 0.8
+FUZZY_MIN = 0.5
+MIN_FUZZY_LENGTH = 3
+
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+def normalize(text) -> str:
+    """Lowercase ASCII with accents stripped and punctuation turned into spaces"""
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_WORD.sub(' ', text.lower()).strip()
+
+def tokenize(text) -> List[str]:
+    return normalize(text).split()
+
+def word_grams(word: str) -> List[str]:
+    """Distinct trigrams of a word with start/end markers"""
+    padded = f'^{word}$'
+    return sorted({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+class SearchIndex:
+    """Inverted n-gram index over a list of documents.
+
+    Each document is a dict with ``kind`` (one of KINDS), ``text``, ``section``
+    and an optional ``index`` (the label's Index, shown with results).
+    """
+
+    def __init__(self, docs: List[dict]):
+        self.docs = docs
+        self.kind_weights = np.array([KIND_WEIGHTS[doc['kind']] for doc in docs], dtype=float)
+        self.text_lengths = np.array([len(doc['text']) for doc in docs], dtype=np.int64)
+
+        postings = {}
+        for doc_id, doc in enumerate(docs):
+            for word in set(tokenize(doc['text'])):
+                postings.setdefault(word, []).append(doc_id)
+        self.words = sorted(postings)
+        counts = np.array([len(postings[word]) for word in self.words], dtype=np.int64)
+        self.word_indptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self.word_docs = np.fromiter((doc_id for word in self.words for doc_id in postings[word]),
+                                     dtype=np.int64, count=int(counts.sum()))
+
+        grams = {}
+        self.word_gram_counts = np.zeros(len(self.words), dtype=np.int64)
+        for word_id, word in enumerate(self.words):
+            word_gram_list = word_grams(word)
+            self.word_gram_counts[word_id] = len(word_gram_list)
+            for gram in word_gram_list:
+                grams.setdefault(gram, []).append(word_id)
+        self.grams = {gram: np.array(word_ids, dtype=np.int64) for gram, word_ids in grams.items()}
+
+    @classmethod
+    def from_datasets(cls, datasets: Dict) -> 'SearchIndex':
+        """Index every section name, question and response label of a parsed export"""
+        import pandas as pd
+        docs = []
+        for section_name, section_data in datasets.items():
+            docs.append({'kind': 'section', 'text': section_name, 'section': section_name, 'index': None})
+            question = section_data.get('question')
+            if question:
+                docs.append({'kind': 'question', 'text': str(question), 'section': section_name, 'index': None})
+            df = section_data['data']
+            if 'Response label' not in df.columns:
+                continue
+            labels = df['Response label']
+            index = pd.to_numeric(df['Index'], errors='coerce') if 'Index' in df.columns else pd.Series(np.nan, df.index)
+            keep = labels.notna()
+            for label, value in zip(labels[keep].astype(str), index[keep]):
+                docs.append({'kind': 'label', 'text': label, 'section': section_name,
+                             'index': None if pd.isna(value) else round(float(value), 2)})
+        return cls(docs)
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def term_matches(self, term: str) -> Dict[int, float]:
+        """Vocabulary words matching one query term and their similarity"""
+        matches = {}
+        start = bisect.bisect_left(self.words, term)
+        for word_id in range(start, len(self.words)):
+            if not self.words[word_id].startswith(term):
+                break
+            matches[word_id] = 1.0 if self.words[word_id] == term else PREFIX_SCORE
+        if len(term) >= MIN_FUZZY_LENGTH:
+            query_grams = word_grams(term)
+            hits = [self.grams[gram] for gram in query_grams if gram in self.grams]
+            if hits:
+                shared = np.bincount(np.concatenate(hits), minlength=len(self.words))
+                candidates = np.flatnonzero(shared)
+                dice = 2 * shared[candidates] / (len(query_grams) + self.word_gram_counts[candidates])
+                for word_id, similarity in zip(candidates[dice >= FUZZY_MIN], dice[dice >= FUZZY_MIN]):
+                    matches[int(word_id)] = max(matches.get(int(word_id), 0.0), FUZZY_WEIGHT * float(similarity))
+        return matches
+
+    def search(self, query: str, limit: int = 20) -> List[dict]:
+        """Best-matching documents for a query, highest score first"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.docs:
+            return []
+        total = np.zeros(len(self.docs))
+        matched_all = np.ones(len(self.docs), dtype=bool)
+        for term in terms:
+            matches = self.term_matches(term)
+            if not matches:
+                return []
+            word_ids = np.fromiter(matches, dtype=np.int64, count=len(matches))
+            similarities = np.fromiter(matches.values(), dtype=float, count=len(matches))
+            # Gather the postings of every matched word at once (concatenated CSR slices)
+            starts = self.word_indptr[word_ids]
+            lengths = self.word_indptr[word_ids + 1] - starts
+            offsets = np.cumsum(lengths) - lengths
+            positions = np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+            term_scores = np.zeros(len(self.docs))
+            np.maximum.at(term_scores, self.word_docs[positions], np.repeat(similarities, lengths))
+            total += term_scores
+            matched_all &= term_scores > 0
+        doc_ids = np.flatnonzero(matched_all)
+        scores = total[doc_ids] / len(terms) * self.kind_weights[doc_ids]
+        order = np.lexsort((doc_ids, self.text_lengths[doc_ids], -scores))[:limit]
+        return [{**self.docs[doc_ids[i]], 'score': round(float(scores[i]), 4)} for i in order]
+
+    def to_payload(self) -> dict:
+        """JSON-ready form of the index for the static site's search"""
+        sections = list(dict.fromkeys(doc['section'] for doc in self.docs))
+        section_ids = {name: i for i, name in enumerate(sections)}
+        return {
+            'kinds': list(KINDS),
+            'kind_weights': [KIND_WEIGHTS[kind] for kind in KINDS],
+            'prefix_score': PREFIX_SCORE,
+            'fuzzy_weight': FUZZY_WEIGHT,
+            'fuzzy_min': FUZZY_MIN,
+            'min_fuzzy_length': MIN_FUZZY_LENGTH,
+            'sections': sections,
+            'docs': {
+                'kind': [KINDS.index(doc['kind']) for doc in self.docs],
+                'text': [doc['text'] for doc in self.docs],
+                'section': [section_ids[doc['section']] for doc in self.docs],
+                'index': [doc['index'] for doc in self.docs],
+            },
+            'words': self.words,
+            'word_indptr': self.word_indptr.tolist(),
+            'word_docs': self.word_docs.tolist(),
+            'word_gram_counts': self.word_gram_counts.tolist(),
+            'grams': {gram: word_ids.tolist() for gram, word_ids in self.grams.items()},
+        }
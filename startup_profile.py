@@ -0,0 +1,227 @@
+"""
+Cold-start profile of the dashboard server and the static-site generators
+
+Every measurement runs in a fresh interpreter so nothing is already imported:
+
+- import time per module (``python -X importtime``) for app.py, the parser and
+  the generators, with the heaviest top-level packages behind each;
+- time to first render of app.py through Streamlit's AppTest (import + first run);
+- ``streamlit run app.py``: seconds until /_stcore/health answers, then the
+  time to first byte of the page (skip with --no-server);
+- wall time of each generator CLI, run in a scratch directory on the bundled CSV.
+
+Results go to --output as JSON. With --baseline, numbers are compared with an
+earlier report and the exit status is 1 if any grew by more than --tolerance.
+
+Usage: python startup_profile.py [--repeat 3] [--no-server] [--output startup_profile.json] [--baseline old.json]
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_FILE = 'Various_HIlton - Deep DiversvsNationally representative.csv'
+MODULES = ['app', 'data_parser', 'search_index', 'generate_static_dashboard', 'generate_static_dashboard_complete']
+GENERATORS = ['generate_static_dashboard.py']
+TOP_PACKAGES = 8
+
+# Fresh-interpreter script timing import + first AppTest run of app.py
+FIRST_RENDER = '''
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=300)
+at.run()
+ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{'ms': ms, 'error': str(at.exception[0].value) if at.exception else None}}))
+'''
+
+def parse_importtime(text: str) -> list:
+    """Rows of ``-X importtime`` output as {module, depth, self_us, cumulative_us}"""
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+            rows.append({'module': name.strip(), 'depth': (len(name) - len(name.lstrip())) // 2,
+                         'self_us': int(self_us), 'cumulative_us': int(cumulative_us)})
+        except ValueError:
+            continue
+    return rows
+
+def package_totals(rows: list) -> dict:
+    """Self import time summed per top-level package, in ms, heaviest first"""
+    totals = {}
+    for row in rows:
+        package = row['module'].split('.')[0]
+        totals[package] = totals.get(package, 0) + row['self_us']
+    return {package: round(us / 1000, 1) for package, us in sorted(totals.items(), key=lambda kv: -kv[1])}
+
+def run_python(args: list, cwd: str = HERE, timeout: float = 600) -> subprocess.CompletedProcess:
+    env = {**os.environ, 'PYTHONPATH': HERE, 'PYTHONDONTWRITEBYTECODE': '1'}
+    return subprocess.run([sys.executable, *args], cwd=cwd, env=env, capture_output=True, text=True,
+                          timeout=timeout)
+
+def profile_import(module: str, repeat: int) -> dict:
+    """Median import time of one module, its heaviest packages and which heavy modules it pulls in"""
+    totals, rows = [], []
+    for _ in range(repeat):
+        result = run_python(['-X', 'importtime', '-c', f'import {module}'])
+        if result.returncode != 0:
+            return {'error': result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed'}
+        rows = parse_importtime(result.stderr)
+        own = [row for row in rows if row['module'] == module]
+        totals.append(own[-1]['cumulative_us'] / 1000 if own else 0.0)
+    loaded = {row['module'] for row in rows}
+    return {
+        'ms': round(statistics.median(totals), 1),
+        'modules': len(rows),
+        'packages_ms': dict(list(package_totals(rows).items())[:TOP_PACKAGES]),
+        'loads': sorted(name for name in ('pandas', 'numpy', 'plotly.express', 'plotly.graph_objects',
+                                          'streamlit', 'scipy', 'statsmodels') if name in loaded),
+    }
+
+def profile_first_render(repeat: int) -> dict:
+    """Median wall time from a bare interpreter to app.py's first completed AppTest run"""
+    times, error = [], None
+    for _ in range(repeat):
+        result = run_python(['-c', FIRST_RENDER.format(app=os.path.join(HERE, 'app.py'))])
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed'
+            break
+        record = json.loads(result.stdout.strip().splitlines()[-1])
+        error = record['error'] or error
+        times.append(record['ms'])
+    return {'ms': round(statistics.median(times), 1) if times else None, 'error': error}
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def profile_server(timeout: float = 120) -> dict:
+    """Seconds until `streamlit run app.py` is healthy, then the page's time to first byte"""
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', os.path.join(HERE, 'app.py'), '--server.headless', 'true',
+         '--server.port', str(port), '--server.address', '127.0.0.1', '--browser.gatherUsageStats', 'false'],
+        cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f'http://127.0.0.1:{port}'
+    try:
+        while True:
+            if server.poll() is not None:
+                return {'error': f'server exited with status {server.returncode}'}
+            if time.perf_counter() - start > timeout:
+                return {'error': f'not healthy after {timeout:.0f} s'}
+            try:
+                with urllib.request.urlopen(f'{base}/_stcore/health', timeout=1) as response:
+                    if response.status == 200:
+                        break
+            except OSError:
+                time.sleep(0.05)
+        ready_ms = (time.perf_counter() - start) * 1000
+        request_start = time.perf_counter()
+        with urllib.request.urlopen(f'{base}/', timeout=10) as response:
+            response.read(1)
+            ttfb_ms = (time.perf_counter() - request_start) * 1000
+        return {'ready_ms': round(ready_ms, 1), 'ttfb_ms': round(ttfb_ms, 1)}
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+def profile_generator(script: str, repeat: int) -> dict:
+    """Median wall time of a generator CLI run in a scratch directory holding the bundled CSV"""
+    times = []
+    with tempfile.TemporaryDirectory() as directory:
+        shutil.copy(os.path.join(HERE, DATA_FILE), directory)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = run_python([os.path.join(HERE, script)], cwd=directory)
+            if result.returncode != 0:
+                return {'error': result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed'}
+            times.append((time.perf_counter() - start) * 1000)
+    return {'ms': round(statistics.median(times), 1)}
+
+def profile(repeat: int = 3, server: bool = True) -> dict:
+    report = {
+        'python': sys.version.split()[0],
+        'repeat': repeat,
+        'imports': {module: profile_import(module, repeat) for module in MODULES},
+        'first_render': profile_first_render(repeat),
+        'generators': {script: profile_generator(script, repeat) for script in GENERATORS},
+    }
+    if server:
+        report['server'] = profile_server()
+    return report
+
+def flatten(report: dict) -> dict:
+    """The tracked timings of a report as {"imports.app": ms, ...}"""
+    flat = {f'imports.{module}': r['ms'] for module, r in report.get('imports', {}).items() if 'ms' in r}
+    if report.get('first_render', {}).get('ms') is not None:
+        flat['first_render'] = report['first_render']['ms']
+    flat.update({f'generators.{script}': r['ms'] for script, r in report.get('generators', {}).items() if 'ms' in r})
+    for key in ('ready_ms', 'ttfb_ms'):
+        if key in report.get('server', {}):
+            flat[f'server.{key[:-3]}'] = report['server'][key]
+    return flat
+
+def compare(report: dict, baseline: dict, tolerance: float = 0.2, floor_ms: float = 20) -> list:
+    """Timings more than `tolerance` (and floor_ms) slower than the baseline"""
+    current, previous = flatten(report), flatten(baseline)
+    return [f"{key}: {current[key]:.0f} ms vs {previous[key]:.0f} ms baseline"
+            for key in current if key in previous
+            and current[key] > previous[key] * (1 + tolerance) and current[key] - previous[key] > floor_ms]
+
+def print_report(report: dict, baseline: dict = None):
+    previous = flatten(baseline) if baseline else {}
+    for key, ms in flatten(report).items():
+        change = f"  ({ms - previous[key]:+.0f} ms)" if key in previous else ''
+        print(f"{key:<52} {ms:>9.1f} ms{change}")
+    for module, r in report['imports'].items():
+        if 'error' in r:
+            print(f"imports.{module}: {r['error']}")
+        elif r['loads']:
+            print(f"  import {module} loads: {', '.join(r['loads'])}")
+    for name in ('first_render', 'server'):
+        if report.get(name, {}).get('error'):
+            print(f"{name}: {report[name]['error']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help="fresh interpreters per measurement (median)")
+    parser.add_argument('--no-server', action='store_true', help="skip starting `streamlit run`")
+    parser.add_argument('--output', default='startup_profile.json')
+    parser.add_argument('--baseline', help="earlier report to compare with")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed slowdown vs the baseline")
+    args = parser.parse_args(argv)
+
+    report = profile(args.repeat, server=not args.no_server)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        report['regressions'] = compare(report, baseline, args.tolerance)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+
+    print_report(report, baseline)
+    print(f"\nProfile written to {args.output}")
+    for regression in report.get('regressions', []):
+        print(f"SLOWER: {regression}")
+    return 1 if report.get('regressions') else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
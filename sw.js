@@ -0,0 +1,64 @@
+// Generated by generate_static_dashboard.py
+const BUILD = {"version":"3a33bd0a21dff212","shell":["./","index.html"],"immutable":["data/sections/skincare-cosmetics-purchase-intent-e39b1a8cfe.json","data/sections/hotels-current-customer-c17abfdc25.json","data/sections/destinationindex-current-customer-5a79f804f3.json","data/sections/online-brands-word-of-mouth-exposure-last-90-day-353eeb25e2.json","data/sections/sportsindex-events-positive-satisfaction-97fac1f936.json","data/sections/online-brands-recommend-last-90-days-positive-c116d2eb50.json","data/sections/destinationindex-positive-satisfaction-3851bde5a6.json","data/sections/amusement-bef79aff9a.json","data/sections/communications-8b734567d2.json","data/sections/retail-apparel-e9028a605c.json","data/sections/copa-libertadores-level-of-interest-8228bd564b.json","data/sections/wimbledon-level-of-interest-10e8144514.json","data/sections/college-football-playoff-level-of-interest-28324dd9b3.json","data/sections/mlb-world-series-level-of-interest-6b59535953.json","data/sections/music-festival-genre-e9eb8e1155.json","data/sections/other-sports-level-of-interest-35148ead7a.json","data/sections/gambling-casinos-consideration-last-60-days-c1409a4c03.json","data/sections/wintertime-activities-98b463ad27.json","data/sections/fifa-football-world-cup-level-of-interest-883c2bcaa9.json","data/sections/leisure-trips-most-preferred-4979ff7290.json","data/sections/hobbies-00b3463062.json","data/sections/nba-level-of-interest-f2d25ae0fa.json","data/sections/in-market-hotels-1-year-c6ab8dba00.json","data/sections/topics-and-hobbies-of-interest-57f2a3c7f5.json","data/sections/major-league-soccer-level-of-interest-2bb8e1bec9.json","data/sections/autumntime-activities-abca80744c.json","data/sections/springtime-activities-f628c7b88e.json","data/sections/importance-of-vip-access-e-g-dedicated-bars-63c24abaeb.json","data/sections/leisure-interests-2c3f4ce604.json","data/sections/travel-activities-d525ba3967.json","data/sections/esports-level-of-interest-top-3-e88813587d.json","data/sections/importance-of-the-atmosphere-when-choosing-a-mus-5e3375528b.json","data/sections/music-festival-behaviour-type-6027dab658.json","data/sections/consumer-personalities-4d114045ca.json","data/sections/destinationindex-aided-brand-awareness-last-60-d-ec68ca906d.json","data/sections/nascar-level-of-interest-c18b59c678.json","data/sections/traditional-d6b5765682.json","data/sections/grammy-awards-level-of-interest-d0b796dd15.json","data/sections/u-s-open-golf-level-of-interest-d75fea2443.json","data/sections/formula-1-level-of-interest-2ad2dc69ad.json","data/sections/pga-championship-golf-level-of-interest-4a80023879.json","data/sections/nfl-combine-level-of-interest-0cb7e794e7.json","data/sections/daytona-500-nascar-level-of-interest-338f3ada69.json","data/sections/nfl-level-of-interest-e88b96f193.json","data/pages/ai-summary-c1a35607a4.json","data/pages/cultural-insights-e056f1baf3.json","data/pages/affinity-heatmap-f87d7f60b0.json","data/pages/search-40978c074f.json","https://cdn.plot.ly/plotly-2.26.0.min.js"]};
+
+const SHELL_CACHE = 'dashboard-shell';
+const FILE_CACHE = 'dashboard-files';
+const HASHED = /\/(data\/(sections|pages)|assets)\/[^/]+-[0-9a-f]{10}\.\w+$/;
+
+function absolute(url) {
+    return new URL(url, self.registration.scope).href;
+}
+
+function isImmutable(url) {
+    return HASHED.test(new URL(url).pathname) || BUILD.immutable.some(path => absolute(path) === url);
+}
+
+function fetchForCache(url) {
+    const crossOrigin = new URL(url).origin !== self.location.origin;
+    return fetch(new Request(url, { mode: crossOrigin ? 'no-cors' : 'same-origin' })).then(response => {
+        if (!response.ok && response.type !== 'opaque') throw new Error(`${url}: HTTP ${response.status}`);
+        return response;
+    });
+}
+
+self.addEventListener('install', event => {
+    event.waitUntil(Promise.all([
+        // A new worker means a new page: fetch the shell past the HTTP cache
+        caches.open(SHELL_CACHE).then(cache => cache.addAll(BUILD.shell.map(url => new Request(url, { cache: 'reload' })))),
+        // Hashed files an earlier build already cached are kept as they are
+        caches.open(FILE_CACHE).then(cache => Promise.all(BUILD.immutable.map(absolute).map(url =>
+            cache.match(url).then(hit => hit || fetchForCache(url).then(response => cache.put(url, response)))
+        )))
+    ]));
+});
+
+self.addEventListener('activate', event => {
+    // Pages of the previous build are closed by now (no skipWaiting), so its files can go
+    const keep = new Set(BUILD.immutable.map(absolute));
+    event.waitUntil(caches.open(FILE_CACHE).then(cache => cache.keys().then(requests => Promise.all(
+        requests.filter(request => !keep.has(request.url)).map(request => cache.delete(request))
+    ))).then(() => self.clients.claim()));
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+    if (isImmutable(request.url)) {
+        event.respondWith(caches.open(FILE_CACHE).then(cache => cache.match(request.url).then(hit =>
+            hit || fetchForCache(request.url).then(response => {
+                cache.put(request.url, response.clone());
+                return response;
+            })
+        )));
+    } else if (new URL(request.url).origin === self.location.origin) {
+        // Stale-while-revalidate: answer from the cache, refresh it from the network for next time
+        event.respondWith(caches.open(SHELL_CACHE).then(cache => cache.match(request, { ignoreSearch: true }).then(hit => {
+            const update = fetch(request).then(response => {
+                if (response.ok) cache.put(request, response.clone());
+                return response;
+            });
+            event.waitUntil(update.catch(() => {}));
+            return hit || update;
+        })));
+    }
+});
@@ -0,0 +1,221 @@
+"""
+Test the multi-audience engine: alignment, cross-audience statistics and the comparison page
+"""
+import csv
+import importlib.util
+import os
+import random
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from audiences import CONTROL_METRICS, AudienceMatrix, Workspace
+from benchmark_reruns import jitter_row
+from data_parser import parse_csv_file, process_datasets, read_export_groups
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_FILE = os.path.join(HERE, "Various_HIlton - Deep DiversvsNationally representative.csv")
+
+def write_audience_export(path: str, name: str, size: int, seed: int, drop_every: int = 0,
+                          control: str = None) -> str:
+    """The bundled export re-labelled as another target group, Target percent jittered, some rows dropped"""
+    rng = random.Random(seed)
+    with open(DATA_FILE, 'r', encoding='utf-8-sig', newline='') as f:
+        rows = list(csv.reader(f))
+    columns = None
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        for i, row in enumerate(rows):
+            if row and row[0].startswith('Target Group:'):
+                row = [f'Target Group: {name} (n. {size})']
+            elif control and row and row[0].startswith('Control Group:'):
+                row = [f'Control Group: {control}']
+            elif row and row[0] == 'Response label':
+                columns = {column.strip(): j for j, column in enumerate(row)}
+            elif i >= 8 and columns and len(row) >= len(columns) and 'Target:' not in ','.join(row):
+                if drop_every and i % drop_every == 0:
+                    continue
+                label = row[0]
+                row = jitter_row(row, columns, 0, rng)
+                row[0] = label
+            writer.writerow(row)
+    return path
+
+def load(path: str) -> dict:
+    return process_datasets(parse_csv_file(path))
+
+def test_alignment_and_statistics():
+    print("Testing audience alignment and cross-audience statistics...")
+    with tempfile.TemporaryDirectory() as directory:
+        other = write_audience_export(os.path.join(directory, 'b.csv'), 'Luxury Travellers', 120, 1, drop_every=7)
+        third = write_audience_export(os.path.join(directory, 'c.csv'), 'Weekend Explorers', 80, 2)
+        assert read_export_groups(other) == {'target': 'Luxury Travellers', 'target_n': 120,
+                                             'control': 'Nationally representative', 'control_n': 411511}
+        named = {'Deep Divers': load(DATA_FILE), 'Luxury Travellers': load(other), 'Weekend Explorers': load(third)}
+    matrix = AudienceMatrix.from_datasets(named)
+    target = matrix.values['Target percent']
+    assert target.shape == (3, len(matrix))
+    assert np.isnan(target[1]).sum() > 0 and not np.isnan(target[0]).all()
+
+    # Every audience's values land on the right (section, label) column
+    df = named['Luxury Travellers']['Hobbies']['data']
+    column = matrix.section_table('Hobbies', matrix.values['Index'])['Luxury Travellers']
+    expected = pd.to_numeric(df['Index'], errors='coerce').to_numpy()
+    assert np.allclose(column.loc[df['Response label']].to_numpy(), expected, equal_nan=True)
+
+    # Cross index against a plain loop over items
+    cross = matrix.cross_index()
+    for item in range(0, len(matrix), 97):
+        for a in range(3):
+            others = [target[b, item] for b in range(3) if b != a and not np.isnan(target[b, item])]
+            if np.isnan(target[a, item]) or not others or np.mean(others) <= 0:
+                assert np.isnan(cross[a, item])
+            else:
+                assert np.isclose(cross[a, item], 100 * target[a, item] / np.mean(others))
+
+    # Ranks agree with a per-section pandas rank
+    ranks = matrix.ranks()
+    frame = pd.DataFrame({'section': matrix.sections, 'index': matrix.values['Index'][2]})
+    expected = frame.groupby('section', sort=False)['index'].rank(ascending=False, method='first')
+    assert np.allclose(ranks[2], expected.to_numpy(), equal_nan=True)
+    assert np.allclose(matrix.rank_shift(0)[0], 0, equal_nan=True)
+
+    distinctive = matrix.most_distinctive()
+    best = distinctive.iloc[0]
+    assert best['Cross index'] == np.nanmax(cross)
+    assert list(distinctive['Cross index']) == sorted(distinctive['Cross index'], reverse=True)
+    assert (distinctive['Lead'].dropna() >= 0).all()
+    print(f"✓ {len(matrix)} items x 3 audiences; top item {best['Response label']} ({best['Audience']})")
+    return True
+
+def test_control_dedup():
+    print("Testing control-group deduplication across exports...")
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [write_audience_export(os.path.join(directory, f'audience{i}.csv'), f'Audience {i}', 100 + i, i)
+                 for i in range(6)]
+        paths.append(write_audience_export(os.path.join(directory, 'other.csv'), 'Other control', 90, 9,
+                                           control='Online panel (n. 5000)'))
+        cache = os.path.join(directory, 'cache')
+        workspace = Workspace(cache)
+        loaded = [workspace.load(path) for path in paths]
+        sections = len(loaded[0].blocks)
+        assert len(workspace.store) == 2 * sections
+        assert all(a.blocks[i] is loaded[0].blocks[i] for a in loaded[:6] for i in range(sections))
+        assert loaded[6].blocks[0].control == 'Online panel' and loaded[6].blocks[0] is not loaded[0].blocks[0]
+
+        # Control columns are held once per control group rather than once per audience
+        unshared = sum(a.nbytes + sum(block.nbytes for block in a.blocks) for a in loaded)
+        assert workspace.nbytes < 0.8 * unshared, (workspace.nbytes, unshared)
+        control_files = [name for name in os.listdir(cache) if name.startswith('control-')]
+        assert len(control_files) == 2 * sections
+
+        # A fresh workspace rebuilds the same matrix from the disk cache without parsing
+        reloaded = Workspace(cache)
+        reloaded._parse = None
+        matrix = AudienceMatrix.from_audiences(loaded)
+        cached = AudienceMatrix.from_audiences([reloaded.load(path) for path in paths])
+        df = process_datasets(parse_csv_file(paths[3]))['Hobbies']['data']
+    assert list(cached.labels) == list(matrix.labels) and cached.audiences == matrix.audiences
+    for name in ('Target percent', 'Index', 'Control percent'):
+        assert np.allclose(cached.metric(name), matrix.metric(name), equal_nan=True)
+    assert matrix.control_values['Control percent'].shape == (2, len(matrix))
+    assert list(matrix.control_of) == [0] * 6 + [1]
+    column = matrix.section_table('Hobbies', matrix.metric('Control count'))['Audience 3']
+    assert np.allclose(column.loc[df['Response label']].to_numpy(), df['Control count'].astype(float).to_numpy())
+    print(f"✓ {len(paths)} exports share {len(workspace.store)} control blocks; "
+          f"{workspace.nbytes / 1024:.0f} KB in memory vs {unshared / 1024:.0f} KB unshared")
+    return True
+
+def test_export_scan_is_cached():
+    print("Testing the cached audience export scan...")
+    spec = importlib.util.spec_from_file_location('dashboard_app', os.path.join(HERE, 'app.py'))
+    app = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app)
+    reads = []
+    def counting_read(path):
+        reads.append(os.path.basename(path))
+        return read_export_groups(path)
+    app.read_export_groups = counting_read
+    with tempfile.TemporaryDirectory() as directory:
+        write_audience_export(os.path.join(directory, 'a.csv'), 'Audience A', 100, 1)
+        with open(os.path.join(directory, 'notes.csv'), 'w') as f:
+            f.write('not,an,export\n')
+        first = app.find_audience_exports(directory)
+        assert [os.path.basename(path) for path in first] == ['a.csv']
+        assert sorted(reads) == ['a.csv', 'notes.csv']
+        assert app.find_audience_exports(directory) == first and len(reads) == 2
+        write_audience_export(os.path.join(directory, 'b.csv'), 'Audience B', 100, 2)
+        assert [os.path.basename(path) for path in app.find_audience_exports(directory)] == ['a.csv', 'b.csv']
+        assert len(reads) == 5
+    print("✓ Reruns only stat the directory; an added export triggers one rescan")
+    return True
+
+def test_evicted_upload_leaves_workspace():
+    print("Testing that evicted uploads leave the audience workspace...")
+    from uploads import UploadStore
+    spec = importlib.util.spec_from_file_location('dashboard_app', os.path.join(HERE, 'app.py'))
+    app = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app)
+    workspace = app.get_audience_workspace()
+    with tempfile.TemporaryDirectory() as directory:
+        exports = {}
+        for name, seed in [('Luxury Travellers', 1), ('Budget Travellers', 2)]:
+            path = write_audience_export(os.path.join(directory, f'{seed}.csv'), name, 100 + seed, seed,
+                                         control=f'Adults {seed}')
+            with open(path, 'rb') as f:
+                exports[name] = f.read()
+        store = UploadStore(app.parse_upload, app.forget_data_file, directory=os.path.join(directory, 'uploads'),
+                            budget_bytes=1)
+        before, blocks = len(workspace), len(workspace.store)
+        luxury = store.submit(exports['Luxury Travellers'], 'luxury.csv')
+        luxury.future.result(timeout=120)
+        matrix = app.get_audience_matrix((luxury.path,), (luxury.digest,))
+        assert matrix.audiences == ['Luxury Travellers'] and len(workspace) == before + 1
+        assert len(workspace.store) > blocks
+
+        # Over budget: the second upload evicts the first, and its audience and control blocks go with it
+        budget = store.submit(exports['Budget Travellers'], 'budget.csv')
+        budget.future.result(timeout=120)
+        assert store.get(luxury.digest) is None
+        assert len(workspace) == before and len(workspace.store) == blocks
+        matrix = app.get_audience_matrix((budget.path,), (budget.digest,))
+        assert matrix.audiences == ['Budget Travellers'] and len(workspace) == before + 1
+        assert not workspace.forget(luxury.path)
+    print("✓ The evicted upload's audience column and control blocks are dropped")
+    return True
+
+def test_audience_page():
+    print("Testing the Audience Comparison page...")
+    from streamlit.testing.v1 import AppTest
+    with tempfile.TemporaryDirectory() as directory:
+        write_audience_export(os.path.join(directory, 'luxury.csv'), 'Luxury Travellers', 120, 1)
+        saved = {key: os.environ.get(key) for key in ('DASHBOARD_AUDIENCE_DIR', 'DASHBOARD_AUDIENCE_CACHE')}
+        os.environ['DASHBOARD_AUDIENCE_DIR'] = directory
+        os.environ['DASHBOARD_AUDIENCE_CACHE'] = os.path.join(directory, 'cache')
+        try:
+            at = AppTest.from_file(os.path.join(HERE, 'app.py'), default_timeout=120)
+            at.session_state['view'] = 'audiences'
+            at.run()
+            assert not at.exception, at.exception[0].value
+            assert len(at.get('plotly_chart')) == 1
+            assert 'Luxury Travellers' in at.caption[0].value
+            at.radio[0].set_value('Rank shift').run()
+            assert not at.exception, at.exception[0].value
+            at.selectbox[2].set_value('Luxury Travellers').run()
+            assert not at.exception and len(at.dataframe) == 2
+        finally:
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+    print("✓ chart, rank shift and per-audience distinctive table render")
+    return True
+
+if __name__ == "__main__":
+    test_alignment_and_statistics()
+    test_control_dedup()
+    test_export_scan_is_cached()
+    test_evicted_upload_leaves_workspace()
+    test_audience_page()
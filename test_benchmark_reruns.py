@@ -0,0 +1,43 @@
+"""
+Test the rerun benchmark: synthetic exports parse, and a small matrix stays within budget
+"""
+import json
+import os
+import tempfile
+
+from benchmark_reruns import DEFAULT_BUDGETS, benchmark, check_budgets, make_synthetic_export
+from data_parser import parse_csv_file
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_FILE = os.path.join(HERE, "Various_HIlton - Deep DiversvsNationally representative.csv")
+
+def test_synthetic_export():
+    print("Testing synthetic export generation...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = make_synthetic_export(DATA_FILE, os.path.join(directory, 'x3.csv'), 3)
+        original = parse_csv_file(DATA_FILE)
+        synthetic = parse_csv_file(path)
+    assert set(synthetic) == set(original)
+    for name in original:
+        assert len(synthetic[name]['data']) == 3 * len(original[name]['data']), name
+    print(f"✓ {len(synthetic)} sections, every section 3x its rows")
+    return True
+
+def test_small_matrix_within_budget():
+    print("Testing a small benchmark matrix against the budgets...")
+    output = benchmark({'bundled': DATA_FILE}, categories=['Lifestyle & Interests'],
+                       top_ns=[10], min_indexes=[120], allocations=False)
+    summary = output['summary']['bundled']
+    assert set(summary) == {'cold_start', 'dashboard', 'ai_summary', 'cultural_insights'}
+    assert summary['dashboard']['cold']['runs'] == 3 and summary['dashboard']['warm']['runs'] == 3
+    with open(DEFAULT_BUDGETS, encoding='utf-8') as f:
+        budgets = json.load(f)
+    violations = check_budgets(output['summary'], {'bundled': budgets['bundled']})
+    assert not violations, violations
+    assert check_budgets(output['summary'], {'bundled': {'dashboard': {'warm_p95_ms': 0.001}}})
+    print(f"✓ {len(output['timings'])} reruns within budget")
+    return True
+
+if __name__ == "__main__":
+    test_synthetic_export()
+    test_small_matrix_within_budget()
@@ -0,0 +1,88 @@
+"""
+Test the paginated Data Table store and the chunked CSV export
+"""
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+
+def load_app():
+    """Import app.py as a module (bare mode, main() is not run)"""
+    spec = importlib.util.spec_from_file_location('dashboard_app', APP_FILE)
+    app = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app)
+    return app
+
+def test_chunked_csv():
+    print("Testing chunked CSV export...")
+    app = load_app()
+    rng = np.random.default_rng(1)
+    n = 12345
+    df = pd.DataFrame({'Response label': [f'Label, "{i}"' for i in range(n)],
+                       'Target percent': rng.random(n) * 100,
+                       'Index': np.where(rng.random(n) < 0.1, np.nan, rng.random(n) * 300)})
+    chunks = list(app.iter_csv_chunks(df, chunk_rows=1000))
+    assert len(chunks) == 1 + 13
+    assert b''.join(chunks) == df.to_csv(index=False).encode('utf-8')
+    assert app.build_csv(df) == df.to_csv(index=False).encode('utf-8')
+    assert app.build_csv(df.head(0)) == df.head(0).to_csv(index=False).encode('utf-8')
+    print(f"✓ {n} rows in {len(chunks)} chunks match DataFrame.to_csv")
+    return True
+
+def test_table_order():
+    print("Testing table sort orders...")
+    app = load_app()
+    section = app.DEFAULT_SECTION
+    section_version = app.get_snapshot(app.DATA_FILE).section_versions[section]
+    table = app.get_section_table(section, app.DEFAULT_MIN_INDEX, app.DATA_FILE, section_version)
+    assert list(table.columns) == [c for c in app.TABLE_COLUMNS if c in table.columns]
+    for sort_col in ['Index', 'Target percent', 'Diff']:
+        for ascending in (False, True):
+            order = app.get_table_order(section, app.DEFAULT_MIN_INDEX, sort_col, ascending,
+                                        app.DATA_FILE, section_version)
+            expected = table.sort_values(sort_col, ascending=ascending, na_position='last', kind='stable')
+            assert table.iloc[order].index.equals(expected.index), (sort_col, ascending)
+    print(f"✓ {section}: {len(table)} rows sorted by 3 columns both ways")
+    return True
+
+def test_data_table_page():
+    print("Testing Data Table pagination...")
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP_FILE, default_timeout=60).run()
+    assert not at.exception
+    assert len(at.dataframe[-1].value) <= 50
+    
+    # Retail: Apparel has more rows than the smallest page size
+    at.sidebar.selectbox[0].set_value('Brands & Products').run()
+    at.sidebar.selectbox[1].set_value('Retail: Apparel').run()
+    at.sidebar.slider[1].set_value(0).run()
+    rows_per_page = [box for box in at.selectbox if box.label == "Rows per page"][0]
+    rows_per_page.set_value(25).run()
+    assert not at.exception
+    assert len(at.dataframe[-1].value) == 25
+    page = [box for box in at.number_input if box.label.startswith("Page")][0]
+    page.set_value(2).run()
+    assert not at.exception
+    assert 0 < len(at.dataframe[-1].value) <= 25
+    rows_caption = [caption.value for caption in at.caption if caption.value.startswith("Rows")][0]
+    assert rows_caption.startswith("Rows 26–50 of ")
+    
+    # A new sort order starts again from the first page, in either direction
+    [box for box in at.selectbox if box.label == "Order"][0].set_value("Ascending").run()
+    assert not at.exception
+    assert [box for box in at.number_input if box.label.startswith("Page")][0].value == 1
+    assert [caption.value for caption in at.caption if caption.value.startswith("Rows")][0].startswith("Rows 1–25 of ")
+    [box for box in at.number_input if box.label.startswith("Page")][0].set_value(2).run()
+    [box for box in at.selectbox if box.label == "Sort by"][0].set_value('Target percent').run()
+    assert not at.exception
+    assert [box for box in at.number_input if box.label.startswith("Page")][0].value == 1
+    print(f"✓ {rows_caption}; changing the sort returns to page 1")
+    return True
+
+if __name__ == "__main__":
+    test_chunked_csv()
+    test_table_order()
+    test_data_table_page()
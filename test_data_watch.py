@@ -0,0 +1,143 @@
+"""
+Test hot reload of the data file: change detection, atomic swap and per-section invalidation
+"""
+import importlib.util
+import os
+import shutil
+import tempfile
+import time
+
+from data_watch import DataWatcher
+from data_parser import parse_csv_file, process_datasets
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_FILE = os.path.join(HERE, "Various_HIlton - Deep DiversvsNationally representative.csv")
+
+def load(path):
+    return process_datasets(parse_csv_file(path))
+
+def edit_row(path, old, new):
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        text = f.read()
+    assert old in text
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text.replace(old, new, 1))
+
+def test_reload_swaps_changed_sections():
+    print("Testing reload on file change...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'export.csv')
+        shutil.copyfile(DATA_FILE, path)
+        retired = []
+        watcher = DataWatcher(path, load, interval=3600, on_retire=lambda p, snapshot: retired.append(snapshot))
+        first = watcher.snapshot()
+        
+        # Touching the file without changing it keeps the snapshot
+        os.utime(path, None)
+        assert not watcher.check()
+        assert watcher.snapshot() is first
+        
+        edit_row(path, 'Go out to a bar,50.78%', 'Go out to a bar,52.00%')
+        assert watcher.check()
+        second = watcher.snapshot()
+        assert second is not first and second.version != first.version
+        assert second.changed_sections == ['Springtime activities']
+        assert second.section_versions['Hobbies'] == first.section_versions['Hobbies']
+        
+        # The old version stays readable for reruns that started on it
+        assert watcher.get(first.version) is first
+        assert watcher.section('Springtime activities', first.section_versions['Springtime activities']) \
+            is first.datasets['Springtime activities']
+        assert second.datasets['Springtime activities']['data']['Target percent'].iloc[0] == 52.0
+        
+        edit_row(path, 'Go out to a bar,52.00%', 'Go out to a bar,53.00%')
+        assert watcher.check()
+        assert retired == [first]
+        assert watcher.versions() == [second.version, watcher.snapshot().version]
+    print("✓ Only the edited section changed; previous version retained, oldest retired")
+    return True
+
+def test_unchanged_section_views_survive_reload():
+    print("Testing per-section cache reuse across a reload...")
+    spec = importlib.util.spec_from_file_location('dashboard_app', os.path.join(HERE, 'app.py'))
+    app = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'export.csv')
+        shutil.copyfile(DATA_FILE, path)
+        watcher = app.get_watcher(path)
+        before = watcher.snapshot()
+        views = {name: app.get_section_view(name, 'Index', 10, 120, path, before.section_versions[name])
+                 for name in ['Springtime activities', 'Hobbies']}
+        summary = app.get_ai_summary(path, before.version)
+        
+        edit_row(path, 'Go out to a bar,50.78%', 'Go out to a bar,52.00%')
+        assert watcher.check()
+        after = watcher.snapshot()
+        assert app.get_section_view('Hobbies', 'Index', 10, 120, path, after.section_versions['Hobbies']) is views['Hobbies']
+        changed = app.get_section_view('Springtime activities', 'Index', 10, 120, path,
+                                       after.section_versions['Springtime activities'])
+        assert changed is not views['Springtime activities']
+        assert changed['df_display']['Target percent'].iloc[0] == 52.0
+        assert app.get_ai_summary(path, before.version) is summary
+        assert app.get_ai_summary(path, after.version) is not summary
+        app.forget_data_file(path)
+    print("✓ Unchanged section reused its cached view, changed section and summaries rebuilt")
+    return True
+
+def test_reload_survives_errors():
+    print("Testing reload with a missing file and failing callbacks...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'export.csv')
+        def fail_retire(file_path, snapshot):
+            raise TypeError("clear() takes 1 positional argument but 3 were given")
+        watcher = DataWatcher(path, load, interval=0.01, on_retire=fail_retire)
+        assert watcher.current.datasets is None and not watcher.check()
+        
+        shutil.copyfile(DATA_FILE, path)
+        assert watcher.check() and watcher.current.datasets
+        edit_row(path, 'Go out to a bar,50.78%', 'Go out to a bar,52.00%')
+        assert watcher.check()
+        # The third version retires the first: the failing callback is recorded, the swap stands
+        edit_row(path, 'Go out to a bar,52.00%', 'Go out to a bar,53.00%')
+        assert watcher.check() and watcher.last_error.startswith('TypeError')
+        assert watcher.current.datasets['Springtime activities']['data']['Target percent'].iloc[0] == 53.0
+        
+        # An exception escaping check() does not stop the polling thread
+        checks = []
+        def flaky_check(blocking=True):
+            checks.append(blocking)
+            raise FileNotFoundError(path)
+        watcher.check = flaky_check
+        watcher.start_polling()
+        deadline = time.monotonic() + 5
+        while len(checks) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(checks) >= 3 and watcher._poller.is_alive()
+        assert watcher.last_error.startswith('FileNotFoundError')
+    print("✓ Missing file gives an empty snapshot; retire and check errors are recorded, polling continues")
+    return True
+
+def test_clear_cached_without_per_key_clear():
+    print("Testing cache clearing on Streamlit without per-key clear...")
+    spec = importlib.util.spec_from_file_location('dashboard_app', os.path.join(HERE, 'app.py'))
+    app = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app)
+    calls = []
+    class OldCachedFunc:  # streamlit 1.28: clear(self)
+        def clear(self):
+            calls.append(())
+    class NewCachedFunc:
+        def clear(self, *args, **kwargs):
+            calls.append(args)
+    app.clear_cached(OldCachedFunc(), 'export.csv', 'v1')
+    app.clear_cached(NewCachedFunc(), 'export.csv', 'v1')
+    assert calls == [(), ('export.csv', 'v1')]
+    print("✓ Falls back to a full clear() when clear takes no arguments")
+    return True
+
+if __name__ == "__main__":
+    test_reload_swaps_changed_sections()
+    test_unchanged_section_views_survive_reload()
+    test_reload_survives_errors()
+    test_clear_cached_without_per_key_clear()
@@ -0,0 +1,115 @@
+"""
+Test that the fast_figures builders produce the same figures as the graph_objects path
+"""
+import base64
+import importlib.util
+import json
+import os
+
+import numpy as np
+import plotly.io as pio
+
+def decode_arrays(value):
+    """Turn plotly's base64 typed arrays back into plain lists so encodings compare equal"""
+    if isinstance(value, dict):
+        if set(value) == {'dtype', 'bdata'} or set(value) == {'dtype', 'bdata', 'shape'}:
+            array = np.frombuffer(base64.b64decode(value['bdata']), dtype=value['dtype'])
+            if 'shape' in value:
+                array = array.reshape([int(n) for n in str(value['shape']).split(',')])
+            # NaN in a typed array and null in a plain list both render as gaps
+            return np.where(np.isnan(array), None, array).tolist() if array.dtype.kind == 'f' else array.tolist()
+        return {key: decode_arrays(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode_arrays(item) for item in value]
+    return value
+
+def load_app():
+    """Import app.py as a module (bare mode, main() is not run)"""
+    spec = importlib.util.spec_from_file_location('dashboard_app', os.path.join(os.path.dirname(__file__) or '.', 'app.py'))
+    app = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app)
+    return app
+
+def as_json(fig):
+    return decode_arrays(json.loads(pio.to_json(fig, validate=False)))
+
+def build_all(app, fast):
+    """Every chart the dashboard draws for a few sections plus both insight pages"""
+    app.FAST_FIGURES = fast
+    datasets = app.filter_sections_with_data(app.load_data(app.DATA_FILE))
+    figures = {}
+    for section_name in ['Springtime activities', 'Hotels: Current Customer', 'Hobbies']:
+        df = datasets[section_name]['data']
+        for metric in ['Index', 'Target percent', 'Difference']:
+            figures[f'{section_name} comparison {metric}'] = app.create_comparison_chart(df, section_name, 10, metric)[0]
+        figures[f'{section_name} index'] = app.create_index_chart(df, section_name, 15)[0]
+        figures[f'{section_name} scatter'] = app.create_scatter_chart(df, section_name)[0]
+    
+    df_all = app.analyze_all_data_for_ai_summary(datasets)
+    for insight in app.generate_ai_insights(df_all, datasets):
+        figures[f"ai {insight['chart_type']}"] = app.create_insight_chart(insight['chart_data'], insight['chart_type'], insight)
+    for insight in app.generate_cultural_insights(df_all, datasets):
+        figures[f"cultural {insight['chart_type']}"] = app.create_cultural_chart(insight['chart_data'], insight['chart_type'])
+    matrix = app.build_affinity_matrix(datasets)
+    for stat in app.AFFINITY_STATS:
+        figures[f"affinity heatmap {stat}"] = app.create_affinity_heatmap(matrix, stat)
+    audience_matrix = app.audiences.AudienceMatrix.from_datasets({'A': datasets, 'B': datasets})
+    for metric, grid in [('Cross-audience index', audience_matrix.cross_index()),
+                         ('Rank shift', audience_matrix.rank_shift(1))]:
+        table = audience_matrix.section_table('Hobbies', grid)
+        figures[f"audience {metric}"] = app.create_audience_chart(table, metric, 'Hobbies')
+    return figures
+
+def test_fast_figures():
+    print("Testing fast figure builders against graph_objects...")
+    app = load_app()
+    try:
+        reference = build_all(app, fast=False)
+        fast = build_all(app, fast=True)
+    finally:
+        app.FAST_FIGURES = True
+    
+    assert reference.keys() == fast.keys()
+    for name in reference:
+        assert isinstance(fast[name], dict), name
+        assert as_json(fast[name]) == as_json(reference[name]), f"{name} differs"
+        print(f"✓ {name}")
+    return True
+
+def test_scatter_downsampling():
+    print("Testing large-section scatter downsampling...")
+    import pandas as pd
+    app = load_app()
+    rng = np.random.default_rng(0)
+    n = 20000
+    control = rng.gamma(2.0, 5.0, n)
+    target = control * rng.lognormal(0, 0.4, n)
+    df = pd.DataFrame({'Response label': [f'Brand {i}' for i in range(n)],
+                       'Target percent': target, 'Control percent': control,
+                       'Index': target / control * 100, 'Diff': target - control})
+    
+    sample = app.downsample_scatter(df, max_points=2000, keep_top=50)
+    assert len(sample) <= 2000
+    assert set(df.nlargest(50, 'Index').index) <= set(sample.index)
+    assert len(app.downsample_scatter(df.head(100), max_points=2000)) == 100
+    print(f"✓ {n} labels -> {len(sample)} points, top 50 by Index kept")
+    
+    try:
+        figures = {}
+        for fast in (False, True):
+            app.FAST_FIGURES = fast
+            fig, chart_data = app.create_scatter_chart(df, 'Synthetic brands')
+            assert len(chart_data) == n
+            figures[fast] = as_json(fig)
+    finally:
+        app.FAST_FIGURES = True
+    assert figures[False] == figures[True]
+    points = figures[True]['data'][0]
+    assert points['type'] == 'scattergl'
+    assert len(points['x']) <= app.SCATTER_MAX_POINTS
+    print(f"✓ WebGL scatter with {len(points['x'])} markers, identical on both builders")
+    return True
+
+if __name__ == "__main__":
+    test_fast_figures()
+    test_scatter_downsampling()
@@ -0,0 +1,81 @@
+"""
+Test the cross-section leaderboard: ranking orders, filters and the page
+"""
+import numpy as np
+import pandas as pd
+
+from test_data_table import APP_FILE, load_app
+
+def test_leaderboard_orders():
+    print("Testing leaderboard rankings...")
+    app = load_app()
+    version = app.get_snapshot(app.DATA_FILE).version
+    leaderboard = app.get_leaderboard(app.DATA_FILE, version)
+    table = leaderboard['table']
+    datasets = app.get_datasets(app.DATA_FILE, version)
+    assert set(table['Section'].cat.categories) <= set(datasets)
+    assert (table['Category'] == table['Section'].astype(str).map(app.get_item_category)).all()
+    for ranking in app.LEADERBOARD_RANKINGS:
+        expected = table.sort_values(ranking, ascending=False, na_position='last', kind='stable')
+        assert table.iloc[leaderboard['orders'][ranking]].index.equals(expected.index), ranking
+    
+    # Shrinkage never moves an Index away from 100
+    shrink = (table['Adjusted Index'] - 100).abs() <= (table['Index'] - 100).abs() + 1e-9
+    assert shrink.all()
+    print(f"✓ {len(table)} items from {len(table['Section'].cat.categories)} sections, "
+          f"{len(app.LEADERBOARD_RANKINGS)} rankings")
+    return True
+
+def test_leaderboard_filters():
+    print("Testing leaderboard filters...")
+    app = load_app()
+    version = app.get_snapshot(app.DATA_FILE).version
+    table = app.get_leaderboard(app.DATA_FILE, version)['table']
+    assert app.section_pattern_matches(['NFL - level of interest', 'Hobbies'], 'nfl') == ['NFL - level of interest']
+    assert app.section_pattern_matches(['NFL - level of interest', 'Hobbies'], '*interest') == ['NFL - level of interest']
+    assert app.section_pattern_matches(['NFL - level of interest', 'Hobbies'], 'h?bbies') == ['Hobbies']
+    
+    categories = ('Sports & Entertainment',)
+    positions = app.get_leaderboard_positions(app.DATA_FILE, version, 'Index', categories, 'level of', 50)
+    rows = table.iloc[positions]
+    expected = table[table['Category'].isin(categories)
+                     & table['Section'].astype(str).str.lower().str.contains('level of', regex=False)
+                     & (table['Target base'] >= 50)]
+    assert len(rows) == len(expected) > 0
+    assert rows['Index'].is_monotonic_decreasing
+    everything = app.get_leaderboard_positions(app.DATA_FILE, version, 'Diff', (), '', 0)
+    assert len(everything) == len(table)
+    print(f"✓ {len(rows)} of {len(table)} items pass the sports / 'level of' / base >= 50 filter")
+    return True
+
+def test_leaderboard_page():
+    print("Testing the Leaderboard page...")
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP_FILE, default_timeout=60).run()
+    assert not at.exception
+    [button for button in at.sidebar.button if button.label == "🏆 Leaderboard"][0].click().run()
+    assert not at.exception
+    assert at.session_state['view'] == 'leaderboard'
+    assert len(at.dataframe[-1].value) == 50
+    assert list(at.dataframe[-1].value['Rank'][:3]) == [1, 2, 3]
+    
+    [box for box in at.selectbox if box.label == "Rows per page"][0].set_value(25).run()
+    [box for box in at.number_input if box.label.startswith("Page")][0].set_value(3).run()
+    assert not at.exception
+    page = at.dataframe[-1].value
+    assert list(page['Rank'][:1]) == [51]
+    rows_caption = [caption.value for caption in at.caption if caption.value.startswith("Rows")][0]
+    assert rows_caption.startswith("Rows 51–75 of ")
+    
+    at.text_input[0].set_value("zzz-no-such-section").run()
+    assert not at.exception
+    assert len(at.dataframe[-1].value) == 0
+    [button for button in at.button if button.label == "← Back to Dashboard"][0].click().run()
+    assert at.session_state['view'] == 'dashboard'
+    print(f"✓ {rows_caption}")
+    return True
+
+if __name__ == "__main__":
+    test_leaderboard_orders()
+    test_leaderboard_filters()
+    test_leaderboard_page()
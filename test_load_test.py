@@ -0,0 +1,17 @@
+"""
+Smoke test for the concurrent-session load test harness
+"""
+from load_test import run_load
+
+def test_two_concurrent_sessions():
+    print("Testing load test harness with 2 sessions...")
+    result = run_load(2, steps=3, seed=1)
+    assert not result['errors'], result['errors']
+    assert result['reruns'] >= 2 * 4
+    assert 0 < result['p50_ms'] <= result['p95_ms'] <= result['p99_ms'] <= result['max_ms']
+    assert result['peak_rss_mb'] > 0 and result['cpu_s'] > 0
+    print(f"✓ {result['reruns']} reruns, p95 {result['p95_ms']:.0f} ms, peak RSS {result['peak_rss_mb']:.0f} MB")
+    return True
+
+if __name__ == "__main__":
+    test_two_concurrent_sessions()
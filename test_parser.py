@@ -1,7 +1,8 @@
 """
 Simple test script to verify the CSV parser works correctly
 """
-from data_parser import parse_csv_file, process_datasets
+from data_parser import (parse_csv_file, process_datasets, build_affinity_matrix, order_affinity_sections,
+                         affinity_percentiles)
 
 def test_parser():
     print("Testing CSV parser...")
@@ -26,6 +27,29 @@ def test_parser():
         traceback.print_exc()
         return False
 
+def test_affinity_matrix():
+    print("Testing category x section affinity matrix...")
+    processed = process_datasets(parse_csv_file("Various_HIlton - Deep DiversvsNationally representative.csv"))
+    matrix = build_affinity_matrix(processed)
+    assert matrix['Section'].is_unique
+    for _, row in matrix.sample(10, random_state=0).iterrows():
+        index = processed[row['Section']]['data']['Index'].dropna()
+        assert row['Items'] == len(index)
+        assert abs(row['Mean Index'] - index.mean()) < 1e-9
+        assert abs(row['Median Index'] - index.median()) < 1e-9
+        assert abs(row['High-affinity share'] - (index >= 120).mean()) < 1e-9
+    categories = list(dict.fromkeys(matrix['Category']))
+    ordered = order_affinity_sections(matrix, 'High-affinity share')
+    assert list(dict.fromkeys(ordered['Category'])) == categories
+    assert sorted(ordered['Section']) == sorted(matrix['Section'])
+    for _, group in ordered.groupby('Category', sort=False):
+        assert group['High-affinity share'].is_monotonic_decreasing
+    percentiles = affinity_percentiles(ordered)
+    assert percentiles.notna().all().all() and percentiles.max().eq(1).all()
+    print(f"✓ {len(matrix)} sections in {len(categories)} categories, ordered within each by any statistic")
+    return True
+
 if __name__ == "__main__":
     test_parser()
+    test_affinity_matrix()
 
@@ -0,0 +1,46 @@
+"""
+Simple test script to verify the per-rerun instrumentation records phases and logs them
+"""
+import json
+import os
+import tempfile
+
+import perf
+
+def test_perf():
+    print("Testing perf instrumentation...")
+    # Disabled: phase() is a no-op and nothing is recorded
+    assert perf.begin_rerun('dashboard', enabled=False) is None
+    with perf.phase("data load") as entry:
+        assert entry is None
+    
+    recorder = perf.begin_rerun('dashboard', enabled=True)
+    with perf.phase("section view"):
+        with perf.phase("figure: comparison"):
+            pass
+    perf.add_payload("chart: comparison", 1234)
+    
+    record = recorder.to_record()
+    assert [p['phase'] for p in record['phases']] == ["section view", "figure: comparison"]
+    assert [p['depth'] for p in record['phases']] == [0, 1]
+    assert all(p['ms'] is not None for p in record['phases'])
+    assert record['payload_bytes'] == 1234
+    print("✓ Phases and payloads recorded")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, 'perf_log.jsonl')
+        recorder.append_to_log(log_path)
+        recorder.append_to_log(log_path)
+        with open(log_path, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+    assert len(lines) == 2 and lines[0]['view'] == 'dashboard'
+    print("✓ JSONL log appended")
+    
+    assert perf.flag_enabled('1') and perf.flag_enabled(['true'])
+    assert not perf.flag_enabled(None) and not perf.flag_enabled('0')
+    print("✓ Query parameter parsing")
+    perf.begin_rerun('dashboard', enabled=False)
+    return True
+
+if __name__ == "__main__":
+    test_perf()
@@ -0,0 +1,83 @@
+"""
+Test the n-gram search index: exact, prefix and fuzzy matching, ranking and the static payload
+"""
+import json
+
+import pandas as pd
+
+from data_parser import parse_csv_file, process_datasets
+from search_index import SearchIndex, normalize, word_grams
+from test_data_table import APP_FILE
+
+def make_index():
+    datasets = {
+        'Skincare & Cosmetics: Purchase Intent': {
+            'question': 'Which skincare brands would you consider?',
+            'data': pd.DataFrame({'Response label': ['Lush', 'Clinique', 'The Body Shop'], 'Index': [1696, 210, None]}),
+        },
+        'Hotels: Current Customer': {
+            'question': 'Which hotel brands are you a current customer of?',
+            'data': pd.DataFrame({'Response label': ['Marriott', 'Courtyard by Marriott', 'Hilton'], 'Index': [150, 90, 300]}),
+        },
+        'Café culture': {
+            'question': 'How often do you visit a café?',
+            'data': pd.DataFrame({'Response label': ['Weekly', 'Never'], 'Index': [120, 80]}),
+        },
+    }
+    return SearchIndex.from_datasets(datasets)
+
+def test_search_matching():
+    print("Testing search matching...")
+    assert normalize("Café  CULTURE!") == "cafe culture"
+    assert word_grams("lush") == ['^lu', 'lus', 'sh$', 'ush']
+    index = make_index()
+    
+    exact = index.search("Lush")
+    assert exact[0]['text'] == 'Lush' and exact[0]['score'] == 1.0 and exact[0]['index'] == 1696
+    assert index.search("lu")[0]['text'] == 'Lush'  # prefix
+    assert [hit['text'] for hit in index.search("mariot")][:2] == ['Marriott', 'Courtyard by Marriott']  # fuzzy
+    assert index.search("cafe")[0]['kind'] == 'section'  # accents ignored, sections outrank questions
+    assert {hit['kind'] for hit in index.search("cafe")} == {'section', 'question'}
+    assert index.search("marriott courtyard")[0]['text'] == 'Courtyard by Marriott'  # every term must match
+    assert index.search("lush hilton") == []
+    assert index.search("zzzz") == [] and index.search("  ") == []
+    assert index.search("The Body Shop")[0]['index'] is None
+    print(f"✓ {len(index)} documents, {len(index.words)} words")
+    return True
+
+def test_search_payload():
+    print("Testing the serialised search index...")
+    processed = process_datasets(parse_csv_file("Various_HIlton - Deep DiversvsNationally representative.csv"))
+    index = SearchIndex.from_datasets(processed)
+    payload = json.loads(json.dumps(index.to_payload()))
+    docs = payload['docs']
+    assert len(docs['text']) == len(index) == len(docs['kind']) == len(docs['section'])
+    assert payload['words'] == sorted(payload['words'])
+    word = payload['words'].index('lush')
+    postings = payload['word_docs'][payload['word_indptr'][word]:payload['word_indptr'][word + 1]]
+    assert [docs['text'][doc] for doc in postings] == ['Lush']
+    assert word in payload['grams']['^lu'] and payload['word_gram_counts'][word] == 4
+    
+    hits = index.search("lush")
+    assert hits[0]['section'] == 'Skincare & Cosmetics: Purchase Intent'
+    print(f"✓ {len(index)} documents serialised, top hit for 'lush' in {hits[0]['section']}")
+    return True
+
+def test_search_jumps_to_section():
+    print("Testing the sidebar search...")
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP_FILE, default_timeout=60).run()
+    at.sidebar.text_input[0].set_value("lush").run()
+    results = [button for button in at.sidebar.button if (button.key or '').startswith('search_hit')]
+    assert results and results[0].label.startswith("🏷️ Lush")
+    results[0].click().run()
+    assert not at.exception
+    assert at.sidebar.selectbox[0].value == 'Brands & Products'
+    assert at.sidebar.selectbox[1].value == 'Skincare & Cosmetics: Purchase Intent'
+    print(f"✓ jumped to {at.sidebar.selectbox[1].value}")
+    return True
+
+if __name__ == "__main__":
+    test_search_matching()
+    test_search_payload()
+    test_search_jumps_to_section()
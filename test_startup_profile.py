@@ -0,0 +1,50 @@
+"""
+Test the startup profile: importtime parsing, and heavy modules staying out of cold imports
+"""
+import subprocess
+import sys
+
+from startup_profile import HERE, compare, package_totals, parse_importtime
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2500 |      40000 |     pandas.core
+import time:     30000 |      70000 |   pandas
+import time:       800 |      70800 | data_parser
+"""
+
+def loaded_modules(statement: str) -> set:
+    """sys.modules after running one import statement in a fresh interpreter"""
+    result = subprocess.run([sys.executable, '-c', f'{statement}\nimport sys\nprint(" ".join(sys.modules))'],
+                            cwd=HERE, capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stderr
+    return set(result.stdout.split())
+
+def test_parse_importtime():
+    print("Testing -X importtime parsing...")
+    rows = parse_importtime(SAMPLE)
+    assert [row['module'] for row in rows] == ['_io', 'pandas.core', 'pandas', 'data_parser']
+    assert [row['depth'] for row in rows] == [1, 2, 1, 0]
+    assert rows[-1]['cumulative_us'] == 70800
+    assert list(package_totals(rows)) == ['pandas', 'data_parser', '_io']
+    assert package_totals(rows)['pandas'] == 32.5
+    baseline = {'imports': {'app': {'ms': 500.0}, 'data_parser': {'ms': 5.0}}}
+    slower = {'imports': {'app': {'ms': 700.0}, 'data_parser': {'ms': 15.0}}}
+    assert compare(slower, baseline) == ["imports.app: 700 ms vs 500 ms baseline"]
+    print("✓ rows, package totals and baseline comparison")
+    return True
+
+def test_cold_imports_stay_light():
+    print("Testing that heavy modules load on first use...")
+    for module in ('data_parser', 'generate_static_dashboard', 'generate_static_dashboard_complete'):
+        modules = loaded_modules(f'import {module}')
+        assert 'pandas' not in modules and 'numpy' not in modules, module
+    assert 'pandas' not in loaded_modules('import search_index')
+    modules = loaded_modules('import app')
+    assert 'plotly.express' not in modules and 'plotly.subplots' not in modules
+    print("✓ parser and generators import without pandas; app without plotly.express")
+    return True
+
+if __name__ == "__main__":
+    test_parse_importtime()
+    test_cold_imports_stay_light()
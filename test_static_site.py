@@ -0,0 +1,414 @@
+"""
+Test the static site build: a small inline manifest plus lazily fetched data chunks
+"""
+import gzip
+import json
+import math
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import generate_static_dashboard as generator
+from data_parser import parse_csv_file, process_datasets
+from generate_static_dashboard import (BUILD_MANIFEST, DATA_DIR, JSON_SLICE, SORT_KEYS, analyze_all_data_for_ai_summary,
+                                       build_static_site, generate_ai_insights_data, generate_cultural_insights_data,
+                                       generate_html_dashboard, prepare_affinity_data, prepare_data_for_html,
+                                       iter_json, prepare_search_data, watch)
+from generate_static_dashboard import (ASSETS_DIR, CDN_SCRIPT, CDN_URL, SERVICE_WORKER, TRACE_TYPES, bundle_trace_types, default_plotly_bundle,
+                                       minify_css, minify_js, split_page)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_FILE = os.path.join(HERE, "Various_HIlton - Deep DiversvsNationally representative.csv")
+
+def build_site(directory: str, datasets=None) -> str:
+    datasets = datasets or parse_csv_file(DATA_FILE)
+    dashboard_data = prepare_data_for_html(datasets)
+    output_file = os.path.join(directory, 'index.html')
+    generate_html_dashboard(dashboard_data, [{'title': 'ai'}], [{'title': 'cultural'}], output_file,
+                            prepare_affinity_data(datasets), prepare_search_data(datasets, dashboard_data))
+    return output_file
+
+def read_manifest(output_file: str) -> dict:
+    with open(output_file, encoding='utf-8') as f:
+        html = f.read()
+    return json.loads(re.search(r'const manifest = (.*?);(?:\n|</script>)', html).group(1)), html
+
+def test_chunked_site():
+    print("Testing the chunked static site...")
+    datasets = parse_csv_file(DATA_FILE)
+    with tempfile.TemporaryDirectory() as directory:
+        output_file = build_site(directory, datasets)
+        manifest, html = read_manifest(output_file)
+        assert len(manifest['sections']) == len(prepare_data_for_html(datasets)['sections'])
+        assert set(manifest['pages']) == {'ai-summary', 'cultural-insights', 'affinity-heatmap', 'search'}
+        chunks = [entry['chunk'] for entry in manifest['sections']] + list(manifest['pages'].values())
+        for chunk in chunks:
+            assert chunk.startswith(f'{DATA_DIR}/') and os.path.exists(os.path.join(directory, chunk)), chunk
+        with open(os.path.join(directory, manifest['pages']['ai-summary']), encoding='utf-8') as f:
+            assert json.load(f) == [{'title': 'ai'}]
+        hobbies = next(entry for entry in manifest['sections'] if entry['name'] == 'Hobbies')
+        with open(os.path.join(directory, hobbies['chunk']), encoding='utf-8') as f:
+            chunk = json.load(f)
+        assert len(chunk['labels']) == hobbies['items'] and chunk['labels'][0] not in html
+
+        # Charts are updated in place with Plotly.react and purged before their containers are replaced
+        assert 'Plotly.newPlot' not in html and 'Plotly.purge' in html and 'IntersectionObserver' in html
+        # Section rows are filtered and turned into CSV by the data worker, not embedded in the markup
+        assert 'new Worker(' in html and 'JSON.stringify(csvContent)' not in html
+        # The data table is windowed: rows are drawn from worker queries, not concatenated for the whole section
+        assert 'TABLE_ROW_HEIGHT' in html and '<tbody>' not in html
+
+        # Rebuilding with one section changed rewrites that chunk only and drops the stale file
+        datasets['Hobbies']['data'] = datasets['Hobbies']['data'].head(5)
+        manifest_after, _ = read_manifest(build_site(directory, datasets))
+        changed = [a['name'] for a, b in zip(manifest['sections'], manifest_after['sections']) if a['chunk'] != b['chunk']]
+        assert changed == ['Hobbies']
+        assert not os.path.exists(os.path.join(directory, hobbies['chunk']))
+        files = sum(len(names) for _, _, names in os.walk(os.path.join(directory, DATA_DIR)))
+        assert files == len(chunks)
+    print(f"✓ {len(manifest['sections'])} section chunks + {len(manifest['pages'])} page chunks, "
+          f"{len(html) // 1024} KB page")
+    return True
+
+def decode_section(chunk: dict, manifest: dict) -> list:
+    """The data worker's decodeSection and item: fixed-point columns back to item dicts"""
+    scale, items = manifest['scale'], []
+    for i, label in enumerate(chunk['labels']):
+        control = chunk['control'][i]
+        items.append({
+            'label': label,
+            'target_pct': chunk['target'][i] / scale,
+            'control_pct': 0 if control is None else control / scale,
+            'index': chunk['index'][i] / scale,
+            'diff': 0 if control is None else (chunk['target'][i] - control) / scale,
+        })
+    return items
+
+def row_items(df) -> list:
+    """Reference row-by-row version of the payload: positive Target percent and an Index, missing control as 0"""
+    items = []
+    for row in df.to_dict('records'):
+        target, control, index = row['Target percent'], row['Control percent'], row['Index']
+        if not target > 0 or math.isnan(index):
+            continue
+        items.append({'label': str(row['Response label']), 'target_pct': target,
+                      'control_pct': 0 if math.isnan(control) else control, 'index': index,
+                      'diff': 0 if math.isnan(control) else target - control})
+    return items
+
+def column_items(columns: dict) -> list:
+    """A prepared section's columns as the item dicts the page works with"""
+    return [{'label': label, 'target_pct': target, 'control_pct': 0 if math.isnan(control) else control,
+             'index': index, 'diff': 0 if math.isnan(control) else target - control}
+            for label, target, control, index in zip(columns['label'], columns['target_pct'].tolist(),
+                                                     columns['control_pct'].tolist(), columns['index'].tolist())]
+
+def test_columnar_prepare():
+    print("Testing the columnar prepare_data_for_html...")
+    datasets = parse_csv_file(DATA_FILE)
+    hobbies = datasets['Hobbies']['data']
+    hobbies.loc[1, 'Control percent'] = None
+    hobbies.loc[2, 'Target percent'] = '0'
+    hobbies.loc[3, 'Index'] = ''
+    hobbies.loc[4, 'Control percent'] = 'n/a'
+    processed = process_datasets(datasets)
+    dashboard_data = prepare_data_for_html(datasets, processed)
+    assert list(dashboard_data['sections']) == [name for name, section in processed.items()
+                                                if row_items(section['data'])]
+    for name, section in dashboard_data['sections'].items():
+        assert column_items(section['columns']) == row_items(processed[name]['data']), name
+    assert len(dashboard_data['sections']['Hobbies']['columns']['label']) == len(hobbies) - 2
+
+    # The AI summary frame keeps rows with a missing control (as 0) and drops unparseable ones
+    df_all = analyze_all_data_for_ai_summary(datasets)
+    rows = df_all[df_all['section'] == 'Hobbies']
+    assert hobbies.loc[1, 'Response label'] in set(rows['item'])
+    assert hobbies.loc[4, 'Response label'] not in set(rows['item'])
+    assert rows.set_index('item').loc[hobbies.loc[1, 'Response label'], 'control_pct'] == 0
+    assert list(df_all.columns) == ['section', 'item', 'index', 'target_pct', 'control_pct', 'gap', 'category']
+    print(f"✓ {len(dashboard_data['sections'])} sections match a row-by-row pass; {len(df_all)} AI summary rows")
+    return True
+
+def test_compact_encoding():
+    print("Testing the compact columnar section chunks...")
+    datasets = parse_csv_file(DATA_FILE)
+    dashboard_data = prepare_data_for_html(datasets)
+    with tempfile.TemporaryDirectory() as directory:
+        manifest, _ = read_manifest(build_site(directory, datasets))
+        encoded = decoded = 0
+        for entry in manifest['sections']:
+            with open(os.path.join(directory, entry['chunk']), 'rb') as f:
+                raw = f.read()
+            chunk = json.loads(raw)
+            items = decode_section(chunk, manifest)
+            expected = column_items(dashboard_data['sections'][entry['name']]['columns'])
+            assert [item['label'] for item in items] == [item['label'] for item in expected]
+            for item, original in zip(items, expected):
+                for key in ('target_pct', 'control_pct', 'index', 'diff'):
+                    assert abs(item[key] - original[key]) < 0.006, (entry['name'], key, item, original)
+            for key, column in SORT_KEYS.items():
+                assert chunk['order'][key] == sorted(range(len(items)), key=lambda i: -items[i][column])
+            encoded += len(raw)
+            decoded += len(json.dumps(expected, separators=(',', ':')))
+    assert encoded < decoded * 0.65, (encoded, decoded)
+    print(f"✓ {len(manifest['sections'])} sections decode to the prepared items; "
+          f"{encoded // 1024} KB of chunks vs {decoded // 1024} KB as item dicts")
+    return True
+
+def site_files(directory: str) -> dict:
+    """index.html and every data chunk under a directory, by relative path"""
+    files = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.relpath(os.path.join(root, name), directory)
+            if path.startswith('index.html') or path.startswith(DATA_DIR + os.sep):
+                with open(os.path.join(root, name), 'rb') as f:
+                    files[path] = f.read()
+    return files
+
+def edit_export(path: str, old: str, new: str):
+    with open(path, encoding='utf-8-sig') as f:
+        text = f.read()
+    assert old in text
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text.replace(old, new, 1))
+
+def test_incremental_build():
+    print("Testing incremental static builds...")
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'export.csv')
+        shutil.copyfile(DATA_FILE, csv_path)
+        site_dir = os.path.join(directory, 'site')
+        os.makedirs(site_dir)
+        output_file = os.path.join(site_dir, 'index.html')
+        report = build_static_site(csv_path, output_file)
+        assert set(report.values()) == {'built', '48/48 re-encoded'}
+        reference = os.path.join(directory, 'reference')
+        os.makedirs(reference)
+        datasets = parse_csv_file(csv_path)
+        dashboard_data, df_all = prepare_data_for_html(datasets), analyze_all_data_for_ai_summary(datasets)
+        generate_html_dashboard(dashboard_data, generate_ai_insights_data(df_all), generate_cultural_insights_data(df_all),
+                                os.path.join(reference, 'index.html'), prepare_affinity_data(datasets),
+                                prepare_search_data(datasets, dashboard_data))
+        assert site_files(site_dir) == site_files(reference)
+        assert set(build_static_site(csv_path, output_file).values()) == {'cached'}
+
+        # One edited row re-encodes one section; the whole-dataset pages and the page follow
+        before = site_files(site_dir)
+        edit_export(csv_path, 'Go out to a bar,50.78%', 'Go out to a bar,52.00%')
+        report = build_static_site(csv_path, output_file)
+        assert report == {'sections': '1/48 re-encoded', 'pages': 'built', 'insights': 'built',
+                          'html': 'built'}, report
+        after = site_files(site_dir)
+        assert len([path for path in after if path.startswith(os.path.join(DATA_DIR, 'sections')) and path not in before]) == 1
+
+        # A template edit re-renders the page from the recorded manifest without parsing the CSV
+        state_path = os.path.join(site_dir, BUILD_MANIFEST)
+        with open(state_path, encoding='utf-8') as f:
+            state = json.load(f)
+        state['inputs']['template'] = 'edited'
+        with open(state_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write('<html></html>')
+        parse, generator.parse_csv_file = generator.parse_csv_file, None
+        try:
+            report = build_static_site(csv_path, output_file)
+        finally:
+            generator.parse_csv_file = parse
+        assert report == {'sections': 'cached', 'pages': 'cached', 'insights': 'cached', 'html': 'built'}, report
+        assert site_files(site_dir) == after
+
+        # A missing chunk forces a full build
+        os.remove(os.path.join(site_dir, state['site']['sections'][0]['chunk']))
+        assert build_static_site(csv_path, output_file)['sections'] == '48/48 re-encoded'
+        assert site_files(site_dir) == after
+    print("✓ full build matches the one-shot generator; a row edit re-encodes 1 section; template edits skip parsing")
+    return True
+
+def test_watch_rebuilds_on_save():
+    print("Testing watch mode...")
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'export.csv')
+        shutil.copyfile(DATA_FILE, csv_path)
+        output_file = os.path.join(directory, 'index.html')
+        stop = threading.Event()
+        watcher = threading.Thread(target=watch, args=(csv_path, output_file, 0.05, stop), daemon=True)
+        watcher.start()
+        try:
+            deadline = time.monotonic() + 60
+            while not os.path.exists(os.path.join(directory, BUILD_MANIFEST)) and time.monotonic() < deadline:
+                time.sleep(0.05)
+            first, _ = read_manifest(output_file)
+            edit_export(csv_path, 'Go out to a bar,50.78%', 'Go out to a bar,52.00%')
+            saved = time.monotonic()
+            while read_manifest(output_file)[0] == first and time.monotonic() < saved + 30:
+                time.sleep(0.02)
+            latency = time.monotonic() - saved
+            assert read_manifest(output_file)[0] != first
+        finally:
+            stop.set()
+            watcher.join(timeout=10)
+    print(f"✓ rebuilt {latency:.2f} s after the save")
+    return True
+
+def test_streamed_output():
+    print("Testing streamed JSON and pre-compressed copies...")
+    datasets = parse_csv_file(DATA_FILE)
+    dashboard_data = prepare_data_for_html(datasets)
+    payloads = [prepare_search_data(datasets, dashboard_data), prepare_affinity_data(datasets),
+                {'long': list(range(3 * JSON_SLICE + 5)), 'nested': [[1.5, None, 'é'], {'k': []}], 'empty': {}},
+                [{'a': i} for i in range(JSON_SLICE + 1)], 'text', 7, {1: 'int keys'}]
+    for payload in payloads:
+        assert ''.join(iter_json(payload)) == json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+    # Non-finite numbers, Python or numpy, are written as null rather than NaN/Infinity
+    import numpy as np
+    unclean = {'values': [1.5, math.nan, math.inf, np.float64('-inf'), np.float32(0.5)] * JSON_SLICE,
+               'nested': {'z': np.nan, 'n': [None, 2]}, 'scalar': -math.inf}
+    text = ''.join(iter_json(unclean))
+    assert 'NaN' not in text and 'Infinity' not in text
+    assert json.loads(text) == {'values': [1.5, None, None, None, 0.5] * JSON_SLICE,
+                                'nested': {'z': None, 'n': [None, 2]}, 'scalar': None}
+
+    with tempfile.TemporaryDirectory() as directory:
+        output_file = os.path.join(directory, 'index.html')
+        build_static_site(DATA_FILE, output_file)
+        plain = site_files(directory)
+        build_static_site(DATA_FILE, output_file, compress=['gzip'])
+        for path, content in site_files(directory).items():
+            if path.endswith('.gz'):
+                assert gzip.decompress(content) == plain[path[:-3]], path
+        assert all(path + '.gz' in site_files(directory) for path in plain)
+        assert not [name for _, _, names in os.walk(directory) for name in names if name.endswith('.tmp')]
+
+        # Turning compression off again removes the copies and leaves the plain files as they were
+        build_static_site(DATA_FILE, output_file)
+        assert site_files(directory) == plain
+    print(f"✓ iter_json matches json.dumps on {len(payloads)} payloads; .gz copies decompress to the plain files")
+    return True
+
+def test_offline_bundle():
+    print("Testing the self-contained offline bundle...")
+    plotly_bundle = default_plotly_bundle()
+    with open(plotly_bundle, encoding='utf-8') as f:
+        vendored = f.read()
+    # The vendored build is the CDN page's plotly.js release with only the dashboard's traces
+    version = re.search(r'plotly-([\d.]+)\.min\.js', CDN_URL).group(1)
+    assert f'plotly.js v{version}\n' in vendored[:100]
+    assert bundle_trace_types(vendored) == set(TRACE_TYPES)
+    vendored_gzip = len(gzip.compress(vendored.encode('utf-8')))
+    assert vendored_gzip < 400 * 1024, vendored_gzip
+
+    # Comments and indentation go; strings, template literals and regular expressions survive untouched
+    js = "const a = '// not a comment';  /* block */\n    const b = `x ${ {k: '/*'}.k } y`;\n" \
+         "    // line comment\n    const c = a.replace(/\\/\\*[^/]*/g, '') / 2;\n"
+    assert minify_js(js) == "const a='// not a comment';\nconst b=`x ${{k:'/*'}.k} y`;\nconst c=a.replace(/\\/\\*[^/]*/g,'')/2;\n"
+    assert minify_css('a > b  {  content: " x  y ";  /* c */ }') == 'a>b{content:" x  y "}'
+    page = split_page()
+    assert len(minify_css(page['css'])) < 0.6 * len(page['css']) and len(minify_js(page['script'])) < 0.7 * len(page['script'])
+
+    with tempfile.TemporaryDirectory() as directory:
+        output_file = os.path.join(directory, 'index.html')
+        build_static_site(DATA_FILE, output_file, compress=['gzip'], plotly_bundle=plotly_bundle)
+        with open(output_file, encoding='utf-8') as f:
+            html = f.read()
+        assets = re.findall(r'(?:src|href)="([^"]+)"', html)
+        assert CDN_SCRIPT not in html and not [path for path in assets if '://' in path]
+        assert [os.path.dirname(path) for path in assets] == [ASSETS_DIR] * 3
+        for path in assets:
+            with open(os.path.join(directory, path), 'rb') as f:
+                content = f.read()
+            with open(os.path.join(directory, path + '.gz'), 'rb') as f:
+                assert gzip.decompress(f.read()) == content
+        manifest, _ = read_manifest(output_file)
+        assert all(os.path.exists(os.path.join(directory, path)) for path in manifest['pages'].values())
+
+        # A bundle without one of the dashboard's trace types is refused; the built site is left as it was
+        partial = os.path.join(directory, 'partial.js')
+        with open(partial, 'w', encoding='utf-8') as f:
+            f.write('{moduleType:"trace",name:"bar"}{moduleType:"trace",name:"scatter"}')
+        try:
+            build_static_site(DATA_FILE, output_file, plotly_bundle=partial)
+            assert False, 'expected ValueError'
+        except ValueError as error:
+            assert 'heatmap' in str(error)
+        assert all(os.path.exists(os.path.join(directory, path)) for path in assets)
+
+        # Back to the CDN page: the assets directory is cleared
+        build_static_site(DATA_FILE, output_file)
+        assert not os.listdir(os.path.join(directory, ASSETS_DIR))
+    print(f"✓ {len(assets)} hashed assets with .gz copies, no external URLs, partial bundles checked for trace types; "
+          f"vendored plotly.js {version} is {vendored_gzip / 1024:.0f} KB gzipped")
+    return True
+
+def read_service_worker(directory: str) -> tuple:
+    """sw.js's BUILD object and its text"""
+    with open(os.path.join(directory, SERVICE_WORKER), encoding='utf-8') as f:
+        text = f.read()
+    return json.loads(re.search(r'const BUILD = (.*);\n', text).group(1)), text
+
+def test_service_worker():
+    print("Testing the service worker...")
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = shutil.copy(DATA_FILE, os.path.join(directory, 'export.csv'))
+        output_file = os.path.join(directory, 'index.html')
+        build_static_site(csv_path, output_file)
+        manifest, html = read_manifest(output_file)
+        build, text = read_service_worker(directory)
+        chunks = [entry['chunk'] for entry in manifest['sections']] + list(manifest['pages'].values())
+        assert "serviceWorker.register('sw.js')" in html
+        assert build['shell'] == ['./', 'index.html'] and build['immutable'] == chunks + [CDN_URL]
+        assert "addEventListener('fetch'" in text and 'skipWaiting()' not in text
+
+        # Nothing changed: sw.js is left alone, so browsers keep the installed worker
+        mtime = os.path.getmtime(os.path.join(directory, SERVICE_WORKER))
+        assert build_static_site(csv_path, output_file)['html'] == 'cached'
+        assert os.path.getmtime(os.path.join(directory, SERVICE_WORKER)) == mtime
+
+        # A data change gives a new sw.js naming the new chunks; unchanged sections keep theirs
+        edit_export(csv_path, 'Fitness,61.73%', 'Fitness,62.73%')
+        build_static_site(csv_path, output_file)
+        updated, _ = read_service_worker(directory)
+        assert updated['version'] != build['version']
+        renamed = set(build['immutable']) - set(updated['immutable'])
+        assert renamed and len(renamed) < 5 and all(os.path.exists(os.path.join(directory, path))
+                                                   for path in updated['immutable'][:-1])
+
+        # The offline bundle precaches its assets instead of the CDN build
+        build_static_site(csv_path, output_file, plotly_bundle=default_plotly_bundle())
+        bundled, _ = read_service_worker(directory)
+        assert CDN_URL not in bundled['immutable']
+        assert [os.path.dirname(path) for path in bundled['immutable'][-3:]] == [ASSETS_DIR] * 3
+    print(f"✓ sw.js precaches {len(build['immutable'])} files and changes only with the site "
+          f"({len(renamed)} renamed after a one-value edit)")
+    return True
+
+def test_builds_without_app_modules():
+    print("Testing a build from the generator's own modules...")
+    with tempfile.TemporaryDirectory() as directory:
+        for module in ('generate_static_dashboard.py', 'data_parser.py', 'search_index.py'):
+            shutil.copy(os.path.join(HERE, module), directory)
+        shutil.copy(DATA_FILE, os.path.join(directory, 'export.csv'))
+        result = subprocess.run([sys.executable, 'generate_static_dashboard.py', '--csv', 'export.csv'],
+                                cwd=directory, capture_output=True, text=True, timeout=300)
+        assert result.returncode == 0, result.stderr
+        assert os.path.exists(os.path.join(directory, SERVICE_WORKER))
+        assert 'data_watch' not in result.stderr
+    print("✓ builds with only data_parser and search_index beside the generator")
+    return True
+
+if __name__ == "__main__":
+    test_chunked_site()
+    test_columnar_prepare()
+    test_compact_encoding()
+    test_incremental_build()
+    test_watch_rebuilds_on_save()
+    test_streamed_output()
+    test_offline_bundle()
+    test_service_worker()
+    test_builds_without_app_modules()
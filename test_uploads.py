@@ -0,0 +1,120 @@
+"""
+Test the shared upload store: content hashing, background parsing and LRU eviction
+"""
+import os
+import tempfile
+import threading
+
+from uploads import UploadStore, content_hash
+
+def make_store(directory, budget_bytes, parse_bytes=100):
+    parsed, evicted = [], []
+    release = threading.Event()
+    release.set()
+    def parse(path):
+        release.wait(5)
+        with open(path, 'rb') as f:
+            if f.read().startswith(b'bad'):
+                raise ValueError("not an export")
+        parsed.append(path)
+        return parse_bytes
+    store = UploadStore(parse, evicted.append, directory=directory, budget_bytes=budget_bytes)
+    return store, parsed, evicted, release
+
+def test_same_bytes_share_one_parse():
+    print("Testing content-hash sharing...")
+    with tempfile.TemporaryDirectory() as directory:
+        store, parsed, _, release = make_store(directory, budget_bytes=1000)
+        release.clear()
+        first = store.submit(b'section,data\n', 'export.csv')
+        second = store.submit(b'section,data\n', 'copy of export.csv')
+        assert first is second
+        assert not first.ready
+        release.set()
+        assert first.future.result(5) == first.path
+        assert parsed == [first.path]
+        assert os.path.basename(first.path) == content_hash(b'section,data\n') + '.csv'
+        assert store.get(first.digest) is first
+    print("✓ Identical uploads share one background parse")
+    return True
+
+def test_failed_parse_is_reported():
+    print("Testing failed uploads...")
+    with tempfile.TemporaryDirectory() as directory:
+        store, _, _, _ = make_store(directory, budget_bytes=1000)
+        upload = store.submit(b'bad file', 'notes.csv')
+        upload.future.exception(5)
+        assert upload.ready
+        assert upload.error == "not an export"
+        # Dropped at once: no file, no store slot, but the error is still reported for the same bytes
+        assert not os.path.exists(upload.path) and len(store) == 0
+        assert store.get(upload.digest) is upload and store.submit(b'bad file', 'notes.csv') is upload
+    print("✓ Parse errors are surfaced on the upload and the file is dropped")
+    return True
+
+def test_lru_eviction():
+    print("Testing memory-bounded LRU eviction...")
+    with tempfile.TemporaryDirectory() as directory:
+        store, _, evicted, _ = make_store(directory, budget_bytes=250)
+        a = store.submit(b'a', 'a.csv')
+        a.future.result(5)
+        b = store.submit(b'b', 'b.csv')
+        b.future.result(5)
+        store.get(a.digest)  # a is now the most recently used
+        c = store.submit(b'c', 'c.csv')
+        c.future.result(5)
+        assert store.get(b.digest) is None
+        assert store.get(a.digest) is a and store.get(c.digest) is c
+        assert evicted == [b.path]
+        assert not os.path.exists(b.path)
+        assert store.total_bytes() == 200 and len(store) == 2
+    print("✓ Least recently used upload evicted once over budget")
+    return True
+
+def test_failing_evict_still_resolves():
+    print("Testing eviction callbacks that raise...")
+    with tempfile.TemporaryDirectory() as directory:
+        def evict(path):
+            raise TypeError("clear() takes 1 positional argument but 3 were given")
+        store = UploadStore(lambda path: 100, evict, directory=directory, budget_bytes=150)
+        a = store.submit(b'a', 'a.csv')
+        a.future.result(5)
+        b = store.submit(b'b', 'b.csv')
+        assert b.future.result(5) == b.path
+        assert store.get(a.digest) is None and not os.path.exists(a.path)
+    print("✓ The upload finishes and the evicted file is removed")
+    return True
+
+def test_upload_bundled_export():
+    print("Testing an upload through the dashboard's parser...")
+    import importlib.util
+    spec = importlib.util.spec_from_file_location('dashboard_app', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py'))
+    app = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app)
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), app.DATA_FILE), 'rb') as f:
+        data = f.read()
+    with tempfile.TemporaryDirectory() as directory:
+        store = UploadStore(app.parse_upload, app.forget_data_file, directory=directory, budget_bytes=1)
+        upload = store.submit(data, 'export.csv')
+        assert upload.future.result(60) == upload.path
+        assert upload.size_bytes > 0
+        assert set(app.get_datasets(upload.path)) == set(app.get_datasets(app.DATA_FILE))
+        
+        bad = store.submit(b'not,a\nprofiles,export\n', 'bad.csv')
+        assert bad.future.exception(60) is not None and bad.error
+        # Over budget: the first upload was evicted once the second finished
+        other = store.submit(data + b'\n', 'export (2).csv')
+        other.future.result(60)
+        assert store.get(upload.digest) is None and upload.path not in app.WATCHERS
+        # Forgetting a file that was never loaded does not parse it
+        app.forget_data_file(os.path.join(directory, 'missing.csv'))
+        assert os.path.join(directory, 'missing.csv') not in app.WATCHERS
+    print(f"✓ Parsed upload ({upload.size_bytes / 1024:.0f} KB in memory), bad file rejected")
+    return True
+
+if __name__ == "__main__":
+    test_same_bytes_share_one_parse()
+    test_failed_parse_is_reported()
+    test_lru_eviction()
+    test_failing_evict_still_resolves()
+    test_upload_bundled_export()
@@ -0,0 +1,161 @@
+"""
+Shared store for user-uploaded Profiles+ exports.
+
+Uploads are addressed by the SHA-256 of their bytes and written once to
+``DASHBOARD_UPLOAD_DIR`` (default ``.uploads``), so every session that uploads
+the same export gets the same file path and therefore the same cached parse.
+Parsing runs on a small background thread pool. Parsed uploads are kept in
+least-recently-used order and the oldest are evicted once their estimated
+in-memory size exceeds ``DASHBOARD_UPLOAD_CACHE_MB`` (default 256). Uploads that
+fail to parse are dropped at once; only their error is remembered.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+UPLOAD_DIR_ENV_VAR = 'DASHBOARD_UPLOAD_DIR'
+UPLOAD_CACHE_ENV_VAR = 'DASHBOARD_UPLOAD_CACHE_MB'
+DEFAULT_UPLOAD_DIR = '.uploads'
+DEFAULT_UPLOAD_CACHE_MB = 256
+FAILED_UPLOADS_KEPT = 32
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+class Upload:
+    """One uploaded export: where it lives on disk and its background parse"""
+
+    def __init__(self, digest: str, name: str, path: str, future: Future):
+        self.digest = digest
+        self.name = name
+        self.path = path
+        self.future = future
+        self.size_bytes = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.future.done()
+
+    @property
+    def error(self) -> Optional[str]:
+        """Why parsing failed, or None while parsing or after success"""
+        if not self.future.done():
+            return None
+        exc = self.future.exception()
+        return str(exc) if exc is not None else None
+
+class UploadStore:
+    """Content-addressed, memory-bounded LRU of parsed uploads.
+
+    ``parse(path)`` runs on a worker thread, loads the file into whatever caches
+    the app uses and returns the estimated bytes it holds in memory (raising if
+    the file is not a usable export). ``evict(path)`` is called when an upload
+    is dropped so those caches can be cleared.
+    """
+
+    def __init__(self, parse: Callable[[str], int], evict: Callable[[str], None],
+                 directory: Optional[str] = None, budget_bytes: Optional[int] = None,
+                 workers: int = 2):
+        self.parse = parse
+        self.evict = evict
+        self.directory = directory or os.environ.get(UPLOAD_DIR_ENV_VAR) or DEFAULT_UPLOAD_DIR
+        if budget_bytes is None:
+            budget_bytes = int(float(os.environ.get(UPLOAD_CACHE_ENV_VAR, DEFAULT_UPLOAD_CACHE_MB)) * 1024 * 1024)
+        self.budget_bytes = budget_bytes
+        self._uploads = OrderedDict()
+        self._failed = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dashboard-upload')
+
+    def submit(self, data: bytes, name: str) -> Upload:
+        """Register an upload and start parsing it, or return the existing entry for the same bytes"""
+        digest = content_hash(data)
+        with self._lock:
+            upload = self._uploads.get(digest) or self._failed.get(digest)
+            if upload is not None:
+                if digest in self._uploads:
+                    self._uploads.move_to_end(digest)
+                return upload
+            path = self._write(digest, data)
+            future = Future()
+            upload = Upload(digest, name, path, future)
+            self._uploads[digest] = upload
+        self._executor.submit(self._run, upload)
+        return upload
+
+    def get(self, digest: str) -> Optional[Upload]:
+        """Look an upload up by hash and mark it as recently used (None once evicted)"""
+        with self._lock:
+            upload = self._uploads.get(digest)
+            if upload is not None:
+                self._uploads.move_to_end(digest)
+                return upload
+            return self._failed.get(digest)
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(upload.size_bytes for upload in self._uploads.values())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._uploads)
+
+    def _write(self, digest: str, data: bytes) -> str:
+        """Write the upload under its hash (atomically, so readers never see a partial file)"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{digest}.csv")
+        if not os.path.exists(path):
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return path
+
+    def _run(self, upload: Upload):
+        try:
+            upload.size_bytes = int(self.parse(upload.path))
+        except Exception as exc:
+            # Keep only the error (so resubmitting the same bytes reports it without another parse)
+            with self._lock:
+                self._uploads.pop(upload.digest, None)
+                self._failed[upload.digest] = upload
+                while len(self._failed) > FAILED_UPLOADS_KEPT:
+                    self._failed.popitem(last=False)
+            self._drop(upload)
+            upload.future.set_exception(exc)
+            return
+        # Evict before publishing the result so waiters see the store within budget
+        try:
+            self._enforce_budget(keep=upload.digest)
+        finally:
+            upload.future.set_result(upload.path)
+
+    def _enforce_budget(self, keep: str):
+        """Drop the least recently used parsed uploads until the rest fit the budget"""
+        dropped = []
+        with self._lock:
+            total = sum(upload.size_bytes for upload in self._uploads.values())
+            for digest in list(self._uploads):
+                if total <= self.budget_bytes:
+                    break
+                upload = self._uploads[digest]
+                if digest == keep or not upload.ready:
+                    continue
+                del self._uploads[digest]
+                total -= upload.size_bytes
+                dropped.append(upload)
+        for upload in dropped:
+            self._drop(upload)
+
+    def _drop(self, upload: Upload):
+        try:
+            self.evict(upload.path)
+        except Exception:
+            pass  # a cache that could not be cleared still ages out; the upload is gone either way
+        try:
+            os.remove(upload.path)
+        except OSError:
+            pass